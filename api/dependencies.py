@@ -1,30 +1,58 @@
+import time
 from typing import Annotated, Any
+from uuid import UUID
 
 from fastapi import Depends
 
-from core.db import SessionDep
+from core.db import AsyncSessionDep
 from core.exceptions import *
-from core.security import oauth2_scheme, verify_token
+from core.metrics import timed
+from core.responses import orm_fields
+from core.security import oauth2_scheme, principal_cache, verify_token
 from core.types import TokenType
 from api.services import UserService
 from api.schemas import UserReturn
 
+from core.config import get_settings
+settings = get_settings()
+
+
+def __principal_from_claims__(token_data: dict) -> UserReturn | None:
+    """Trust the principal claims of a recently issued access token without a DB hit."""
+    issued_at = token_data.get("iat")
+    if not settings.AUTH_TRUST_TOKEN_CLAIMS_SECONDS or issued_at is None:
+        return None
+    if time.time() - issued_at > settings.AUTH_TRUST_TOKEN_CLAIMS_SECONDS:
+        return None
+    try:
+        return UserReturn(id=token_data["sub"], **token_data["principal"])
+    except (KeyError, TypeError, ValueError):
+        return None
+
 
 async def get_current_user(
-    token: Annotated[str, Depends(oauth2_scheme)], session: SessionDep
+    token: Annotated[str, Depends(oauth2_scheme)], session: AsyncSessionDep
 ) -> dict[str, Any] | None:
     token_data = verify_token(token, TokenType.ACCESS)
-    if token_data is None:
+    if not token_data:
         raise UnauthorizedException("User not authenticated.")
 
-    user_id = token_data.get("sub")
-    if not user_id:
+    try:
+        user_id = UUID(token_data.get("sub"))
+    except (TypeError, ValueError):
         raise UnauthorizedException("User not authenticated.")
 
-    user = await UserService.get_user_by_id(user_id, session)
+    with timed("auth_user"):
+        principal = __principal_from_claims__(token_data) or principal_cache.get(user_id)
+        if principal:
+            return principal
+
+        user = await UserService.get_user_by_id(user_id, session)
 
     if user:
-        return UserReturn(**user.model_dump())
+        principal = UserReturn.model_construct(**orm_fields(user, UserReturn))
+        principal_cache.set(user_id, principal)
+        return principal
 
     raise UnauthorizedException("User not authenticated.")
 
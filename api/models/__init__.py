@@ -4,3 +4,7 @@ from .strategic_goal import StrategicGoal
 from .user import User
 from .trigger import Trigger
 from .demographic import Demographic
+from .llm_cache import LLMCacheEntry
+from .job import Job
+from .revoked_token import RevokedToken
+from .embedding import Embedding
@@ -33,12 +33,12 @@ class Audience(SQLModel, table=True):
     demographics: "Demographic" = Relationship(
         back_populates="audience", cascade_delete=True)
 
-    brand_id: UUID = Field(foreign_key="brands.id")
+    brand_id: UUID = Field(foreign_key="brands.id", index=True)
     brand: "Brand" = Relationship(back_populates="audiences")
 
     created_at: Optional[datetime] = Field(
-        default_factory=lambda: datetime.now(timezone.utc))
+        default_factory=lambda: datetime.now(timezone.utc).replace(tzinfo=None))
     updated_at: Optional[datetime] = Field(
-        default_factory=lambda: datetime.now(timezone.utc),
-        sa_column_kwargs={"onupdate": lambda: datetime.now(timezone.utc)},
+        default_factory=lambda: datetime.now(timezone.utc).replace(tzinfo=None),
+        sa_column_kwargs={"onupdate": lambda: datetime.now(timezone.utc).replace(tzinfo=None)},
     )
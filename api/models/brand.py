@@ -1,6 +1,7 @@
 from typing import Optional, List, TYPE_CHECKING
 
-from sqlmodel import Field, SQLModel, Relationship
+from sqlalchemy import Index, UniqueConstraint
+from sqlmodel import Field, SQLModel, Relationship, Column, JSON
 from uuid import UUID, uuid4
 
 from datetime import datetime, timezone
@@ -13,6 +14,11 @@ if TYPE_CHECKING:
 
 class Brand(SQLModel, table=True):
     __tablename__ = "brands"
+    __table_args__ = (
+        UniqueConstraint("user_id", "name", name="uq_brands_user_id_name"),
+        Index("ix_brands_user_id_created_at_id", "user_id", "created_at", "id"),
+        Index("ix_brands_created_at_id", "created_at", "id"),
+    )
     id: UUID = Field(default_factory=uuid4, primary_key=True)
     name: str
     website_url: Optional[str] = None
@@ -24,6 +30,10 @@ class Brand(SQLModel, table=True):
     target_audience: Optional[str] = Field(default=None, nullable=True)
     key_competitors: Optional[str] = Field(default=None, nullable=True)
     first_access: bool = Field(default=False)
+    pending_steps: Optional[List[str]] = Field(
+        default=None, sa_column=Column(JSON, nullable=True))
+    section_hashes: Optional[dict] = Field(
+        default=None, sa_column=Column(JSON, nullable=True))
 
     brand_summary_active: bool = Field(default=False, nullable=True)
     ad_legacy_active: bool = Field(default=False, nullable=True)
@@ -40,9 +50,10 @@ class Brand(SQLModel, table=True):
         back_populates="brand", cascade_delete=True
     )
 
+    version: int = Field(default=1, sa_column_kwargs={"server_default": "1"})
     created_at: Optional[datetime] = Field(
-        default_factory=lambda: datetime.now(timezone.utc))
+        default_factory=lambda: datetime.now(timezone.utc).replace(tzinfo=None))
     updated_at: Optional[datetime] = Field(
-        default_factory=lambda: datetime.now(timezone.utc),
-        sa_column_kwargs={"onupdate": lambda: datetime.now(timezone.utc)},
+        default_factory=lambda: datetime.now(timezone.utc).replace(tzinfo=None),
+        sa_column_kwargs={"onupdate": lambda: datetime.now(timezone.utc).replace(tzinfo=None)},
     )
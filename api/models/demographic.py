@@ -10,7 +10,7 @@ if TYPE_CHECKING:
 class Demographic(SQLModel, table=True):
     __tablename__ = "demographics"
     id: UUID = Field(default_factory=uuid4, primary_key=True)
-    audience_id: UUID = Field(foreign_key="audiences.id")
+    audience_id: UUID = Field(foreign_key="audiences.id", index=True)
     audience: "Audience" = Relationship(back_populates="demographics")
     gender: Optional[str] = Field(default=None, nullable=True)
     age_bracket: Optional[str] = Field(default=None, nullable=True)
@@ -19,8 +19,8 @@ class Demographic(SQLModel, table=True):
     education: Optional[str] = Field(default=None, nullable=True)
     location: Optional[str] = Field(default=None, nullable=True)
     created_at: Optional[datetime] = Field(
-        default_factory=lambda: datetime.now(timezone.utc))
+        default_factory=lambda: datetime.now(timezone.utc).replace(tzinfo=None))
     updated_at: Optional[datetime] = Field(
-        default_factory=lambda: datetime.now(timezone.utc),
-        sa_column_kwargs={"onupdate": lambda: datetime.now(timezone.utc)},
+        default_factory=lambda: datetime.now(timezone.utc).replace(tzinfo=None),
+        sa_column_kwargs={"onupdate": lambda: datetime.now(timezone.utc).replace(tzinfo=None)},
     )
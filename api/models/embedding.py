@@ -0,0 +1,18 @@
+from uuid import UUID
+
+from sqlmodel import Column, Field, LargeBinary, SQLModel
+from datetime import datetime, timezone
+
+
+class Embedding(SQLModel, table=True):
+    __tablename__ = "embeddings"
+    # One row per embedded brand or audience, keyed by its kind and id.
+    kind: str = Field(primary_key=True, max_length=16)
+    item_id: UUID = Field(primary_key=True)
+    user_id: UUID = Field(index=True)
+    model: str
+    content_hash: str = Field(max_length=64)
+    # Little-endian float32 values, unit length.
+    vector: bytes = Field(sa_column=Column(LargeBinary, nullable=False))
+    updated_at: datetime = Field(
+        default_factory=lambda: datetime.now(timezone.utc).replace(tzinfo=None), index=True)
@@ -0,0 +1,29 @@
+from typing import Optional
+
+from sqlmodel import Field, SQLModel, Column, JSON
+from uuid import UUID, uuid4
+from datetime import datetime, timezone
+
+from core.types import JobStatus
+
+
+class Job(SQLModel, table=True):
+    __tablename__ = "jobs"
+    id: UUID = Field(default_factory=uuid4, primary_key=True)
+    kind: str
+    status: str = Field(default=JobStatus.PENDING, index=True)
+    payload: Optional[dict] = Field(
+        default=None, sa_column=Column(JSON, nullable=True))
+    result: Optional[dict] = Field(
+        default=None, sa_column=Column(JSON, nullable=True))
+    error: Optional[str] = Field(default=None, nullable=True)
+
+    user_id: UUID = Field(foreign_key="users.id")
+    brand_id: Optional[UUID] = Field(default=None, nullable=True)
+
+    created_at: Optional[datetime] = Field(
+        default_factory=lambda: datetime.now(timezone.utc).replace(tzinfo=None))
+    updated_at: Optional[datetime] = Field(
+        default_factory=lambda: datetime.now(timezone.utc).replace(tzinfo=None),
+        sa_column_kwargs={"onupdate": lambda: datetime.now(timezone.utc).replace(tzinfo=None)},
+    )
@@ -0,0 +1,15 @@
+from typing import Optional
+
+from sqlmodel import Field, SQLModel
+from datetime import datetime, timezone
+
+
+class LLMCacheEntry(SQLModel, table=True):
+    __tablename__ = "llm_cache"
+    key: str = Field(primary_key=True, max_length=64)
+    content: str
+    expires_at: Optional[datetime] = Field(default=None, nullable=True, index=True)
+    last_accessed_at: datetime = Field(
+        default_factory=lambda: datetime.now(timezone.utc).replace(tzinfo=None), index=True)
+    created_at: Optional[datetime] = Field(
+        default_factory=lambda: datetime.now(timezone.utc).replace(tzinfo=None))
@@ -0,0 +1,12 @@
+from sqlmodel import Field, SQLModel
+from datetime import datetime, timezone
+
+
+class RevokedToken(SQLModel, table=True):
+    __tablename__ = "revoked_tokens"
+    # The jti of a rotated refresh token, or the id of a revoked token family.
+    token_id: str = Field(primary_key=True, max_length=64)
+    kind: str
+    expires_at: datetime = Field(index=True)
+    revoked_at: datetime = Field(
+        default_factory=lambda: datetime.now(timezone.utc).replace(tzinfo=None), index=True)
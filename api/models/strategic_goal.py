@@ -13,11 +13,11 @@ class StrategicGoal(SQLModel, table=True):
     id: UUID = Field(default_factory=uuid4, primary_key=True)
     strategic_goal: str
     created_at: Optional[datetime] = Field(
-        default_factory=lambda: datetime.now(timezone.utc))
+        default_factory=lambda: datetime.now(timezone.utc).replace(tzinfo=None))
     updated_at: Optional[datetime] = Field(
-        default_factory=lambda: datetime.now(timezone.utc),
-        sa_column_kwargs={"onupdate": lambda: datetime.now(timezone.utc)},
+        default_factory=lambda: datetime.now(timezone.utc).replace(tzinfo=None),
+        sa_column_kwargs={"onupdate": lambda: datetime.now(timezone.utc).replace(tzinfo=None)},
     )
 
-    brand_id: UUID = Field(foreign_key="brands.id")
+    brand_id: UUID = Field(foreign_key="brands.id", index=True)
     brand: "Brand" = Relationship(back_populates="strategic_goals")
@@ -17,11 +17,11 @@ class Trigger(SQLModel, table=True):
     trigger_img: Optional[str] = Field(default=None, nullable=True)
     territory: Optional[str] = Field(default=None, nullable=True)
     created_at: Optional[datetime] = Field(
-        default_factory=lambda: datetime.now(timezone.utc))
+        default_factory=lambda: datetime.now(timezone.utc).replace(tzinfo=None))
     updated_at: Optional[datetime] = Field(
-        default_factory=lambda: datetime.now(timezone.utc),
-        sa_column_kwargs={"onupdate": lambda: datetime.now(timezone.utc)},
+        default_factory=lambda: datetime.now(timezone.utc).replace(tzinfo=None),
+        sa_column_kwargs={"onupdate": lambda: datetime.now(timezone.utc).replace(tzinfo=None)},
     )
 
-    audience_id: UUID = Field(foreign_key="audiences.id")
+    audience_id: UUID = Field(foreign_key="audiences.id", index=True)
     audience: "Audience" = Relationship(back_populates="triggers")
@@ -1,5 +1,6 @@
 from typing import Optional, List, TYPE_CHECKING
 
+from sqlalchemy import Index
 from sqlmodel import Field, SQLModel, Relationship
 from uuid import UUID, uuid4
 from datetime import datetime, timezone
@@ -10,18 +11,20 @@ if TYPE_CHECKING:
 
 class User(SQLModel, table=True):
     __tablename__ = "users"
+    __table_args__ = (Index("ix_users_created_at_id", "created_at", "id"),)
     id: UUID = Field(default_factory=uuid4, primary_key=True)
     username: str
-    email: str
+    email: str = Field(index=True, unique=True)
     hashed_password: str
     is_active: bool = Field(default=True)
     is_verified: bool = Field(default=False)
     is_superuser: bool = Field(default=False)
+    version: int = Field(default=1, sa_column_kwargs={"server_default": "1"})
     created_at: Optional[datetime] = Field(
-        default_factory=lambda: datetime.now(timezone.utc))
+        default_factory=lambda: datetime.now(timezone.utc).replace(tzinfo=None))
     updated_at: Optional[datetime] = Field(
-        default_factory=lambda: datetime.now(timezone.utc),
-        sa_column_kwargs={"onupdate": lambda: datetime.now(timezone.utc)},
+        default_factory=lambda: datetime.now(timezone.utc).replace(tzinfo=None),
+        sa_column_kwargs={"onupdate": lambda: datetime.now(timezone.utc).replace(tzinfo=None)},
     )
 
     brands: List["Brand"] = Relationship(back_populates="user")
@@ -0,0 +1,40 @@
+from sqlalchemy import insert, update
+from sqlalchemy.orm import joinedload, selectinload
+from sqlmodel import select
+
+from api.models import Audience, Brand, Demographic, Trigger
+from core.db import AsyncSessionDep
+from uuid import UUID
+
+
+class AudienceRepository:
+    @staticmethod
+    async def get_audiences_by_brand(brand_id: UUID, session: AsyncSessionDep) -> list[Audience]:
+        statement = select(Audience).where(Audience.brand_id == brand_id).options(
+            selectinload(Audience.triggers),
+            joinedload(Audience.demographics),
+        ).order_by(Audience.created_at, Audience.id)
+        return (await session.exec(statement)).unique().all()
+
+    @staticmethod
+    async def get_audience_by_id(audience_id: UUID, session: AsyncSessionDep) -> Audience | None:
+        statement = select(Audience).where(Audience.id == audience_id).options(
+            selectinload(Audience.triggers),
+            joinedload(Audience.demographics),
+        )
+        return (await session.exec(statement)).first()
+
+    @staticmethod
+    async def create_audiences(brand_id: UUID, audiences: list[dict], demographics: list[dict], triggers: list[dict], session: AsyncSessionDep) -> None:
+        """Bulk insert generated audiences with their demographics and triggers and
+        flag the brand as having audiences, all in one transaction.
+
+        Anything else pending on ``session`` is committed along with them.
+        """
+        await session.execute(insert(Audience), [Audience(**audience).model_dump() for audience in audiences])
+        if demographics:
+            await session.execute(insert(Demographic), [Demographic(**demographic).model_dump() for demographic in demographics])
+        if triggers:
+            await session.execute(insert(Trigger), [Trigger(**trigger).model_dump() for trigger in triggers])
+        await session.execute(update(Brand).where(Brand.id == brand_id).values(audience_active=True))
+        await session.commit()
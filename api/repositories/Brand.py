@@ -1,44 +1,140 @@
+from sqlalchemy.orm import selectinload
 from sqlmodel import select
 
-from api.models import Brand
-from api.schemas import BrandUpdate
-from core.db import SessionDep
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+
+from api.models import Audience, Brand
+from api.schemas import BrandQuery, BrandReturn, BrandUpdate
+from core.db import AsyncSessionDep, insert_returning, update_returning
+from core.pagination import fetch_page, parse_fields
 from core.exceptions import NotFoundException, InternalServerError, ConflictException
 from uuid import UUID
+from datetime import datetime
+
+__version_fields__ = ("id", "version", "updated_at")
 
 
 class BrandRepository:
     @staticmethod
-    async def get_all_brands(session: SessionDep) -> list[Brand]:
-        return session.exec(select(Brand)).all()
+    async def get_brands_page(query: BrandQuery, session: AsyncSessionDep) -> tuple[list[dict], str | None, list[tuple]]:
+        """A page of brands, plus the (id, version, updated_at) of each row."""
+        fields = parse_fields(query.fields, set(BrandReturn.model_fields))
+        selected = fields + [field for field in __version_fields__ if field not in fields]
+        rows, next_cursor = await fetch_page(
+            session, Brand, BrandRepository.__page_filters__(query), selected, query.limit, query.cursor)
+        versions = [tuple(row[field] for field in __version_fields__) for row in rows]
+        return [{field: row[field] for field in fields} for row in rows], next_cursor, versions
 
     @staticmethod
-    async def get_brand_by_id(brand_id: str, session: SessionDep) -> Brand | None:
-        return session.exec(select(Brand).where(Brand.id == brand_id)).first()
+    async def get_brands_page_versions(query: BrandQuery, session: AsyncSessionDep) -> tuple[list[tuple], str | None]:
+        """The (id, version, updated_at) of each row of the page ``get_brands_page`` would return."""
+        rows, next_cursor = await fetch_page(
+            session, Brand, BrandRepository.__page_filters__(query), list(__version_fields__), query.limit, query.cursor)
+        return [tuple(row[field] for field in __version_fields__) for row in rows], next_cursor
 
     @staticmethod
-    async def get_all_brands_by_user(user_id: str, session: SessionDep) -> list[Brand]:
-        statement = select(Brand).where(Brand.user_id == user_id)
-        brand = session.exec(statement)
-        return brand.all()
+    def __page_filters__(query: BrandQuery) -> list:
+        filters = []
+        if query.user_id:
+            filters.append(Brand.user_id == query.user_id)
+        if query.category:
+            filters.append(func.lower(Brand.category) == query.category.lower())
+        for flag in ("first_access", "brand_summary_active", "ad_legacy_active",
+                     "strategic_goals_active", "audience_active", "brand_universe_active"):
+            value = getattr(query, flag)
+            if value is not None:
+                filters.append(getattr(Brand, flag) == value)
+        return filters
+
+    @staticmethod
+    async def get_brand_by_id(brand_id: str, session: AsyncSessionDep) -> Brand | None:
+        return (await session.exec(select(Brand).where(Brand.id == brand_id))).first()
+
+    @staticmethod
+    async def get_brand_version(brand_id: UUID, session: AsyncSessionDep) -> tuple[UUID, int, datetime] | None:
+        """id, version and updated_at of a brand, without loading its text columns."""
+        statement = select(Brand.id, Brand.version, Brand.updated_at).where(Brand.id == brand_id)
+        return (await session.exec(statement)).first()
+
+    @staticmethod
+    async def get_brand_aggregate(brand_id: UUID, session: AsyncSessionDep) -> Brand | None:
+        """Load a brand with its audiences, their triggers and demographics, and its strategic goals.
+
+        Runs a fixed four queries regardless of how many audiences or triggers exist.
+        """
+        audiences = selectinload(Brand.audiences)
+        statement = select(Brand).where(Brand.id == brand_id).options(
+            audiences.selectinload(Audience.triggers),
+            audiences.joinedload(Audience.demographics),
+            selectinload(Brand.strategic_goals),
+        )
+        return (await session.exec(statement)).first()
 
     @staticmethod
-    async def get_brand_by_name(name: str, session: SessionDep, user_id: str) -> Brand | None:
-        return session.exec(select(Brand).where(Brand.name == name, Brand.user_id == user_id)).first()
+    async def get_brand_by_name(name: str, session: AsyncSessionDep, user_id: str) -> Brand | None:
+        return (await session.exec(select(Brand).where(Brand.name == name, Brand.user_id == user_id))).first()
 
     @staticmethod
-    async def create_brand(brand: dict, session: SessionDep) -> Brand | None:
-        brand = Brand(**brand)
-        session.add(brand)
-        session.commit()
-        session.refresh(brand)
+    async def get_existing_brand_names(names: list[str], session: AsyncSessionDep, user_id: UUID) -> set[str]:
+        statement = select(Brand.name).where(Brand.user_id == user_id, Brand.name.in_(names))
+        return set((await session.exec(statement)).all())
+
+    @staticmethod
+    async def create_brands(brands: list[dict], session: AsyncSessionDep, batch_size: int) -> list[Brand]:
+        """Insert ``brands`` committing once per batch.
+
+        A batch that hits the unique name constraint (a concurrent insert) is
+        retried row by row, and the conflicting rows are left out of the result.
+        """
+        created_ids = []
+        for start in range(0, len(brands), batch_size):
+            batch = [Brand(**brand) for brand in brands[start:start + batch_size]]
+            rows = [brand.model_dump() for brand in batch]
+            session.add_all(batch)
+            try:
+                await session.commit()
+                created_ids.extend(row["id"] for row in rows)
+                continue
+            except IntegrityError:
+                await session.rollback()
+
+            for row in rows:
+                try:
+                    created_ids.append((await BrandRepository.create_brand(row, session)).id)
+                except ConflictException:
+                    pass
+
+        if not created_ids:
+            return []
+        # A rollback expires everything loaded in the session, so reload the rows.
+        return (await session.exec(select(Brand).where(Brand.id.in_(created_ids)))).all()
+
+    @staticmethod
+    async def create_brand(brand: dict, session: AsyncSessionDep) -> Brand | None:
+        try:
+            brand = await insert_returning(Brand(**brand), session)
+            await session.commit()
+        except IntegrityError:
+            await session.rollback()
+            raise ConflictException("Brand already exists")
         return brand
 
     @staticmethod
-    async def update_brand(brand_id: UUID, brand: BrandUpdate, session: SessionDep) -> Brand | None:
-        existing_brand = session.get(Brand, brand_id)
-        existing_brand.sqlmodel_update(brand)
-        session.add(existing_brand)
-        session.commit()
-        session.refresh(existing_brand)
-        return existing_brand
+    async def update_brand(brand: Brand, update_data: dict, session: AsyncSessionDep,
+                           expected_version: int | None = None) -> Brand:
+        """Write the changed columns of an already loaded brand.
+
+        With ``expected_version`` the write is rejected with a conflict when
+        someone else updated the brand since that version was read.
+        """
+        try:
+            updated = await update_returning(brand, update_data, session, expected_version)
+        except IntegrityError:
+            await session.rollback()
+            raise ConflictException("Brand already exists")
+        if updated is None:
+            await session.rollback()
+            raise ConflictException("Brand was modified by another request; reload it and try again")
+        await session.commit()
+        return updated
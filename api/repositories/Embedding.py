@@ -0,0 +1,95 @@
+from datetime import datetime, timezone
+from uuid import UUID
+
+from sqlalchemy import delete
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlmodel import select
+
+from api.models import Audience, Brand, Embedding
+from core.db import AsyncSessionDep
+from core.types import SearchKind
+
+# Text embedded per kind, in this order.
+__documents__ = {
+    SearchKind.BRAND: [Brand.name, Brand.category, Brand.about, Brand.positioning,
+                       Brand.target_audience, Brand.key_characteristics],
+    SearchKind.AUDIENCE: [Audience.name, Audience.description, Audience.key_tags, Audience.psycho_graphic,
+                          Audience.attitudinal, Audience.self_concept, Audience.lifestyle, Audience.media_habits,
+                          Audience.general_keywords, Audience.brand_keywords],
+}
+
+
+class EmbeddingRepository:
+    @staticmethod
+    async def get_documents(kind: SearchKind, ids: list[UUID], session: AsyncSessionDep) -> list[tuple[UUID, UUID, str]]:
+        """(id, owning user id, text) of the given brands or audiences that still exist."""
+        columns = __documents__[kind]
+        if kind == SearchKind.BRAND:
+            statement = select(Brand.id, Brand.user_id, *columns).where(Brand.id.in_(ids))
+        else:
+            statement = select(Audience.id, Brand.user_id, *columns).join(
+                Brand, Audience.brand_id == Brand.id).where(Audience.id.in_(ids))
+        return [
+            (row[0], row[1], "\n".join(value for value in row[2:] if value))
+            for row in (await session.exec(statement)).all()
+        ]
+
+    @staticmethod
+    async def get_missing_ids(kind: SearchKind, model: str, session: AsyncSessionDep) -> list[UUID]:
+        """Ids of brands or audiences with no embedding from ``model``."""
+        table = Brand if kind == SearchKind.BRAND else Audience
+        statement = select(table.id).outerjoin(
+            Embedding, (Embedding.kind == kind.value) & (Embedding.item_id == table.id) & (Embedding.model == model)
+        ).where(Embedding.item_id.is_(None))
+        return (await session.exec(statement)).all()
+
+    @staticmethod
+    async def get_stored(kind: SearchKind, ids: list[UUID], session: AsyncSessionDep) -> dict[UUID, tuple[str, bytes]]:
+        """Content hash and vector bytes of the given items that have an embedding."""
+        statement = select(Embedding.item_id, Embedding.content_hash, Embedding.vector).where(
+            Embedding.kind == kind.value, Embedding.item_id.in_(ids))
+        return {item_id: (content_hash, vector) for item_id, content_hash, vector in (await session.exec(statement)).all()}
+
+    @staticmethod
+    async def get_embeddings(kind: SearchKind, model: str, session: AsyncSessionDep, since: datetime | None = None) -> list[tuple[UUID, UUID, bytes]]:
+        """(item id, user id, vector bytes) of the stored embeddings, optionally only those updated since ``since``."""
+        statement = select(Embedding.item_id, Embedding.user_id, Embedding.vector).where(
+            Embedding.kind == kind.value, Embedding.model == model)
+        if since is not None:
+            statement = statement.where(Embedding.updated_at >= since)
+        return (await session.exec(statement)).all()
+
+    @staticmethod
+    async def get_titles(kind: SearchKind, ids: list[UUID], session: AsyncSessionDep) -> dict[UUID, dict]:
+        """Name and brand id of the given brands or audiences that still exist."""
+        if kind == SearchKind.BRAND:
+            statement = select(Brand.id, Brand.id, Brand.name).where(Brand.id.in_(ids))
+        else:
+            statement = select(Audience.id, Audience.brand_id, Audience.name).where(Audience.id.in_(ids))
+        return {id: {"brand_id": brand_id, "name": name} for id, brand_id, name in (await session.exec(statement)).all()}
+
+    @staticmethod
+    async def get_owner(kind: SearchKind, id: UUID, session: AsyncSessionDep) -> UUID | None:
+        if kind == SearchKind.BRAND:
+            statement = select(Brand.user_id).where(Brand.id == id)
+        else:
+            statement = select(Brand.user_id).join(Audience, Audience.brand_id == Brand.id).where(Audience.id == id)
+        return (await session.exec(statement)).first()
+
+    @staticmethod
+    async def save_embeddings(kind: SearchKind, rows: list[dict], session: AsyncSessionDep) -> None:
+        """Insert or overwrite embeddings; each row has item_id, user_id, model, content_hash and vector."""
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        dialect = postgresql if session.bind.dialect.name == "postgresql" else sqlite
+        statement = dialect.insert(Embedding)
+        statement = statement.on_conflict_do_update(
+            index_elements=[Embedding.kind, Embedding.item_id],
+            set_={column: statement.excluded[column] for column in ("user_id", "model", "content_hash", "vector", "updated_at")},
+        )
+        await session.execute(statement, [{**row, "kind": kind.value, "updated_at": now} for row in rows])
+        await session.commit()
+
+    @staticmethod
+    async def delete_embeddings(kind: SearchKind, ids: list[UUID], session: AsyncSessionDep) -> None:
+        await session.execute(delete(Embedding).where(Embedding.kind == kind.value, Embedding.item_id.in_(ids)))
+        await session.commit()
@@ -0,0 +1,45 @@
+from sqlalchemy import update
+from sqlmodel import select
+
+from api.models import Job
+from core.db import AsyncSessionDep
+from core.types import JobStatus
+from uuid import UUID
+
+
+class JobRepository:
+    @staticmethod
+    async def get_job_by_id(job_id: UUID, session: AsyncSessionDep) -> Job | None:
+        return await session.get(Job, job_id)
+
+    @staticmethod
+    async def get_unfinished_jobs(session: AsyncSessionDep) -> list[Job]:
+        statement = select(Job).where(
+            Job.status.in_([JobStatus.PENDING, JobStatus.RUNNING])
+        ).order_by(Job.created_at)
+        return (await session.exec(statement)).all()
+
+    @staticmethod
+    async def create_job(job: dict, session: AsyncSessionDep) -> Job:
+        job = Job(**job)
+        session.add(job)
+        await session.commit()
+        await session.refresh(job)
+        return job
+
+    @staticmethod
+    async def update_job(job: Job, update_data: dict, session: AsyncSessionDep) -> Job:
+        job.sqlmodel_update(update_data)
+        session.add(job)
+        await session.commit()
+        await session.refresh(job)
+        return job
+
+    @staticmethod
+    async def fail_unfinished_job(job_id: UUID, error: str, session: AsyncSessionDep) -> bool:
+        """Mark a job failed unless it already finished; False when nothing changed."""
+        result = await session.exec(update(Job).where(
+            Job.id == job_id, Job.status.in_([JobStatus.PENDING, JobStatus.RUNNING])
+        ).values(status=JobStatus.FAILED, error=error))
+        await session.commit()
+        return bool(result.rowcount)
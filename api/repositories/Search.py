@@ -0,0 +1,129 @@
+from functools import reduce
+from uuid import UUID
+
+from sqlalchemy import Float, String, Uuid, and_, case, cast, func, literal, literal_column, null, or_, tuple_, union_all
+from sqlmodel import select
+
+from api.models import Audience, Brand, Trigger
+from api.schemas import SearchQuery
+from core.db import AsyncSessionDep
+from core.pagination import decode_keyset, encode_keyset
+from core.exceptions import BadRequestException
+from core.types import SearchKind
+
+# Text searched per kind; it also feeds the snippets.
+__documents__ = {
+    SearchKind.BRAND: [Brand.about, Brand.positioning, Brand.target_audience, Brand.key_competitors],
+    SearchKind.AUDIENCE: [Audience.description, Audience.key_tags, Audience.psycho_graphic, Audience.attitudinal,
+                          Audience.self_concept, Audience.lifestyle, Audience.media_habits,
+                          Audience.general_keywords, Audience.brand_keywords],
+    SearchKind.TRIGGER: [Trigger.description, Trigger.territory],
+}
+__tables__ = {SearchKind.BRAND: "brands", SearchKind.AUDIENCE: "audiences", SearchKind.TRIGGER: "triggers"}
+__snippet_chars__ = 160
+
+
+class SearchRepository:
+    @staticmethod
+    async def search(query: SearchQuery, kinds: list[SearchKind], user_id: UUID, session: AsyncSessionDep) -> tuple[list[dict], str | None]:
+        """Rank the user's brands, audiences and triggers matching ``query.q``.
+
+        On Postgres this matches the generated ``search_vector`` columns
+        (GIN indexed) and ranks with ts_rank. Elsewhere every word of the query
+        has to appear in the text, and hits rank by the share of those words
+        found in their title. Pages are keyset paginated on (rank, kind, id).
+        """
+        postgres = session.bind.dialect.name == "postgresql"
+        tsquery = func.websearch_to_tsquery(literal_column("'english'"), query.q)
+        terms = [term for term in query.q.lower().replace('"', " ").split() if term]
+        if not postgres and not terms:
+            return [], None
+
+        branches = []
+        for kind in kinds:
+            model = {SearchKind.BRAND: Brand, SearchKind.AUDIENCE: Audience, SearchKind.TRIGGER: Trigger}[kind]
+            document = reduce(lambda left, right: left + " " + right,
+                              [func.coalesce(column, "") for column in __documents__[kind]])
+            if postgres:
+                vector = literal_column(f"{__tables__[kind]}.search_vector")
+                match = vector.op("@@")(tsquery)
+                rank = cast(func.ts_rank(vector, tsquery), Float)
+            else:
+                searchable = func.lower(model.name + " " + document)
+                match = and_(*(searchable.contains(term, autoescape=True) for term in terms))
+                title = func.lower(model.name)
+                rank = cast(reduce(lambda left, right: left + right, [
+                    case((title.contains(term, autoescape=True), 1.0), else_=0.0) for term in terms
+                ]) / len(terms), Float)
+
+            if kind == SearchKind.BRAND:
+                statement = select(
+                    literal(kind.value, String).label("kind"), Brand.id.label("id"), Brand.id.label("brand_id"),
+                    cast(null(), Uuid).label("audience_id"), Brand.name.label("title"),
+                    document.label("document"), rank.label("rank"),
+                )
+            elif kind == SearchKind.AUDIENCE:
+                statement = select(
+                    literal(kind.value, String).label("kind"), Audience.id.label("id"), Audience.brand_id.label("brand_id"),
+                    Audience.id.label("audience_id"), Audience.name.label("title"),
+                    document.label("document"), rank.label("rank"),
+                ).join(Brand, Audience.brand_id == Brand.id)
+            else:
+                statement = select(
+                    literal(kind.value, String).label("kind"), Trigger.id.label("id"), Audience.brand_id.label("brand_id"),
+                    Trigger.audience_id.label("audience_id"), Trigger.name.label("title"),
+                    document.label("document"), rank.label("rank"),
+                ).join(Audience, Trigger.audience_id == Audience.id).join(Brand, Audience.brand_id == Brand.id)
+
+            statement = statement.where(Brand.user_id == user_id, match)
+            if query.brand_id:
+                statement = statement.where(Brand.id == query.brand_id)
+            branches.append(statement)
+
+        hits = union_all(*branches).subquery("hits")
+        page = select(hits)
+        if query.cursor:
+            rank, kind, id = SearchRepository.__decode_cursor__(query.cursor)
+            page = page.where(or_(
+                hits.c.rank < rank,
+                and_(hits.c.rank == rank, tuple_(hits.c.kind, hits.c.id) > tuple_(kind, id)),
+            ))
+        ordering = (hits.c.rank.desc(), hits.c.kind, hits.c.id)
+        page = page.order_by(*ordering).limit(query.limit + 1).subquery("page")
+
+        # Headlines are only built for the rows of the page.
+        snippet = (func.ts_headline(literal_column("'english'"), page.c.document, tsquery,
+                                    "MaxFragments=1, MaxWords=30, MinWords=10")
+                   if postgres else page.c.document)
+        statement = select(
+            page.c.kind, page.c.id, page.c.brand_id, page.c.audience_id, page.c.title,
+            snippet.label("snippet"), page.c.rank,
+        ).order_by(page.c.rank.desc(), page.c.kind, page.c.id)
+
+        rows = [dict(row._mapping) for row in (await session.exec(statement)).all()]
+        next_cursor = None
+        if len(rows) > query.limit:
+            rows = rows[:query.limit]
+            last = rows[-1]
+            next_cursor = encode_keyset([last["rank"], last["kind"], str(last["id"])])
+        if not postgres:
+            for row in rows:
+                row["snippet"] = SearchRepository.__snippet__(row["snippet"], terms)
+        return rows, next_cursor
+
+    @staticmethod
+    def __decode_cursor__(cursor: str) -> tuple[float, str, UUID]:
+        try:
+            rank, kind, id = decode_keyset(cursor)
+            return float(rank), str(kind), UUID(id)
+        except (ValueError, TypeError):
+            raise BadRequestException("Invalid cursor")
+
+    @staticmethod
+    def __snippet__(document: str, terms: list[str]) -> str:
+        """The stretch of ``document`` around the first matched word."""
+        lowered = document.lower()
+        positions = [lowered.find(term) for term in terms if term in lowered]
+        start = max(0, min(positions, default=0) - __snippet_chars__ // 4)
+        snippet = document[start:start + __snippet_chars__].strip()
+        return ("…" if start else "") + snippet + ("…" if start + __snippet_chars__ < len(document) else "")
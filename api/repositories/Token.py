@@ -0,0 +1,34 @@
+from datetime import datetime
+
+from sqlalchemy import delete
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import select
+
+from api.models import RevokedToken
+from core.db import AsyncSessionDep
+from core.types import RevocationKind
+
+
+class TokenRepository:
+    @staticmethod
+    async def revoke_token(token_id: str, kind: RevocationKind, expires_at: datetime, session: AsyncSessionDep) -> bool:
+        """Record a revocation; False when ``token_id`` was already revoked."""
+        session.add(RevokedToken(token_id=token_id, kind=kind, expires_at=expires_at))
+        try:
+            await session.commit()
+        except IntegrityError:
+            await session.rollback()
+            return False
+        return True
+
+    @staticmethod
+    async def get_revoked_tokens(now: datetime, session: AsyncSessionDep, since: datetime | None = None) -> list[RevokedToken]:
+        statement = select(RevokedToken).where(RevokedToken.expires_at >= now)
+        if since is not None:
+            statement = statement.where(RevokedToken.revoked_at >= since)
+        return (await session.exec(statement)).all()
+
+    @staticmethod
+    async def delete_expired_tokens(now: datetime, session: AsyncSessionDep) -> None:
+        await session.execute(delete(RevokedToken).where(RevokedToken.expires_at < now))
+        await session.commit()
@@ -1,81 +1,84 @@
 from pydantic import EmailStr
+from sqlalchemy.exc import IntegrityError
 from sqlmodel import select
 
 from api.models import User
-from core.security import get_password_hash
-from api.schemas import UserCreate
-from core.db import SessionDep
+from core.security import hash_password, principal_cache
+from api.schemas import UserCreate, UserQuery, UserReturn
+from core.db import AsyncSessionDep, insert_returning, update_returning
+from core.exceptions import ConflictException
+from core.pagination import fetch_page, parse_fields
 
 
 class UserRepository:
     @staticmethod
-    async def get_all_users(session: SessionDep) -> list[User]:
-        return session.exec(select(User)).all()
+    async def get_users_page(query: UserQuery, session: AsyncSessionDep) -> tuple[list[dict], str | None]:
+        filters = [
+            getattr(User, flag) == getattr(query, flag)
+            for flag in ("is_active", "is_verified", "is_superuser")
+            if getattr(query, flag) is not None
+        ]
+        fields = parse_fields(query.fields, set(UserReturn.model_fields))
+        return await fetch_page(session, User, filters, fields, query.limit, query.cursor)
 
     @staticmethod
-    async def get_user_by_id(user_id: str, session: SessionDep) -> User | None:
-        return session.exec(select(User).where(User.id == user_id)).first()
+    async def get_user_by_id(user_id: str, session: AsyncSessionDep) -> User | None:
+        return (await session.exec(select(User).where(User.id == user_id))).first()
 
     @staticmethod
-    async def get_user_by_email(email: EmailStr, session: SessionDep) -> User | None:
+    async def get_user_by_email(email: EmailStr, session: AsyncSessionDep) -> User | None:
         statement = select(User).where(User.email == email)
-        user = session.exec(statement)
+        user = await session.exec(statement)
         return user.first()
 
     @staticmethod
-    async def create_user(user: UserCreate, session: SessionDep) -> User | None:
+    async def create_user(user: UserCreate, session: AsyncSessionDep) -> User | None:
         user = User(username=user.username,
-                    email=user.email, hashed_password=get_password_hash(user.password))
-        session.add(user)
-        session.commit()
-        session.refresh(user)
+                    email=user.email, hashed_password=await hash_password(user.password))
+        try:
+            user = await insert_returning(user, session)
+            await session.commit()
+        except IntegrityError:
+            await session.rollback()
+            raise ConflictException("User already exists")
 
         return user
 
     @staticmethod
-    async def update_user_name(user: User, name: str) -> User | None:
-        user.name = name
-        await user.save()
+    async def update_user(user: User, update_data: dict, session: AsyncSessionDep) -> User | None:
+        user = await update_returning(user, update_data, session)
+        await session.commit()
+        principal_cache.invalidate(user.id)
         return user
 
     @staticmethod
-    async def update_user_password(user: User, plain_password: str) -> User | None:
-        user.hashed_password = get_password_hash(plain_password)
-        await user.save()
-        return user
+    async def update_user_name(user: User, name: str, session: AsyncSessionDep) -> User | None:
+        return await UserRepository.update_user(user, {"username": name}, session)
 
     @staticmethod
-    async def activate_user(user: User) -> User | None:
-        user.is_active = True
-        await user.save()
-        return user
+    async def update_user_password(user: User, plain_password: str, session: AsyncSessionDep) -> User | None:
+        return await UserRepository.update_user(user, {"hashed_password": await hash_password(plain_password)}, session)
 
     @staticmethod
-    async def deactivate_user(user: User) -> User | None:
-        user.is_active = False
-        await user.save()
-        return user
+    async def activate_user(user: User, session: AsyncSessionDep) -> User | None:
+        return await UserRepository.update_user(user, {"is_active": True}, session)
 
     @staticmethod
-    async def superuser_user(user: User) -> User | None:
-        user.is_superuser = True
-        await user.save()
-        return user
+    async def deactivate_user(user: User, session: AsyncSessionDep) -> User | None:
+        return await UserRepository.update_user(user, {"is_active": False}, session)
 
     @staticmethod
-    async def unsuperuser_user(user: User) -> User | None:
-        user.is_superuser = False
-        await user.save()
-        return user
+    async def superuser_user(user: User, session: AsyncSessionDep) -> User | None:
+        return await UserRepository.update_user(user, {"is_superuser": True}, session)
 
     @staticmethod
-    async def verify_user(user: User) -> User | None:
-        user.is_verified = True
-        await user.save()
-        return user
+    async def unsuperuser_user(user: User, session: AsyncSessionDep) -> User | None:
+        return await UserRepository.update_user(user, {"is_superuser": False}, session)
 
     @staticmethod
-    async def unverify_user(user: User) -> User | None:
-        user.is_verified = False
-        await user.save()
-        return user
+    async def verify_user(user: User, session: AsyncSessionDep) -> User | None:
+        return await UserRepository.update_user(user, {"is_verified": True}, session)
+
+    @staticmethod
+    async def unverify_user(user: User, session: AsyncSessionDep) -> User | None:
+        return await UserRepository.update_user(user, {"is_verified": False}, session)
@@ -1,2 +1,7 @@
 from api.repositories.User import UserRepository
 from api.repositories.Brand import BrandRepository
+from api.repositories.Job import JobRepository
+from api.repositories.Audience import AudienceRepository
+from api.repositories.Token import TokenRepository
+from api.repositories.Search import SearchRepository
+from api.repositories.Embedding import EmbeddingRepository
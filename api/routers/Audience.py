@@ -0,0 +1,33 @@
+from typing import Annotated, List
+from fastapi import APIRouter, Depends, Query
+from uuid import UUID
+
+from api.services import AudienceService, EmbeddingService
+from api.schemas import AudienceFull, AudienceGenerate, JobReturn, SimilarItems, SimilarQuery, UserReturn
+from api.dependencies import get_current_active_user
+from core.db import AsyncSessionDep
+from core.responses import model_response
+from core.timing import TimedRoute
+from core.types import SearchKind
+
+audience_router = APIRouter(prefix="/audience", tags=["Audience"], route_class=TimedRoute)
+
+
+@audience_router.get("/brand/{brand_id}", response_model=List[AudienceFull])
+async def get_brand_audiences(brand_id: UUID, session: AsyncSessionDep, current_user: UserReturn = Depends(get_current_active_user)) -> List[AudienceFull]:
+    return model_response(await AudienceService.get_audiences(brand_id, session))
+
+
+@audience_router.post("/brand/{brand_id}", response_model=JobReturn, status_code=202)
+async def generate_brand_audiences(brand_id: UUID, request: AudienceGenerate, session: AsyncSessionDep, current_user: UserReturn = Depends(get_current_active_user)) -> JobReturn:
+    return await AudienceService.generate_audiences(brand_id, request, session, current_user)
+
+
+@audience_router.get("/{audience_id}", response_model=AudienceFull)
+async def get_audience_by_id(audience_id: UUID, session: AsyncSessionDep, current_user: UserReturn = Depends(get_current_active_user)) -> AudienceFull:
+    return model_response(await AudienceService.get_audience_by_id(audience_id, session))
+
+
+@audience_router.get("/{audience_id}/similar", response_model=SimilarItems)
+async def get_similar_audiences(audience_id: UUID, query: Annotated[SimilarQuery, Query()], session: AsyncSessionDep, current_user: UserReturn = Depends(get_current_active_user)) -> SimilarItems:
+    return await EmbeddingService.similar(SearchKind.AUDIENCE, audience_id, query, session, current_user)
@@ -1,18 +1,18 @@
 from typing import Annotated
 from fastapi import APIRouter, Depends, Response, Request
 from fastapi.security import OAuth2PasswordRequestForm
-from core.db import SessionDep
+from core.db import AsyncSessionDep
 
 from api.services import AuthService
 from api.schemas import UserCreate, UserReturn
 from core.exceptions import UnauthorizedException
+from core.timing import TimedRoute
 
-auth_router = APIRouter(prefix="/auth", tags=["Auth"])
+auth_router = APIRouter(prefix="/auth", tags=["Auth"], route_class=TimedRoute)
 
 
 @auth_router.post("/login")
-async def login(response: Response, form_data: Annotated[OAuth2PasswordRequestForm, Depends()], session: SessionDep):
-    print("entrou aqui")
+async def login(response: Response, form_data: Annotated[OAuth2PasswordRequestForm, Depends()], session: AsyncSessionDep):
     response_data = await AuthService.login(form_data, session)
     response.set_cookie(
         key="refresh_token", value=response_data["refresh_token"], httponly=True, secure=True)
@@ -25,14 +25,18 @@ async def login(response: Response, form_data: Annotated[OAuth2PasswordRequestFo
 
 
 @auth_router.post("/register", response_model=UserReturn)
-async def register_user(user: UserCreate, session: SessionDep) -> UserReturn:
+async def register_user(user: UserCreate, session: AsyncSessionDep) -> UserReturn:
     return await AuthService.register_user(user, session)
 
 
 @auth_router.post("/refresh")
-async def refresh_access_token(request: Request):
+async def refresh_access_token(request: Request, response: Response, session: AsyncSessionDep):
     refresh_token = request.cookies.get("refresh_token")
     if not refresh_token:
         raise UnauthorizedException("Refresh token not found")
 
-    return await AuthService.refresh_access_token(refresh_token=refresh_token)
+    response_data = await AuthService.refresh_access_token(refresh_token, session)
+    response.set_cookie(
+        key="refresh_token", value=response_data["refresh_token"], httponly=True, secure=True)
+
+    return response_data
@@ -1,38 +1,71 @@
-from typing import Optional, List
-from fastapi import APIRouter, Depends
+from typing import Annotated, Optional, List
+from fastapi import APIRouter, Depends, Header, Query, Request
+from fastapi.responses import StreamingResponse
 from sqlmodel import Session
 from uuid import UUID
 
-from api.services import BrandService
-from api.schemas import BrandCreate, BrandReturn, BrandUpdate, UserReturn
+from api.services import BrandService, EmbeddingService
+from api.schemas import BrandCreate, BrandFull, BrandPartial, BrandQuery, BrandReturn, BrandUpdate, JobReturn, Page, SimilarItems, SimilarQuery, UserReturn
 from api.dependencies import get_current_active_user
-from core.db import SessionDep
+from core.db import AsyncSessionDep
+from core.types import GenerationMode, SearchKind
+from core.responses import model_response
+from core.timing import TimedRoute
 
-brand_router = APIRouter(prefix="/brand", tags=["Brand"])
+brand_router = APIRouter(prefix="/brand", tags=["Brand"], route_class=TimedRoute)
 
 
-@brand_router.get("/", response_model=List[BrandReturn])
-async def get_all_brands(session: SessionDep, user_id: UUID = None, current_user: BrandReturn = Depends(get_current_active_user)) -> List[BrandReturn]:
-    if user_id:
-        return await BrandService.get_all_brands_by_user(user_id, session)
-    return await BrandService.get_all_brands(session)
+@brand_router.get("/", response_model=Page[BrandPartial], response_model_exclude_unset=True)
+async def get_all_brands(query: Annotated[BrandQuery, Query()], session: AsyncSessionDep, if_none_match: Annotated[Optional[str], Header()] = None, current_user: UserReturn = Depends(get_current_active_user)) -> Page[BrandPartial]:
+    return await BrandService.get_brands_page(query, session, if_none_match)
 
 
 @brand_router.get("/{brand_id}", response_model=BrandReturn)
-async def get_brand_by_id(brand_id: UUID, session: SessionDep, current_user: BrandReturn = Depends(get_current_active_user)) -> BrandReturn:
-    return await BrandService.get_brand_by_id(brand_id, session)
+async def get_brand_by_id(brand_id: UUID, session: AsyncSessionDep, if_none_match: Annotated[Optional[str], Header()] = None, current_user: BrandReturn = Depends(get_current_active_user)) -> BrandReturn:
+    return await BrandService.get_brand_by_id(brand_id, session, if_none_match)
 
 
-@brand_router.post("/", response_model=BrandReturn)
-async def create_brand(brand: BrandCreate, session: SessionDep, current_user: UserReturn = Depends(get_current_active_user)) -> BrandReturn:
+@brand_router.get("/{brand_id}/full", response_model=BrandFull)
+async def get_brand_aggregate(brand_id: UUID, session: AsyncSessionDep, current_user: UserReturn = Depends(get_current_active_user)) -> BrandFull:
+    return model_response(await BrandService.get_brand_aggregate(brand_id, session))
+
+
+@brand_router.get("/{brand_id}/similar", response_model=SimilarItems)
+async def get_similar_brands(brand_id: UUID, query: Annotated[SimilarQuery, Query()], session: AsyncSessionDep, current_user: UserReturn = Depends(get_current_active_user)) -> SimilarItems:
+    return await EmbeddingService.similar(SearchKind.BRAND, brand_id, query, session, current_user)
+
+
+@brand_router.post("/", response_model=JobReturn, status_code=202)
+async def create_brand(brand: BrandCreate, session: AsyncSessionDep, current_user: UserReturn = Depends(get_current_active_user)) -> JobReturn:
     return await BrandService.create_brand(brand, session, current_user)
 
 
+@brand_router.post("/import", response_model=JobReturn, status_code=202)
+async def import_brands(request: Request, session: AsyncSessionDep, generation_mode: Optional[GenerationMode] = None, current_user: UserReturn = Depends(get_current_active_user)) -> JobReturn:
+    brands = await BrandService.read_import(request)
+    return await BrandService.import_brands(brands, generation_mode, session, current_user)
+
+
 @brand_router.put("/{brand_id}", response_model=BrandReturn)
-async def update_brand(brand_id: UUID, brand: BrandUpdate, session: SessionDep, current_user: BrandReturn = Depends(get_current_active_user)) -> BrandReturn:
-    return await BrandService.update_brand(brand_id, brand, session)
+async def update_brand(brand_id: UUID, brand: BrandUpdate, session: AsyncSessionDep, current_user: UserReturn = Depends(get_current_active_user)) -> BrandReturn:
+    return await BrandService.update_brand(brand_id, brand, session, current_user)
+
+
+@brand_router.post("/{brand_id}/stream")
+async def stream_brand_step(brand_id: UUID, brand: BrandUpdate, session: AsyncSessionDep, current_user: UserReturn = Depends(get_current_active_user)) -> StreamingResponse:
+    events = await BrandService.stream_step_with_prompt(brand_id, brand, session)
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@brand_router.post("/{brand_id}/retry", response_model=JobReturn, status_code=202)
+async def retry_pending_steps(brand_id: UUID, session: AsyncSessionDep, current_user: UserReturn = Depends(get_current_active_user)) -> JobReturn:
+    return await BrandService.retry_pending_steps(brand_id, session, current_user)
 
 
 @brand_router.delete("/{brand_id}", response_model=BrandReturn)
-async def delete_brand(brand_id: UUID, session: SessionDep, current_user: BrandReturn = Depends(get_current_active_user)) -> BrandReturn:
+async def delete_brand(brand_id: UUID, session: AsyncSessionDep, current_user: BrandReturn = Depends(get_current_active_user)) -> BrandReturn:
     return await BrandService.delete_brand(brand_id, session)
@@ -0,0 +1,24 @@
+from fastapi import APIRouter, Depends
+
+from api.services import OpenAiService
+from api.schemas import UserReturn
+from api.dependencies import get_current_active_verified_superuser_user
+from core.db import get_pool_stats
+from core.timing import TimedRoute
+
+internal_router = APIRouter(prefix="/internal", tags=["Internal"], route_class=TimedRoute)
+
+
+@internal_router.get("/llm-cache")
+async def get_llm_cache_stats(current_user: UserReturn = Depends(get_current_active_verified_superuser_user)) -> dict:
+    return await OpenAiService.cache_stats()
+
+
+@internal_router.get("/llm-scheduler")
+async def get_llm_scheduler_stats(current_user: UserReturn = Depends(get_current_active_verified_superuser_user)) -> dict:
+    return OpenAiService.scheduler_stats()
+
+
+@internal_router.get("/db-pool")
+async def get_db_pool_stats(current_user: UserReturn = Depends(get_current_active_verified_superuser_user)) -> dict:
+    return get_pool_stats()
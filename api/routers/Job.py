@@ -0,0 +1,31 @@
+from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
+from uuid import UUID
+
+from api.services import JobService
+from api.schemas import JobReturn, UserReturn
+from api.dependencies import get_current_active_user
+from core.db import AsyncSessionDep
+from core.timing import TimedRoute
+
+job_router = APIRouter(prefix="/job", tags=["Job"], route_class=TimedRoute)
+
+
+@job_router.get("/{job_id}", response_model=JobReturn)
+async def get_job_by_id(job_id: UUID, session: AsyncSessionDep, current_user: UserReturn = Depends(get_current_active_user)) -> JobReturn:
+    return await JobService.get_job_by_id(job_id, session, current_user)
+
+
+@job_router.post("/{job_id}/retry", response_model=JobReturn, status_code=202)
+async def retry_job(job_id: UUID, session: AsyncSessionDep, current_user: UserReturn = Depends(get_current_active_user)) -> JobReturn:
+    return await JobService.retry_job(job_id, session, current_user)
+
+
+@job_router.get("/{job_id}/events")
+async def stream_job_events(job_id: UUID, session: AsyncSessionDep, current_user: UserReturn = Depends(get_current_active_user)) -> StreamingResponse:
+    job = await JobService.get_job_by_id(job_id, session, current_user)
+    return StreamingResponse(
+        JobService.stream_events(job.id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,15 @@
+from typing import Annotated
+from fastapi import APIRouter, Depends, Query
+
+from api.services import SearchService
+from api.schemas import Page, SearchHit, SearchQuery, UserReturn
+from api.dependencies import get_current_active_user
+from core.db import AsyncSessionDep
+from core.timing import TimedRoute
+
+search_router = APIRouter(prefix="/search", tags=["Search"], route_class=TimedRoute)
+
+
+@search_router.get("/", response_model=Page[SearchHit])
+async def search(query: Annotated[SearchQuery, Query()], session: AsyncSessionDep, current_user: UserReturn = Depends(get_current_active_user)) -> Page[SearchHit]:
+    return await SearchService.search(query, session, current_user)
@@ -1,21 +1,24 @@
-from typing import Optional, List
-from fastapi import APIRouter, Depends
+from typing import Annotated, Optional, List
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import ORJSONResponse
 from sqlmodel import Session
 from uuid import UUID
 
 from api.services import UserService
-from api.schemas import UserCreate, UserReturn
+from api.schemas import Page, UserCreate, UserPartial, UserQuery, UserReturn
 from api.dependencies import get_current_active_user, get_current_user
-from core.db import SessionDep
+from core.db import AsyncSessionDep
+from core.responses import orm_response
+from core.timing import TimedRoute
 
-user_router = APIRouter(prefix="/user", tags=["User"])
+user_router = APIRouter(prefix="/user", tags=["User"], route_class=TimedRoute)
 
 
-@user_router.get("/", response_model=List[UserReturn])
-async def get_all_users(session: SessionDep, current_user: UserReturn = Depends(get_current_active_user)) -> UserReturn:
-    return await UserService.get_all_users(session)
+@user_router.get("/", response_model=Page[UserPartial], response_model_exclude_unset=True)
+async def get_all_users(query: Annotated[UserQuery, Query()], session: AsyncSessionDep, current_user: UserReturn = Depends(get_current_active_user)) -> Page[UserPartial]:
+    return ORJSONResponse(await UserService.get_users_page(query, session))
 
 
 @user_router.get("/{user_id}", response_model=UserReturn)
-async def get_user_by_id(user_id: UUID, session: SessionDep, current_user: UserReturn = Depends(get_current_active_user)) -> UserReturn:
-    return await UserService.get_user_by_id(user_id, session)
+async def get_user_by_id(user_id: UUID, session: AsyncSessionDep, current_user: UserReturn = Depends(get_current_active_user)) -> UserReturn:
+    return orm_response(await UserService.get_user_by_id(user_id, session), UserReturn)
@@ -1,3 +1,8 @@
 from .User import user_router
 from .Auth import auth_router
 from .Brand import brand_router
+from .Internal import internal_router
+from .Job import job_router
+from .Audience import audience_router
+from .Metrics import metrics_router
+from .Search import search_router
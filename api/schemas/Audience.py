@@ -0,0 +1,114 @@
+from typing import Optional, List
+
+from pydantic import BaseModel, ConfigDict, Field, create_model
+from uuid import UUID
+
+
+class DemographicReturn(BaseModel):
+    id: UUID
+    audience_id: UUID
+    gender: Optional[str] = None
+    age_bracket: Optional[str] = None
+    hhi: Optional[str] = None
+    race: Optional[str] = None
+    education: Optional[str] = None
+    location: Optional[str] = None
+
+
+class TriggerReturn(BaseModel):
+    id: UUID
+    audience_id: UUID
+    name: str
+    description: str
+    image_prompt: str
+    trigger_img: Optional[str] = None
+    territory: Optional[str] = None
+
+
+class AudienceReturn(BaseModel):
+    id: UUID
+    brand_id: UUID
+    name: str
+    description: Optional[str] = None
+    image_prompt: Optional[str] = None
+    image_url: Optional[str] = None
+    key_tags: Optional[str] = None
+    psycho_graphic: Optional[str] = None
+    attitudinal: Optional[str] = None
+    self_concept: Optional[str] = None
+    lifestyle: Optional[str] = None
+    media_habits: Optional[str] = None
+    general_keywords: Optional[str] = None
+    brand_keywords: Optional[str] = None
+
+
+class AudienceFull(AudienceReturn):
+    demographics: Optional[DemographicReturn] = None
+    triggers: List[TriggerReturn] = []
+
+
+class AudienceGenerate(BaseModel):
+    count: int = Field(default=3, ge=1, le=10)
+    triggers_per_audience: int = Field(default=3, ge=1, le=10)
+
+
+# Shapes of the structured LLM responses; strict JSON schema needs every
+# field required and no extra keys.
+class AudienceDraft(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    name: str
+    description: str
+    image_prompt: str
+    key_tags: str
+    psycho_graphic: str
+    attitudinal: str
+    self_concept: str
+    lifestyle: str
+    media_habits: str
+    general_keywords: str
+    brand_keywords: str
+
+
+class AudienceOutline(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    audiences: List[AudienceDraft]
+
+
+class DemographicDraft(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    gender: str
+    age_bracket: str
+    hhi: str
+    race: str
+    education: str
+    location: str
+
+
+class TriggerDraft(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    name: str
+    description: str
+    image_prompt: str
+    territory: str
+
+
+class TriggerBatch(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    triggers: List[TriggerDraft]
+
+
+def audience_outline_model(count: int) -> type[AudienceOutline]:
+    """``AudienceOutline`` whose schema asks for at least ``count`` audiences."""
+    return create_model("AudienceOutline", __base__=AudienceOutline,
+                        audiences=(List[AudienceDraft], Field(json_schema_extra={"minItems": count})))
+
+
+def trigger_batch_model(count: int) -> type[TriggerBatch]:
+    """``TriggerBatch`` whose schema asks for at least ``count`` triggers."""
+    return create_model("TriggerBatch", __base__=TriggerBatch,
+                        triggers=(List[TriggerDraft], Field(json_schema_extra={"minItems": count})))
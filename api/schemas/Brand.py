@@ -1,9 +1,48 @@
-from typing import Optional
+from typing import Optional, List
 import re
 
-from pydantic import BaseModel, EmailStr, Field, field_validator
+from pydantic import BaseModel, ConfigDict, EmailStr, Field, create_model, field_validator
 from uuid import UUID
 
+from api.models.brand import Brand as __BrandModel__
+from api.schemas.Audience import AudienceFull
+from api.schemas.Pagination import PageQuery, partial_model
+from core.types import GenerationMode
+
+# Direct inputs of each generated section, in generation order. A section is
+# regenerated when the content of any of its inputs changes; everything
+# downstream follows transitively.
+BRAND_SECTION_DEPENDENCIES: dict[str, tuple[str, ...]] = {
+    "about": (),
+    "key_characteristics": ("about",),
+    "category": ("about",),
+    "positioning": ("about",),
+    "target_audience": ("about", "positioning"),
+    "key_competitors": ("about", "positioning", "target_audience"),
+}
+
+# The generated text columns of Brand, in generation order.
+BRAND_SECTIONS = tuple(BRAND_SECTION_DEPENDENCIES)
+
+# Checked explicitly rather than with assert, which -O strips.
+__unknown_sections__ = set(BRAND_SECTIONS) - set(__BrandModel__.model_fields)
+if __unknown_sections__:
+    raise RuntimeError(f"Brand has no column for sections {sorted(__unknown_sections__)}")
+if not all(
+    set(inputs) <= set(BRAND_SECTIONS[:BRAND_SECTIONS.index(section)])
+    for section, inputs in BRAND_SECTION_DEPENDENCIES.items()
+):
+    raise RuntimeError("BRAND_SECTION_DEPENDENCIES must list each section after its inputs")
+
+
+def brand_sections_model(sections: tuple[str, ...] = BRAND_SECTIONS) -> type[BaseModel]:
+    """Strict model for a single structured response holding ``sections``."""
+    return create_model(
+        "BrandSections",
+        __config__=ConfigDict(extra="forbid"),
+        **{section: (str, ...) for section in sections},
+    )
+
 
 class BrandReturn(BaseModel):
     id: UUID
@@ -16,12 +55,39 @@ class BrandReturn(BaseModel):
     target_audience: Optional[str] = Field(default=None, nullable=True)
     key_competitors: Optional[str] = Field(default=None, nullable=True)
     first_access: bool = Field(default=False)
+    pending_steps: Optional[List[str]] = None
     brand_summary_active: bool = Field(default=False, nullable=True)
     ad_legacy_active: bool = Field(default=False, nullable=True)
     strategic_goals_active: bool = Field(default=False, nullable=True)
     audience_active: bool = Field(default=False, nullable=True)
     brand_universe_active: bool = Field(default=False, nullable=True)
     user_id: UUID
+    version: int = 1
+
+
+BrandPartial = partial_model(BrandReturn)
+
+
+class BrandQuery(PageQuery):
+    user_id: Optional[UUID] = None
+    category: Optional[str] = None
+    first_access: Optional[bool] = None
+    brand_summary_active: Optional[bool] = None
+    ad_legacy_active: Optional[bool] = None
+    strategic_goals_active: Optional[bool] = None
+    audience_active: Optional[bool] = None
+    brand_universe_active: Optional[bool] = None
+
+
+class StrategicGoalReturn(BaseModel):
+    id: UUID
+    brand_id: UUID
+    strategic_goal: str
+
+
+class BrandFull(BrandReturn):
+    audiences: List[AudienceFull] = []
+    strategic_goals: List[StrategicGoalReturn] = []
 
 
 class BrandCreate(BaseModel):
@@ -29,6 +95,7 @@ class BrandCreate(BaseModel):
     website_url: Optional[str] = None
 
     user_id: Optional[UUID] = None
+    generation_mode: Optional[GenerationMode] = None
 
 
 class BrandUpdate(BaseModel):
@@ -49,3 +116,5 @@ class BrandUpdate(BaseModel):
     brand_universe_active: Optional[bool] = Field(default=False, nullable=True)
     prompt: Optional[str] = Field(default=None, nullable=True)
     rerun_step: Optional[str] = Field(default=None, nullable=True)
+    # The version the client last read; a stale one is rejected with 409.
+    version: Optional[int] = None
@@ -0,0 +1,16 @@
+from typing import Optional
+from datetime import datetime
+
+from pydantic import BaseModel
+from uuid import UUID
+
+
+class JobReturn(BaseModel):
+    id: UUID
+    kind: str
+    status: str
+    brand_id: Optional[UUID] = None
+    result: Optional[dict] = None
+    error: Optional[str] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
@@ -0,0 +1,24 @@
+from typing import Generic, List, Optional, TypeVar
+
+from pydantic import BaseModel, Field, create_model
+
+T = TypeVar("T")
+
+
+class PageQuery(BaseModel):
+    limit: int = Field(default=50, ge=1, le=500)
+    cursor: Optional[str] = None
+    fields: Optional[str] = None
+
+
+class Page(BaseModel, Generic[T]):
+    items: List[T]
+    next_cursor: Optional[str] = None
+
+
+def partial_model(model: type[BaseModel]) -> type[BaseModel]:
+    """Copy of ``model`` with every field optional, for sparse fieldset responses."""
+    fields = {
+        name: (Optional[field.annotation], None) for name, field in model.model_fields.items()
+    }
+    return create_model(f"{model.__name__}Partial", **fields)
@@ -0,0 +1,39 @@
+from typing import Optional
+from uuid import UUID
+
+from pydantic import BaseModel, Field
+
+from core.types import SearchKind
+
+
+class SearchQuery(BaseModel):
+    q: str = Field(min_length=1, max_length=200)
+    kinds: Optional[str] = None
+    brand_id: Optional[UUID] = None
+    limit: int = Field(default=20, ge=1, le=100)
+    cursor: Optional[str] = None
+
+
+class SearchHit(BaseModel):
+    kind: SearchKind
+    id: UUID
+    brand_id: UUID
+    audience_id: Optional[UUID] = None
+    title: str
+    snippet: Optional[str] = None
+    rank: float
+
+
+class SimilarQuery(BaseModel):
+    k: int = Field(default=10, ge=1, le=50)
+
+
+class SimilarHit(BaseModel):
+    id: UUID
+    brand_id: UUID
+    name: str
+    score: float
+
+
+class SimilarItems(BaseModel):
+    items: list[SimilarHit]
@@ -4,6 +4,8 @@ import re
 from pydantic import BaseModel, EmailStr, Field, field_validator
 from uuid import UUID
 
+from api.schemas.Pagination import PageQuery, partial_model
+
 
 class UserReturn(BaseModel):
     id: UUID
@@ -14,6 +16,15 @@ class UserReturn(BaseModel):
     is_verified: bool
 
 
+UserPartial = partial_model(UserReturn)
+
+
+class UserQuery(PageQuery):
+    is_active: Optional[bool] = None
+    is_verified: Optional[bool] = None
+    is_superuser: Optional[bool] = None
+
+
 class UserCreate(BaseModel):
     username: str
     email: EmailStr
@@ -1,2 +1,6 @@
+from api.schemas.Pagination import *
 from api.schemas.User import *
+from api.schemas.Audience import *
 from api.schemas.Brand import *
+from api.schemas.Job import *
+from api.schemas.Search import *
@@ -0,0 +1,178 @@
+import asyncio
+from uuid import UUID, uuid4
+
+from api.services.Brand import BrandService
+from api.services.Embedding import EmbeddingService
+from api.services.Job import JobService
+from api.services.OpenAi import ChatOptions, OpenAiService
+from api.repositories import AudienceRepository, BrandRepository
+from api.models import Brand, Job, User
+from api.schemas import (AudienceFull, AudienceGenerate, AudienceOutline, DemographicDraft, TriggerBatch,
+                         audience_outline_model, trigger_batch_model)
+from core.exceptions import *
+from core.db import AsyncSessionDep
+from core.jobs import job_queue
+from core.types import JobKind, SearchKind
+
+from core.config import get_settings
+settings = get_settings()
+
+
+class AudienceService:
+
+    @staticmethod
+    async def get_audiences(brand_id: UUID, session: AsyncSessionDep) -> list[AudienceFull]:
+        audiences = await AudienceRepository.get_audiences_by_brand(brand_id, session)
+        return [AudienceFull.model_validate(audience, from_attributes=True) for audience in audiences]
+
+    @staticmethod
+    async def get_audience_by_id(audience_id: UUID, session: AsyncSessionDep) -> AudienceFull:
+        audience = await AudienceRepository.get_audience_by_id(audience_id, session)
+        if not audience:
+            raise NotFoundException("Audience not found")
+        return AudienceFull.model_validate(audience, from_attributes=True)
+
+    @staticmethod
+    async def generate_audiences(brand_id: UUID, request: AudienceGenerate, session: AsyncSessionDep, current_user: User) -> Job:
+        brand = await BrandRepository.get_brand_by_id(brand_id, session)
+        if not brand:
+            raise NotFoundException("Brand not found")
+
+        return await JobService.create_job(
+            JobKind.GENERATE_AUDIENCES, current_user.id, session, brand_id=brand_id,
+            payload=request.model_dump(),
+            result={"outline": None, "details": {}, "failed": []},
+        )
+
+    @staticmethod
+    async def run_generation_job(job: Job, session: AsyncSessionDep) -> None:
+        """Outline the audiences in one call, then generate each audience's
+        demographics and triggers concurrently and insert everything at once.
+
+        Every finished sub-task is saved on the job, so retrying a failed job
+        only regenerates what is missing.
+        """
+        if (job.result or {}).get("audience_ids"):
+            return
+
+        brand = await BrandRepository.get_brand_by_id(job.brand_id, session)
+        if not brand:
+            raise NotFoundException("Brand not found")
+        request = AudienceGenerate.model_validate(job.payload or {})
+
+        outline = (job.result or {}).get("outline")
+        if not outline:
+            try:
+                outline = (await AudienceService.__outline__(brand, request.count, session)).model_dump()["audiences"]
+            except Exception:
+                await JobService.annotate(job, {"failed": ["outline"]}, session)
+                raise InternalServerError("Failed to outline the audiences")
+            await JobService.annotate(job, {"outline": outline, "failed": []}, session)
+            job_queue.publish(job.id, "outline", {"audiences": [audience["name"] for audience in outline]})
+
+        details = dict((job.result or {}).get("details", {}))
+        semaphore = asyncio.Semaphore(settings.AUDIENCE_GENERATION_CONCURRENCY)
+
+        async def generate(key: str, audience: dict, part: str) -> tuple[str, dict | list | None]:
+            async with semaphore:
+                try:
+                    if part == "demographics":
+                        return key, (await AudienceService.__demographics__(brand, audience, session)).model_dump()
+                    triggers = await AudienceService.__triggers__(brand, audience, request.triggers_per_audience, session)
+                    return key, triggers.model_dump()["triggers"]
+                except Exception:
+                    return key, None
+
+        tasks = [
+            generate(f"{index}:{part}", audience, part)
+            for index, audience in enumerate(outline)
+            for part in ("demographics", "triggers")
+            if f"{index}:{part}" not in details
+        ]
+        failed = []
+        for next_part in asyncio.as_completed(tasks):
+            key, content = await next_part
+            if content is None:
+                failed.append(key)
+            else:
+                details[key] = content
+            await JobService.annotate(job, {"details": details, "failed": failed}, session)
+            job_queue.publish(job.id, "failed" if content is None else "part", {"step": key})
+
+        if failed:
+            raise InternalServerError(f"{len(failed)} audience parts failed; retry the job to resume")
+
+        audiences, demographics, triggers = [], [], []
+        for index, draft in enumerate(outline):
+            audience_id = uuid4()
+            audiences.append({**draft, "id": audience_id, "brand_id": brand.id})
+            demographics.append({**details[f"{index}:demographics"], "audience_id": audience_id})
+            triggers.extend({**trigger, "audience_id": audience_id} for trigger in details[f"{index}:triggers"])
+
+        # Saved in the same transaction as the rows, so a resumed job never inserts twice.
+        job.sqlmodel_update({"result": {**job.result, "audience_ids": [str(audience["id"]) for audience in audiences]}})
+        session.add(job)
+        await AudienceRepository.create_audiences(brand.id, audiences, demographics, triggers, session)
+        EmbeddingService.schedule(SearchKind.AUDIENCE, [audience["id"] for audience in audiences])
+
+    @staticmethod
+    def __brand_context__(brand: Brand) -> str:
+        return f"""You are tasked with defining audiences for {brand.name}.
+                   About: {brand.about}
+                   Category: {brand.category}
+                   Positioning: {brand.positioning}
+                   Target audience: {brand.target_audience}
+                   Key characteristics: {brand.key_characteristics}"""
+
+    @staticmethod
+    async def __outline__(brand: Brand, count: int, session: AsyncSessionDep) -> AudienceOutline:
+        outline = await OpenAiService.chat_structured(
+            system=BrandService.system,
+            assistant=AudienceService.__brand_context__(brand),
+            user=f"""Define {count} distinct audience segments for {brand.name}. For each one give a short name, a one paragraph description,
+                    a prompt to generate a portrait image of a representative person, 3 to 5 comma separated key tags, and one or two
+                    sentences each for psychographics, attitudes, self-concept, lifestyle and media habits, followed by comma separated
+                    general keywords and brand keywords.""",
+            session=session,
+            schema=audience_outline_model(count),
+            name="audience_outline",
+            options=ChatOptions(max_tokens=settings.AUDIENCE_STRUCTURED_MAX_TOKENS),
+        )
+        if len(outline.audiences) < count:
+            raise InternalServerError(f"Expected {count} audiences, got {len(outline.audiences)}")
+        outline.audiences = outline.audiences[:count]
+        return outline
+
+    @staticmethod
+    async def __demographics__(brand: Brand, audience: dict, session: AsyncSessionDep) -> DemographicDraft:
+        return await OpenAiService.chat_structured(
+            system=BrandService.system,
+            assistant=AudienceService.__brand_context__(brand),
+            user=f"""Give the demographics of the "{audience['name']}" audience ({audience['description']}):
+                    dominant gender, age bracket, household income bracket, race/ethnicity mix, education level and main locations.
+                    Keep each value short.""",
+            session=session,
+            schema=DemographicDraft,
+            name="audience_demographics",
+        )
+
+    @staticmethod
+    async def __triggers__(brand: Brand, audience: dict, count: int, session: AsyncSessionDep) -> TriggerBatch:
+        triggers = await OpenAiService.chat_structured(
+            system=BrandService.system,
+            assistant=AudienceService.__brand_context__(brand),
+            user=f"""List {count} emotional triggers that would move the "{audience['name']}" audience ({audience['description']}) towards {brand.name}.
+                    For each give a short name, a one paragraph description, a prompt to generate an image that evokes it, and the
+                    creative territory it belongs to in two or three words.""",
+            session=session,
+            schema=trigger_batch_model(count),
+            name="audience_triggers",
+            options=ChatOptions(max_tokens=settings.AUDIENCE_STRUCTURED_MAX_TOKENS),
+        )
+        if not triggers.triggers:
+            raise InternalServerError("No triggers generated")
+        triggers.triggers = triggers.triggers[:count]
+        return triggers
+
+
+job_queue.register(JobKind.GENERATE_AUDIENCES, AudienceService.run_generation_job)
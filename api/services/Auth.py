@@ -2,37 +2,122 @@ from pydantic import EmailStr
 from email_validator import validate_email
 from fastapi.security import OAuth2PasswordRequestForm
 from api.repositories.User import UserRepository
-from api.models import User
+from api.repositories.Token import TokenRepository
+from api.models import RevokedToken, User
 from api.schemas import UserCreate, UserReturn
 from core.exceptions import *
 from core.security import (
-    verify_password,
+    verify_and_rehash_password,
     create_access_token,
     create_refresh_token,
+    principal_cache,
+    revoked_tokens,
     verify_token,
 )
-from core.db import SessionDep
+from core.db import AsyncSessionDep, async_session_maker
+from core.types import RevocationKind, TokenType
 
-from datetime import timedelta
+from datetime import UTC, datetime, timedelta
+from uuid import UUID, uuid4
 
 from core.config import get_settings
 settings = get_settings()
 
+# revoked_at of the newest revocation mirrored into ``revoked_tokens``.
+__revocations_synced_at__: datetime | None = None
+
 
 class AuthService:
     @staticmethod
-    async def login(form_data: OAuth2PasswordRequestForm, session: SessionDep) -> dict:
+    async def login(form_data: OAuth2PasswordRequestForm, session: AsyncSessionDep) -> dict:
         user = await UserRepository.get_user_by_email(form_data.username, session)
-        if not user or not verify_password(form_data.password, user.hashed_password):
+        if not user:
+            raise UnauthorizedException("Invalid credentials")
+
+        verified, new_hash = await verify_and_rehash_password(form_data.password, user.hashed_password)
+        if not verified:
             raise UnauthorizedException("Invalid credentials")
+        if new_hash:
+            user = await UserRepository.update_user(user, {"hashed_password": new_hash}, session)
+
+        return AuthService.__issue_tokens__(UserReturn.model_validate(user, from_attributes=True), uuid4().hex)
+
+    @staticmethod
+    async def refresh_access_token(refresh_token: str, session: AsyncSessionDep) -> dict:
+        """Rotate a refresh token: revoke the presented one and issue a new pair in the same family.
+
+        Presenting a token that was already rotated out means it leaked, so the
+        whole family is revoked and the user has to log in again.
+        """
+        token_data = verify_token(refresh_token, TokenType.REFRESH)
+        if not token_data or not token_data.get("jti") or not token_data.get("fam"):
+            raise UnauthorizedException("Invalid refresh token")
+        try:
+            user_id = UUID(token_data.get("sub"))
+        except (TypeError, ValueError):
+            raise UnauthorizedException("Invalid refresh token")
+
+        await AuthService.__sync_revocations__(session)
+        family = token_data["fam"]
+        if family in revoked_tokens:
+            raise UnauthorizedException("Refresh token revoked")
+
+        expires_at = datetime.fromtimestamp(token_data["exp"], UTC).replace(tzinfo=None)
+        if token_data["jti"] in revoked_tokens or not await TokenRepository.revoke_token(
+                token_data["jti"], RevocationKind.TOKEN, expires_at, session):
+            await AuthService.__revoke_family__(family, session)
+            raise UnauthorizedException("Refresh token reuse detected")
+        revoked_tokens.add(token_data["jti"], token_data["exp"])
+
+        principal = principal_cache.get(user_id)
+        if principal is None:
+            user = await UserRepository.get_user_by_id(user_id, session)
+            if not user:
+                raise UnauthorizedException("Invalid refresh token")
+            principal = UserReturn.model_validate(user, from_attributes=True)
+            principal_cache.set(user_id, principal)
+        if not principal.is_active:
+            raise ForbiddenException("Inactive user.")
+
+        return AuthService.__issue_tokens__(principal, family)
+
+    @staticmethod
+    async def load_revocations() -> None:
+        """Drop expired revocations and mirror the rest into memory."""
+        global __revocations_synced_at__
+        now = datetime.now(UTC).replace(tzinfo=None)
+        async with async_session_maker() as session:
+            await TokenRepository.delete_expired_tokens(now, session)
+            revocations = await TokenRepository.get_revoked_tokens(now, session)
+        revoked_tokens.clear()
+        __revocations_synced_at__ = now
+        AuthService.__mirror__(revocations)
+
+    @staticmethod
+    async def register_user(user: UserCreate, session: AsyncSessionDep) -> UserReturn:
+        existing_user = await UserRepository.get_user_by_email(user.email, session)
+        if existing_user:
+            raise ConflictException("User already exists")
+        user = await UserRepository.create_user(user, session)
 
-        access_token_expires = timedelta(
-            minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTE)
+        return user
+
+    @staticmethod
+    def __issue_tokens__(principal: UserReturn, family: str) -> dict:
         access_token = create_access_token(
-            data={"sub": str(user.id), "is_superuser": user.is_superuser}, expires_delta=access_token_expires
+            data={
+                "sub": str(principal.id),
+                "is_superuser": principal.is_superuser,
+                "principal": principal.model_dump(mode="json", exclude={"id"}),
+            },
+            expires_delta=timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTE),
         )
-        refresh_token = create_refresh_token(
-            data={"sub": str(user.id), "is_superuser": user.is_superuser})
+        refresh_token = create_refresh_token(data={
+            "sub": str(principal.id),
+            "is_superuser": principal.is_superuser,
+            "jti": uuid4().hex,
+            "fam": family,
+        })
 
         return {
             "access_token": access_token,
@@ -41,10 +126,25 @@ class AuthService:
         }
 
     @staticmethod
-    async def register_user(user: UserCreate, session: SessionDep) -> UserReturn:
-        existing_user = await UserRepository.get_user_by_email(user.email, session)
-        if existing_user:
-            raise ConflictException("User already exists")
-        user = await UserRepository.create_user(user, session)
+    async def __revoke_family__(family: str, session: AsyncSessionDep) -> None:
+        # Every token of the family expires within a refresh lifetime from now.
+        expires_at = datetime.now(UTC).replace(tzinfo=None) + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAY)
+        await TokenRepository.revoke_token(family, RevocationKind.FAMILY, expires_at, session)
+        revoked_tokens.add(family, expires_at.replace(tzinfo=UTC).timestamp())
 
-        return user
+    @staticmethod
+    async def __sync_revocations__(session: AsyncSessionDep) -> None:
+        """Pick up revocations made by other workers every ``REVOCATION_SYNC_SECONDS``."""
+        global __revocations_synced_at__
+        now = datetime.now(UTC).replace(tzinfo=None)
+        if __revocations_synced_at__ is not None and (now - __revocations_synced_at__).total_seconds() < settings.REVOCATION_SYNC_SECONDS:
+            return
+        # Overlap the previous window so rows committed late are not missed.
+        since = __revocations_synced_at__ - timedelta(seconds=settings.REVOCATION_SYNC_SECONDS) if __revocations_synced_at__ else None
+        __revocations_synced_at__ = now
+        AuthService.__mirror__(await TokenRepository.get_revoked_tokens(now, session, since=since))
+
+    @staticmethod
+    def __mirror__(revocations: list[RevokedToken]) -> None:
+        for revocation in revocations:
+            revoked_tokens.add(revocation.token_id, revocation.expires_at.replace(tzinfo=UTC).timestamp())
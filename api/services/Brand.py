@@ -1,14 +1,34 @@
-from pydantic import EmailStr
+import asyncio
+import csv
+import hashlib
+import io
+import json
+import time
+from typing import AsyncIterator
+from pydantic import EmailStr, TypeAdapter, ValidationError
 from email_validator import validate_email
 from uuid import UUID
-from fastapi.responses import JSONResponse
+from fastapi import Request, Response
+from fastapi.responses import ORJSONResponse
 
-from api.services.OpenAi import OpenAiService
+from api.services.OpenAi import ChatOptions, OpenAiService
+from api.services.Embedding import EmbeddingService
+from api.services.Job import JobService
 from api.repositories import BrandRepository
-from api.models import Brand, User
-from api.schemas import BrandCreate, BrandReturn, BrandUpdate
+from api.models import Brand, User, Job
+from api.schemas import BRAND_SECTION_DEPENDENCIES, BRAND_SECTIONS, BrandCreate, BrandFull, BrandQuery, BrandReturn, BrandUpdate, JobReturn, brand_sections_model
 from core.exceptions import *
-from core.db import SessionDep
+from core.db import AsyncSessionDep, async_session_maker
+from core.jobs import job_queue
+from core.responses import etag_matches, make_etag, not_modified, orm_response
+from core.sse import format_sse
+from core.types import GenerationMode, JobKind, JobStatus, Priority, SearchKind
+
+from core.config import get_settings
+settings = get_settings()
+
+
+__brand_rows__ = TypeAdapter(list[BrandCreate])
 
 
 class BrandService:
@@ -18,77 +38,348 @@ class BrandService:
                 campaigns with a sharp focus on consumer insights and strategic creativity."""
 
     @staticmethod
-    async def get_all_brands(session: SessionDep) -> list[BrandReturn]:
-        return await BrandRepository.get_all_brands(session)
+    async def get_brands_page(query: BrandQuery, session: AsyncSessionDep, if_none_match: str | None = None) -> Response:
+        """A page of brands with an ETag over the versions of its rows.
 
-    @staticmethod
-    async def get_all_brands_by_user(user_id: UUID, session: SessionDep) -> list[BrandReturn]:
-        return await BrandRepository.get_all_brands_by_user(user_id, session)
+        With If-None-Match the ETag is first checked with a query reading only
+        ids and versions, so an unchanged page is answered with 304 without
+        loading any text column.
+        """
+        if if_none_match:
+            versions, next_cursor = await BrandRepository.get_brands_page_versions(query, session)
+            etag = make_etag(query.fields, next_cursor, *versions)
+            if etag_matches(if_none_match, etag):
+                return not_modified(etag)
+
+        items, next_cursor, versions = await BrandRepository.get_brands_page(query, session)
+        return ORJSONResponse({"items": items, "next_cursor": next_cursor},
+                              headers={"ETag": make_etag(query.fields, next_cursor, *versions)})
 
     @staticmethod
-    async def get_brand_by_id(brand_id: UUID, session: SessionDep) -> BrandReturn:
+    async def get_brand_by_id(brand_id: UUID, session: AsyncSessionDep, if_none_match: str | None = None) -> Response:
+        if if_none_match:
+            version = await BrandRepository.get_brand_version(brand_id, session)
+            if not version:
+                raise NotFoundException("Brand not found")
+            if etag_matches(if_none_match, make_etag(*version)):
+                return not_modified(make_etag(*version))
+
         brand = await BrandRepository.get_brand_by_id(brand_id, session)
         if not brand:
             raise NotFoundException("Brand not found")
-        return brand
+        return BrandService.__brand_response__(brand)
 
     @staticmethod
-    async def create_brand(brand: BrandCreate, session: SessionDep, current_user: User) -> BrandReturn:
+    async def get_brand_aggregate(brand_id: UUID, session: AsyncSessionDep) -> BrandFull:
+        brand = await BrandRepository.get_brand_aggregate(brand_id, session)
+        if not brand:
+            raise NotFoundException("Brand not found")
+        return BrandFull.model_validate(brand, from_attributes=True)
+
+    @staticmethod
+    async def create_brand(brand: BrandCreate, session: AsyncSessionDep, current_user: User) -> Job:
         existing_brand = await BrandRepository.get_brand_by_name(brand.name, session, current_user.id)
         if existing_brand:
             raise ConflictException("Brand already exists")
 
-        prompts = {
-            "about": f"Write {brand.name}'s history, mission, and core values in one or two concise paragraphs. Do not include any analysis or explanation.",
-            "key_characteristics": f"List 3 to 4 bullet points highlighting {brand.name}'s defining qualities. Use only the bullet points with no explanation or introduction.",
-            "category": f"Provide the primary industry of {brand.name} in one or two words, e.g., 'luxury fashion', 'consumer electronics'. Do not explain.",
-            "positioning": f"In one or two sentences, describe how {brand.name} is positioned in the market. Do not add any introduction or explanation.",
-            "target_audience": f"List 3 to 4 bullet points describing {brand.name}'s key demographics and psychographics. Do not include any explanation.",
-            "key_competitors": f"List up to 3 major competitors for {brand.name}, each with a brief description of what differentiates them. Do not include any introduction or explanation.",
-        }
-        brand_data = brand.model_dump()
+        brand_data = brand.model_dump(exclude={"generation_mode"})
         brand_data["user_id"] = current_user.id
-        for key, prompt in prompts.items():
-            response = await OpenAiService.chat(system=BrandService.system,
-                                                assistant=f"""You are tasked with generating content for {brand.name}.
-                                                            Refer to the brand's official website at {brand.website_url}
-                                                            for desambiguation and accuracy, but, search for information in an broad array of sources.
-                                                            If any section lacks data, mark it as "INSIGHTS NEEDED" for the client to complete.""",
-                                                user=prompt,
-                                                session=session,
-                                                )
-            brand_data[key] = response
+        brand_data["pending_steps"] = list(BRAND_SECTIONS)
 
+        mode = brand.generation_mode
         brand = await BrandRepository.create_brand(brand_data, session)
         if not brand:
             raise InternalServerError("Failed to create brand")
 
-        return brand
+        return await JobService.create_job(
+            JobKind.GENERATE_BRAND, current_user.id, session, brand_id=brand.id, payload={"mode": mode})
+
+    @staticmethod
+    async def read_import(request: Request) -> list[BrandCreate]:
+        """Parse a bulk import sent as a JSON list, a CSV body or a multipart ``file`` upload."""
+        content_type = request.headers.get("content-type", "")
+        if content_type.startswith("multipart/form-data"):
+            upload = (await request.form()).get("file")
+            if upload is None or isinstance(upload, str):
+                raise BadRequestException("Upload the brands as a 'file' field")
+            body = await upload.read()
+            is_csv = (upload.filename or "").lower().endswith(".csv") or (upload.content_type or "").startswith("text/csv")
+        else:
+            body = await request.body()
+            is_csv = content_type.startswith("text/csv")
+
+        try:
+            if is_csv:
+                rows = [
+                    {key.strip(): (value or "").strip() or None for key, value in row.items() if key}
+                    for row in csv.DictReader(io.StringIO(body.decode("utf-8-sig")))
+                ]
+            else:
+                rows = json.loads(body)
+                if isinstance(rows, dict):
+                    rows = rows.get("brands")
+        except (UnicodeDecodeError, csv.Error, json.JSONDecodeError) as e:
+            raise BadRequestException(f"Could not parse the import: {e}")
+
+        if not isinstance(rows, list) or not rows:
+            raise BadRequestException("The import must be a non-empty list of brands")
+        if len(rows) > settings.BRAND_IMPORT_MAX_ROWS:
+            raise BadRequestException(f"An import holds at most {settings.BRAND_IMPORT_MAX_ROWS} brands")
+
+        try:
+            return __brand_rows__.validate_python(rows)
+        except ValidationError as e:
+            error = e.errors()[0]
+            raise BadRequestException(f"Row {error['loc'][0] + 1}: {error['loc'][-1]} {error['msg'].lower()}")
+
+    @staticmethod
+    async def import_brands(brands: list[BrandCreate], mode: GenerationMode | None, session: AsyncSessionDep, current_user: User) -> Job:
+        """Create every new brand of an import in batches and queue one job generating them all.
+
+        Names already taken by the user, or repeated within the import, are skipped.
+        """
+        unique = {}
+        for brand in brands:
+            unique.setdefault(brand.name, brand)
+        existing = await BrandRepository.get_existing_brand_names(list(unique), session, current_user.id)
+
+        created = await BrandRepository.create_brands([
+            {
+                **brand.model_dump(exclude={"generation_mode"}),
+                "user_id": current_user.id,
+                "pending_steps": list(BRAND_SECTIONS),
+            }
+            for name, brand in unique.items() if name not in existing
+        ], session, settings.BRAND_IMPORT_BATCH_SIZE)
+
+        created_names = {brand.name for brand in created}
+        skipped, seen = [], set()
+        for brand in brands:
+            if brand.name in seen:
+                skipped.append({"name": brand.name, "reason": "duplicate"})
+            elif brand.name not in created_names:
+                skipped.append({"name": brand.name, "reason": "exists"})
+            seen.add(brand.name)
+
+        return await JobService.create_job(
+            JobKind.IMPORT_BRANDS, current_user.id, session,
+            payload={"mode": mode, "brand_ids": [str(brand.id) for brand in created]},
+            result={
+                "brands": {str(brand.id): {"name": brand.name, "status": JobStatus.PENDING} for brand in created},
+                "skipped": skipped,
+            },
+        )
+
+    @staticmethod
+    async def run_import_job(job: Job, session: AsyncSessionDep) -> None:
+        mode = GenerationMode((job.payload or {}).get("mode") or settings.BRAND_GENERATION_MODE)
+        progress = (job.result or {}).get("brands", {})
+        brand_ids = [
+            brand_id for brand_id in (job.payload or {}).get("brand_ids", [])
+            if progress.get(brand_id, {}).get("status") != JobStatus.SUCCEEDED
+        ]
+
+        # Brands generate concurrently, each in its own session; the job row is
+        # shared, so its progress updates are serialized.
+        lock = asyncio.Lock()
+        semaphore = asyncio.Semaphore(settings.BRAND_IMPORT_CONCURRENCY)
+
+        async def report(brand_id: str, **update) -> None:
+            async with lock:
+                await JobService.record_brand(job, brand_id, update, session)
+
+        async def generate(brand_id: str) -> None:
+            async with semaphore:
+                await report(brand_id, status=JobStatus.RUNNING)
+                generated, failed = [], []
+                try:
+                    async with async_session_maker() as brand_session:
+                        brand = await BrandRepository.get_brand_by_id(UUID(brand_id), brand_session)
+                        if not brand:
+                            raise NotFoundException("Brand not found")
+                        async for step, content in BrandService.__generate_brand__(brand, mode, brand_session, {}):
+                            (generated if content else failed).append(step)
+                except Exception as e:
+                    await report(brand_id, status=JobStatus.FAILED, error=getattr(e, "detail", str(e)))
+                    return
+
+                status = JobStatus.FAILED if failed and not generated else JobStatus.SUCCEEDED
+                await report(brand_id, status=status, failed=failed)
+
+        await asyncio.gather(*(generate(brand_id) for brand_id in brand_ids))
+
+    @staticmethod
+    async def retry_pending_steps(brand_id: UUID, session: AsyncSessionDep, current_user: User) -> Job:
+        existing_brand = await BrandRepository.get_brand_by_id(brand_id, session)
+        if not existing_brand:
+            raise NotFoundException("Brand not found")
+
+        if not existing_brand.pending_steps:
+            raise ConflictException("Brand has no pending steps")
+
+        return await JobService.create_job(JobKind.GENERATE_BRAND, current_user.id, session, brand_id=brand_id)
+
+    @staticmethod
+    async def run_generation_job(job: Job, session: AsyncSessionDep) -> None:
+        brand = await BrandRepository.get_brand_by_id(job.brand_id, session)
+        if not brand:
+            raise NotFoundException("Brand not found")
+
+        stats = {"mode": GenerationMode((job.payload or {}).get("mode") or settings.BRAND_GENERATION_MODE)}
+        started = time.perf_counter()
+        async for step, content in BrandService.__generate_brand__(brand, stats["mode"], session, stats):
+            await JobService.record_section(job, step, content, session)
+
+        stats["elapsed_ms"] = round((time.perf_counter() - started) * 1000)
+        await JobService.annotate(job, stats, session)
+
+        if job.result["failed"] and not job.result["sections"]:
+            raise InternalServerError("Failed to generate brand content")
+
+    @staticmethod
+    async def __generate_brand__(brand: Brand, mode: GenerationMode, session: AsyncSessionDep, stats: dict) -> AsyncIterator[tuple[str, str | None]]:
+        """Generate the brand's pending sections, saving each one on the brand as it finishes.
+
+        Each section is saved with the hash of the inputs it was generated
+        from, taken before any of this run's sections were written.
+        """
+        pending = list(brand.pending_steps or [])
+        failed = []
+        generated = []
+        input_hashes = {step: BrandService.__input_hash__(brand, step) for step in pending if step in BRAND_SECTION_DEPENDENCIES}
+        if mode == GenerationMode.STRUCTURED:
+            sections = BrandService.__generate_structured__(brand, session, list(pending), stats)
+        else:
+            sections = BrandService.__generate_sections__(brand, session, steps=list(pending))
+
+        async for step, content in sections:
+            pending.remove(step)
+            update_data = {"pending_steps": pending + failed}
+            if content is None:
+                failed.append(step)
+                update_data["pending_steps"].append(step)
+            else:
+                generated.append(step)
+                update_data[step] = content
+                if step in input_hashes:
+                    update_data["section_hashes"] = {**(brand.section_hashes or {}), step: input_hashes[step]}
+
+            brand = await BrandRepository.update_brand(brand, update_data, session)
+            yield step, content
+
+        if generated:
+            EmbeddingService.schedule(SearchKind.BRAND, [brand.id])
+
+    @staticmethod
+    def __prompts__(name: str) -> dict[str, str]:
+        return {
+            "about": f"Write {name}'s history, mission, and core values in one or two concise paragraphs. Do not include any analysis or explanation.",
+            "key_characteristics": f"List 3 to 4 bullet points highlighting {name}'s defining qualities. Use only the bullet points with no explanation or introduction.",
+            "category": f"Provide the primary industry of {name} in one or two words, e.g., 'luxury fashion', 'consumer electronics'. Do not explain.",
+            "positioning": f"In one or two sentences, describe how {name} is positioned in the market. Do not add any introduction or explanation.",
+            "target_audience": f"List 3 to 4 bullet points describing {name}'s key demographics and psychographics. Do not include any explanation.",
+            "key_competitors": f"List up to 3 major competitors for {name}, each with a brief description of what differentiates them. Do not include any introduction or explanation.",
+        }
+
+    @staticmethod
+    async def __generate_sections__(brand: BrandCreate | Brand, session: AsyncSessionDep, steps: list[str] | None = None) -> AsyncIterator[tuple[str, str | None]]:
+        """Generate the brand profile sections concurrently, yielding each one as it finishes.
+
+        A section whose completion failed is yielded with ``None`` so the caller
+        can mark it for retry.
+        """
+        prompts = BrandService.__prompts__(brand.name)
+        if steps is not None:
+            prompts = {key: prompts[key] for key in steps if key in prompts}
+
+        semaphore = asyncio.Semaphore(settings.BRAND_GENERATION_CONCURRENCY)
+
+        async def generate(key: str, prompt: str) -> tuple[str, str | None]:
+            async with semaphore:
+                try:
+                    response = await OpenAiService.chat(system=BrandService.system,
+                                                        assistant=f"""You are tasked with generating content for {brand.name}.
+                                                                    Refer to the brand's official website at {brand.website_url}
+                                                                    for desambiguation and accuracy, but, search for information in an broad array of sources.
+                                                                    If any section lacks data, mark it as "INSIGHTS NEEDED" for the client to complete.""",
+                                                        user=prompt,
+                                                        session=session,
+                                                        )
+                except Exception:
+                    response = None
+                return key, response or None
+
+        for next_section in asyncio.as_completed([generate(key, prompt) for key, prompt in prompts.items()]):
+            yield await next_section
 
     @staticmethod
-    async def update_brand(brand_id: UUID, brand: BrandUpdate, session: SessionDep) -> BrandReturn | JSONResponse:
+    async def __generate_structured__(brand: BrandCreate | Brand, session: AsyncSessionDep, steps: list[str], stats: dict) -> AsyncIterator[tuple[str, str | None]]:
+        """Generate every requested section with one JSON-schema-constrained completion.
+
+        Falls back to per-field generation when the call fails or the response
+        does not validate against the sections schema.
+        """
+        prompts = BrandService.__prompts__(brand.name)
+        steps = [step for step in steps if step in prompts]
+        model = brand_sections_model(tuple(steps))
+        instructions = "\n".join(f"- {step}: {prompts[step]}" for step in steps)
+
+        try:
+            sections = await OpenAiService.chat_structured(system=BrandService.system,
+                                                           assistant=f"""You are tasked with generating content for {brand.name}.
+                                                                       Refer to the brand's official website at {brand.website_url}
+                                                                       for desambiguation and accuracy, but, search for information in an broad array of sources.
+                                                                       If any section lacks data, mark it as "INSIGHTS NEEDED" for the client to complete.""",
+                                                           user=f"""Write every section below and answer with a single JSON object whose keys are the section names.
+                                                                   {instructions}""",
+                                                           session=session,
+                                                           schema=model,
+                                                           name="brand_sections",
+                                                           options=ChatOptions(max_tokens=settings.BRAND_STRUCTURED_MAX_TOKENS),
+                                                           )
+        except Exception:
+            stats["fallback"] = True
+            async for section in BrandService.__generate_sections__(brand, session, steps=steps):
+                yield section
+            return
+
+        for step in steps:
+            yield step, getattr(sections, step) or None
+
+    @staticmethod
+    async def update_brand(brand_id: UUID, brand: BrandUpdate, session: AsyncSessionDep, current_user: User) -> ORJSONResponse:
         existing_brand = await BrandRepository.get_brand_by_id(brand_id, session)
         if not existing_brand:
             raise NotFoundException("Brand not found")
 
-        update_data = brand.model_dump(exclude_unset=True)
+        update_data = brand.model_dump(exclude_unset=True, exclude={"version"})
+        if brand.version is not None and brand.version != existing_brand.version:
+            raise ConflictException("Brand was modified by another request; reload it and try again")
 
         if brand.prompt:
             response = await BrandService.__update_step_with_prompt__(update_data, brand, session)
 
-            return JSONResponse(response, status_code=202)
+            return ORJSONResponse(response, status_code=202)
 
         if brand.rerun_step:
-            response = await BrandService.__update_steps__(existing_brand, session)
-            return JSONResponse(response, status_code=200)
+            if brand.rerun_step not in BRAND_SECTION_DEPENDENCIES:
+                raise BadRequestException(f"rerun_step must be one of {', '.join(BRAND_SECTION_DEPENDENCIES)}")
+            job = await JobService.create_job(
+                JobKind.RERUN_STEP, current_user.id, session, brand_id=brand_id, payload=update_data)
+            return orm_response(job, JobReturn, status_code=202)
 
-        for key, value in update_data.items():
-            setattr(brand, key, value)
+        brand = await BrandRepository.update_brand(existing_brand, update_data, session, expected_version=brand.version)
+        EmbeddingService.schedule(SearchKind.BRAND, [brand.id])
+        return BrandService.__brand_response__(brand)
 
-        return await BrandRepository.update_brand(brand_id, update_data, session)
+    @staticmethod
+    def __brand_response__(brand: Brand) -> ORJSONResponse:
+        response = orm_response(brand, BrandReturn)
+        response.headers["ETag"] = make_etag(brand.id, brand.version, brand.updated_at)
+        return response
 
     @staticmethod
-    async def __update_step_with_prompt__(update_data: str, brand: BrandUpdate, session: SessionDep) -> dict:
+    async def __update_step_with_prompt__(update_data: str, brand: BrandUpdate, session: AsyncSessionDep) -> dict:
         update_data.pop("prompt", None)
         field = next(iter(update_data))
         response = await OpenAiService.chat(
@@ -99,6 +390,7 @@ class BrandService:
                         """,
             user=brand.prompt,
             session=session,
+            priority=Priority.INTERACTIVE,
         )
         if not response:
             raise InternalServerError("Failed to update brand with prompt")
@@ -112,64 +404,171 @@ class BrandService:
         }
 
     @staticmethod
-    async def __update_steps__(update_data: str, brand: Brand, session: SessionDep) -> dict:
-        update_data.pop("rerun_step", None)
+    async def stream_step_with_prompt(brand_id: UUID, brand: BrandUpdate, session: AsyncSessionDep) -> AsyncIterator[str]:
+        existing_brand = await BrandRepository.get_brand_by_id(brand_id, session)
+        if not existing_brand:
+            raise NotFoundException("Brand not found")
+        if not brand.prompt:
+            raise BadRequestException("A prompt is required")
+
+        update_data = brand.model_dump(exclude_unset=True, exclude={"prompt", "version"})
+        if not update_data:
+            raise BadRequestException("The step to update with the prompt is required")
+
         field = next(iter(update_data))
+        tokens = OpenAiService.chat_stream(
+            system=BrandService.system,
+            assistant=f"""You are tasked with generating content for {brand.name or existing_brand.name}.
+                        Consider {update_data} to complete your task. The {update_data}
+                        will work as a guideline and disambiguation factor.
+                        """,
+            user=brand.prompt,
+            session=session,
+        )
+        return BrandService.__relay_stream__(tokens, field)
 
-        fields_to_update = []
-
-        if field == "about":
-            fields_to_update = [
-                "key_characteristics",
-                "category",
-                "positioning",
-                "target_audience",
-                "key_competitors",
-            ]
-        elif field == "positioning":
-            fields_to_update = ["target_audience", "key_competitors"]
-        elif field == "target_audience":
-            fields_to_update = ["key_competitors"]
-
-        if field == "positioning":
-            guideline_field = "positioning"
-            guideline_text = brand.positioning
-        elif field == "target audience":
-            guideline_field = "target audience"
-            guideline_text = brand.target_audience
-        else:
-            guideline_field = "about"
-            guideline_text = brand.about
-
-        prompts = {
-            "about": f"Write {brand.name}'s history, mission, and core values in one or two concise paragraphs. Do not include any analysis or explanation.",
-            "key_characteristics": f"List 3 to 4 bullet points highlighting {brand.name}'s defining qualities. Use only the bullet points with no explanation or introduction.",
-            "category": f"Provide the primary industry of {brand.name} in one or two words, e.g., 'luxury fashion', 'consumer electronics'. Do not explain.",
-            "positioning": f"In one or two sentences, describe how {brand.name} is positioned in the market. Do not add any introduction or explanation.",
-            "target_audience": f"List 3 to 4 bullet points describing {brand.name}'s key demographics and psychographics. Do not include any explanation.",
-            "key_competitors": f"List up to 3 major competitors for {brand.name}, each with a brief description of what differentiates them. Do not include any introduction or explanation.",
-        }
+    @staticmethod
+    async def __relay_stream__(tokens: AsyncIterator[str], field: str) -> AsyncIterator[str]:
+        chunks = []
+        try:
+            async for delta in tokens:
+                chunks.append(delta)
+                yield format_sse("token", {"content": delta})
+        except Exception as e:
+            yield format_sse("error", {"step": field, "detail": getattr(e, "detail", str(e))})
+            return
+
+        yield format_sse("done", {
+            "message": "Brand content updated with prompt. Save it if it looks good.",
+            "content": "".join(chunks),
+            "step": field,
+        })
 
-        for field in fields_to_update:
-            prompt = prompts[field]
-            response = await OpenAiService.chat(
-                system=BrandService.system,
-                assistant=f"""You are tasked with generating content for {brand.name}.
-                            Consider {guideline_field} as a guideline and disambiguation factor.
-                            """,
-                user=prompt,
-                session=session,
+    @staticmethod
+    async def run_rerun_job(job: Job, session: AsyncSessionDep) -> None:
+        brand = await BrandRepository.get_brand_by_id(job.brand_id, session)
+        if not brand:
+            raise NotFoundException("Brand not found")
+
+        update_data = dict(job.payload or {})
+        update_data.pop("prompt", None)
+        rerun_step = update_data.pop("rerun_step", None)
+        field = rerun_step if rerun_step in BRAND_SECTION_DEPENDENCIES else next(iter(update_data), None)
+        if update_data:
+            brand = await BrandRepository.update_brand(brand, update_data, session)
+
+        skipped, saved = [], []
+        async for sections, failed in BrandService.__update_steps__(field, brand, session, skipped):
+            if failed:
+                # The level's other sections are dropped, so the brand never
+                # mixes sections regenerated from different inputs.
+                for step in failed:
+                    await JobService.record_section(job, step, None, session)
+                await JobService.annotate(job, {"skipped": skipped}, session)
+                if saved:
+                    EmbeddingService.schedule(SearchKind.BRAND, [brand.id])
+                raise InternalServerError(
+                    f"Failed to regenerate {', '.join(failed)}; "
+                    + (f"{', '.join(saved)} were saved" if saved else "no sections were saved"))
+
+            brand = await BrandRepository.update_brand(brand, {
+                **{step: content for step, (content, _) in sections.items()},
+                "section_hashes": {
+                    **(brand.section_hashes or {}),
+                    **{step: input_hash for step, (_, input_hash) in sections.items()},
+                },
+            }, session)
+            for step, (content, _) in sections.items():
+                await JobService.record_section(job, step, content, session)
+            saved.extend(sections)
+
+        EmbeddingService.schedule(SearchKind.BRAND, [brand.id])
+        await JobService.annotate(job, {"skipped": skipped}, session)
+
+    @staticmethod
+    def __input_hash__(brand: Brand, section: str) -> str:
+        """Hash of the content a section was generated from."""
+        inputs = {dependency: getattr(brand, dependency) for dependency in BRAND_SECTION_DEPENDENCIES[section]}
+        return hashlib.sha256(json.dumps(inputs, sort_keys=True).encode()).hexdigest()
+
+    @staticmethod
+    def __downstream_levels__(field: str) -> list[list[str]]:
+        """Sections that transitively depend on ``field``, grouped so every
+        section only depends on sections from earlier groups."""
+        downstream = set()
+        changed = True
+        while changed:
+            changed = False
+            for section, dependencies in BRAND_SECTION_DEPENDENCIES.items():
+                if section not in downstream and ({field} | downstream) & set(dependencies):
+                    downstream.add(section)
+                    changed = True
+
+        levels: dict[str, int] = {}
+        for section in BRAND_SECTIONS:
+            if section in downstream:
+                levels[section] = 1 + max(
+                    (levels[dependency] for dependency in BRAND_SECTION_DEPENDENCIES[section] if dependency in levels),
+                    default=0,
+                )
+
+        return [
+            [section for section, level in levels.items() if level == depth]
+            for depth in sorted(set(levels.values()))
+        ]
+
+    @staticmethod
+    async def __update_steps__(field: str | None, brand: Brand, session: AsyncSessionDep, skipped: list[str]) -> AsyncIterator[tuple[dict[str, tuple[str, str]], list[str]]]:
+        """Regenerate the sections downstream of ``field`` one dependency level
+        at a time, skipping those whose inputs hash the same as last time.
+
+        Yields ``({section: (content, input_hash)}, failed)`` per level; the
+        caller persists the level before the next one reads it as input.
+        Stops after a level with failed sections.
+        """
+        if field not in BRAND_SECTION_DEPENDENCIES:
+            return
+
+        prompts = BrandService.__prompts__(brand.name)
+        semaphore = asyncio.Semaphore(settings.BRAND_GENERATION_CONCURRENCY)
+
+        async def generate(section: str) -> tuple[str, str | None]:
+            guidelines = "\n".join(
+                f"{dependency}: {getattr(brand, dependency)}"
+                for dependency in BRAND_SECTION_DEPENDENCIES[section]
+                if getattr(brand, dependency)
             )
-            if not response:
-                raise InternalServerError("Failed to update brand with prompt")
+            async with semaphore:
+                try:
+                    response = await OpenAiService.chat(
+                        system=BrandService.system,
+                        assistant=f"""You are tasked with generating content for {brand.name}.
+                                    Consider the following sections as a guideline and disambiguation factor:
+                                    {guidelines}
+                                    """,
+                        user=prompts[section],
+                        session=session,
+                    )
+                except Exception:
+                    response = None
+                return section, response or None
 
-            setattr(brand, field, response)
+        for level in BrandService.__downstream_levels__(field):
+            stale = []
+            for section in level:
+                if (brand.section_hashes or {}).get(section) == BrandService.__input_hash__(brand, section):
+                    skipped.append(section)
+                else:
+                    stale.append(section)
 
-        print(brand)
-        return {
-            "message": "Brand content updated with prompt. Save it if it looks good.",
-            "data": {
-                "content": response,
-                "step": field
-            }
-        }
+            hashes = {section: BrandService.__input_hash__(brand, section) for section in stale}
+            results = await asyncio.gather(*(generate(section) for section in stale))
+            failed = [section for section, content in results if not content]
+            yield {section: (content, hashes[section]) for section, content in results if content}, failed
+            if failed:
+                return
+
+
+job_queue.register(JobKind.GENERATE_BRAND, BrandService.run_generation_job)
+job_queue.register(JobKind.RERUN_STEP, BrandService.run_rerun_job)
+job_queue.register(JobKind.IMPORT_BRANDS, BrandService.run_import_job)
@@ -0,0 +1,193 @@
+import asyncio
+import hashlib
+import math
+from datetime import UTC, datetime, timedelta
+from uuid import UUID
+
+from fastapi.responses import ORJSONResponse
+
+from api.services.OpenAi import OpenAiService
+from api.repositories import EmbeddingRepository
+from api.schemas import SimilarQuery, UserReturn
+from core.exceptions import *
+from core.db import AsyncSessionDep, async_session_maker
+from core.log import get_logger
+from core.metrics import Gauge, registry, timed
+from core.types import SearchKind
+from core.vectors import PartitionedIndex, from_bytes, to_bytes
+
+from core.config import get_settings
+settings = get_settings()
+
+logger = get_logger("embeddings")
+
+__indexes__ = {kind: PartitionedIndex(settings.EMBEDDING_DIMENSIONS) for kind in (SearchKind.BRAND, SearchKind.AUDIENCE)}
+__pending__: dict[SearchKind, set[UUID]] = {kind: set() for kind in __indexes__}
+__wakeup__: asyncio.Event | None = None
+__worker__: asyncio.Task | None = None
+__synced_at__: datetime | None = None
+# Rows read and embedded per round trip when a lot of changes are pending.
+__chunk_size__ = 1000
+# Longest wait between rounds while embedding keeps failing.
+__max_backoff_seconds__ = 300.0
+
+registry.register(Gauge("embedding_index_rows", "Vectors held in the in-memory similarity indexes.",
+                        lambda: {(kind.value,): len(index) for kind, index in __indexes__.items()}, ("kind",)))
+registry.register(Gauge("embedding_pending", "Brands and audiences waiting to be embedded.",
+                        lambda: {(kind.value,): len(ids) for kind, ids in __pending__.items()}, ("kind",)))
+
+
+class EmbeddingService:
+
+    @staticmethod
+    async def start() -> None:
+        """Load the stored embeddings into memory, queue the rows that have none and start the batcher."""
+        global __wakeup__, __worker__, __synced_at__
+        __wakeup__ = asyncio.Event()
+        now = datetime.now(UTC).replace(tzinfo=None)
+        async with async_session_maker() as session:
+            for kind in __indexes__:
+                stale = [
+                    item_id for item_id, user_id, vector in await EmbeddingRepository.get_embeddings(kind, settings.EMBEDDING_MODEL, session)
+                    if not EmbeddingService.__load__(kind, item_id, user_id, vector)
+                ]
+                EmbeddingService.schedule(kind, stale + await EmbeddingRepository.get_missing_ids(kind, settings.EMBEDDING_MODEL, session))
+        __synced_at__ = now
+        __worker__ = asyncio.create_task(EmbeddingService.__run__())
+
+    @staticmethod
+    async def stop() -> None:
+        global __worker__
+        if __worker__ is not None:
+            __worker__.cancel()
+            await asyncio.gather(__worker__, return_exceptions=True)
+            __worker__ = None
+
+    @staticmethod
+    def schedule(kind: SearchKind, ids: list[UUID]) -> None:
+        """Queue brands or audiences whose text changed; they are embedded together shortly after."""
+        __pending__[kind].update(ids)
+        if ids and __wakeup__ is not None:
+            __wakeup__.set()
+
+    @staticmethod
+    async def refresh(kind: SearchKind, ids: list[UUID]) -> None:
+        """Embed the rows whose text changed since their stored embedding and update the index.
+
+        Ids that no longer exist are dropped from the index and the table.
+        """
+        index = __indexes__[kind]
+        async with async_session_maker() as session:
+            documents = await EmbeddingRepository.get_documents(kind, ids, session)
+            stored = await EmbeddingRepository.get_stored(kind, ids, session)
+            gone = set(ids) - {item_id for item_id, _, _ in documents}
+            if gone:
+                await EmbeddingRepository.delete_embeddings(kind, list(gone), session)
+        for item_id in gone:
+            index.remove(item_id)
+
+        changed = []
+        for item_id, user_id, text in documents:
+            content_hash = EmbeddingService.__content_hash__(text)
+            stored_hash, vector = stored.get(item_id, (None, None))
+            if stored_hash != content_hash:
+                changed.append((item_id, user_id, text, content_hash))
+            elif item_id not in index:
+                EmbeddingService.__load__(kind, item_id, user_id, vector)
+        if not changed:
+            return
+
+        # No session is held while the embedding requests are in flight.
+        vectors = await OpenAiService.embed([text for _, _, text, _ in changed])
+        async with async_session_maker() as session:
+            await EmbeddingRepository.save_embeddings(kind, [{
+                "item_id": item_id,
+                "user_id": user_id,
+                "model": settings.EMBEDDING_MODEL,
+                "content_hash": content_hash,
+                "vector": to_bytes(vector),
+            } for (item_id, user_id, _, content_hash), vector in zip(changed, vectors)], session)
+        for (item_id, user_id, _, _), vector in zip(changed, vectors):
+            index.upsert(item_id, vector, user_id)
+
+    @staticmethod
+    async def similar(kind: SearchKind, item_id: UUID, query: SimilarQuery, session: AsyncSessionDep, current_user: UserReturn) -> ORJSONResponse:
+        """The current user's brands or audiences closest to ``item_id`` by cosine similarity."""
+        await EmbeddingService.__sync__(session)
+        index = __indexes__[kind]
+        vector = index.get(item_id)
+        if vector is None or index.group_of(item_id) != current_user.id:
+            if await EmbeddingRepository.get_owner(kind, item_id, session) != current_user.id:
+                raise NotFoundException(f"{kind.value.capitalize()} not found")
+            if vector is None:
+                EmbeddingService.schedule(kind, [item_id])
+                raise ServiceUnavailableException(
+                    f"The {kind.value} has not been embedded yet; try again shortly",
+                    retry_after=math.ceil(settings.EMBEDDING_FLUSH_SECONDS) + 1)
+
+        with timed("vector_search"):
+            hits = index.top_k(vector, query.k, group=current_user.id, exclude=(item_id,))
+        titles = await EmbeddingRepository.get_titles(kind, [hit_id for hit_id, _ in hits], session)
+
+        # Rows deleted since they were indexed are pruned on the way out.
+        gone = [hit_id for hit_id, _ in hits if hit_id not in titles]
+        for hit_id in gone:
+            index.remove(hit_id)
+        EmbeddingService.schedule(kind, gone)
+
+        return ORJSONResponse({"items": [
+            {"id": hit_id, **titles[hit_id], "score": round(score, 4)}
+            for hit_id, score in hits if hit_id in titles
+        ]})
+
+    @staticmethod
+    async def __run__() -> None:
+        failures = 0
+        while True:
+            await __wakeup__.wait()
+            # Changes arriving close together share embedding requests; after
+            # failed rounds the wait doubles, up to __max_backoff_seconds__.
+            await asyncio.sleep(min(settings.EMBEDDING_FLUSH_SECONDS * 2 ** min(failures, 16), __max_backoff_seconds__))
+            __wakeup__.clear()
+            failed = False
+            for kind, pending in __pending__.items():
+                ids = list(pending)
+                pending.clear()
+                for start in range(0, len(ids), __chunk_size__):
+                    chunk = ids[start:start + __chunk_size__]
+                    try:
+                        await EmbeddingService.refresh(kind, chunk)
+                    except Exception as e:
+                        # Queued again, or edited rows would keep their stale vector.
+                        failed = True
+                        EmbeddingService.schedule(kind, chunk)
+                        logger.warning("embedding failed", extra={"kind": kind.value, "detail": getattr(e, "detail", str(e))})
+            failures = failures + 1 if failed else 0
+
+    @staticmethod
+    async def __sync__(session: AsyncSessionDep) -> None:
+        """Pick up embeddings written by other workers every ``EMBEDDING_SYNC_SECONDS``."""
+        global __synced_at__
+        now = datetime.now(UTC).replace(tzinfo=None)
+        if __synced_at__ is not None and (now - __synced_at__).total_seconds() < settings.EMBEDDING_SYNC_SECONDS:
+            return
+        # Overlap the previous window so rows committed late are not missed.
+        since = __synced_at__ - timedelta(seconds=settings.EMBEDDING_SYNC_SECONDS) if __synced_at__ else None
+        __synced_at__ = now
+        for kind in __indexes__:
+            for item_id, user_id, vector in await EmbeddingRepository.get_embeddings(kind, settings.EMBEDDING_MODEL, session, since=since):
+                EmbeddingService.__load__(kind, item_id, user_id, vector)
+
+    @staticmethod
+    def __load__(kind: SearchKind, item_id: UUID, user_id: UUID, data: bytes) -> bool:
+        """Index a stored vector; False when it was made for another ``EMBEDDING_DIMENSIONS``."""
+        vector = from_bytes(data)
+        if len(vector) != settings.EMBEDDING_DIMENSIONS:
+            return False
+        __indexes__[kind].upsert(item_id, vector, user_id)
+        return True
+
+    @staticmethod
+    def __content_hash__(text: str) -> str:
+        key = f"{settings.EMBEDDING_MODEL}:{settings.EMBEDDING_DIMENSIONS}:{text[:settings.EMBEDDING_MAX_CHARS]}"
+        return hashlib.sha256(key.encode()).hexdigest()
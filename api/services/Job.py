@@ -0,0 +1,166 @@
+import asyncio
+from typing import AsyncIterator
+from uuid import UUID
+
+from api.repositories import JobRepository
+from api.models import Job
+from api.schemas import JobReturn, UserReturn
+from core.db import AsyncSessionDep, async_session_maker
+from core.exceptions import *
+from core.jobs import job_queue
+from core.sse import format_sse, keep_alive
+from core.types import JobKind, JobStatus
+
+from core.config import get_settings
+settings = get_settings()
+
+
+TERMINAL_STATUSES = (JobStatus.SUCCEEDED, JobStatus.FAILED)
+
+
+class JobService:
+    @staticmethod
+    async def start() -> None:
+        await job_queue.start(settings.JOB_WORKERS, JobService.run_job, JobService.fail_job)
+        async with async_session_maker() as session:
+            for job in await JobRepository.get_unfinished_jobs(session):
+                job_queue.enqueue(job.id)
+
+    @staticmethod
+    async def stop() -> None:
+        await job_queue.stop()
+
+    @staticmethod
+    async def create_job(kind: JobKind, user_id: UUID, session: AsyncSessionDep, brand_id: UUID | None = None, payload: dict | None = None, result: dict | None = None) -> Job:
+        job = await JobRepository.create_job({
+            "kind": kind,
+            "user_id": user_id,
+            "brand_id": brand_id,
+            "payload": payload,
+            "result": result or {"sections": {}, "failed": []},
+        }, session)
+        job_queue.enqueue(job.id)
+        return job
+
+    @staticmethod
+    async def get_job_by_id(job_id: UUID, session: AsyncSessionDep, current_user: UserReturn) -> Job:
+        job = await JobRepository.get_job_by_id(job_id, session)
+        if not job or (job.user_id != current_user.id and not current_user.is_superuser):
+            raise NotFoundException("Job not found")
+        return job
+
+    @staticmethod
+    async def retry_job(job_id: UUID, session: AsyncSessionDep, current_user: UserReturn) -> Job:
+        """Queue a failed job again; handlers pick up from the progress saved on it."""
+        job = await JobService.get_job_by_id(job_id, session, current_user)
+        if job.status != JobStatus.FAILED:
+            raise ConflictException("Only failed jobs can be retried")
+
+        job = await JobRepository.update_job(job, {"status": JobStatus.PENDING, "error": None}, session)
+        job_queue.enqueue(job.id)
+        return job
+
+    @staticmethod
+    async def run_job(job_id: UUID) -> None:
+        async with async_session_maker() as session:
+            job = await JobRepository.get_job_by_id(job_id, session)
+            if not job or job.status in TERMINAL_STATUSES:
+                return
+
+            handler = job_queue.handlers.get(job.kind)
+            if handler is None:
+                await JobService.__finish__(job, JobStatus.FAILED, session, error=f"Unknown job kind {job.kind}")
+                return
+
+            await JobRepository.update_job(job, {"status": JobStatus.RUNNING}, session)
+            job_queue.publish(job.id, "status", {"status": JobStatus.RUNNING})
+            try:
+                await handler(job, session)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                await session.rollback()
+                await JobService.__finish__(job, JobStatus.FAILED, session, error=getattr(e, "detail", str(e)))
+                return
+
+            await JobService.__finish__(job, JobStatus.SUCCEEDED, session)
+
+    @staticmethod
+    async def fail_job(job_id: UUID, error: Exception) -> None:
+        """Last resort when ``run_job`` itself raised: mark the job failed in a fresh session."""
+        async with async_session_maker() as session:
+            if await JobRepository.fail_unfinished_job(job_id, f"Job runner error: {getattr(error, 'detail', str(error))}", session):
+                job = await JobRepository.get_job_by_id(job_id, session)
+                job_queue.publish(job_id, "done", JobService.__summary__(job))
+
+    @staticmethod
+    async def record_section(job: Job, step: str, content: str | None, session: AsyncSessionDep) -> None:
+        """Persist one finished (or failed) section on the job and push it to subscribers."""
+        result = dict(job.result or {})
+        if content is None:
+            result["failed"] = [*result.get("failed", []), step]
+            event, data = "failed", {"step": step}
+        else:
+            result["sections"] = {**result.get("sections", {}), step: content}
+            event, data = "section", {"step": step, "content": content}
+
+        await JobRepository.update_job(job, {"result": result}, session)
+        job_queue.publish(job.id, event, data)
+
+    @staticmethod
+    async def record_brand(job: Job, brand_id: UUID, progress: dict, session: AsyncSessionDep) -> None:
+        """Persist the progress of one brand of a multi-brand job and push it to subscribers."""
+        brands = dict((job.result or {}).get("brands", {}))
+        brands[str(brand_id)] = {**brands.get(str(brand_id), {}), **progress}
+
+        await JobRepository.update_job(job, {"result": {**(job.result or {}), "brands": brands}}, session)
+        job_queue.publish(job.id, "brand", {"brand_id": str(brand_id), **brands[str(brand_id)]})
+
+    @staticmethod
+    async def annotate(job: Job, data: dict, session: AsyncSessionDep) -> None:
+        await JobRepository.update_job(job, {"result": {**(job.result or {}), **data}}, session)
+
+    @staticmethod
+    async def stream_events(job_id: UUID) -> AsyncIterator[str]:
+        with job_queue.subscribe(job_id) as subscriber:
+            async with async_session_maker() as session:
+                job = await JobRepository.get_job_by_id(job_id, session)
+            sent = set()
+            for step, content in (job.result or {}).get("sections", {}).items():
+                sent.add(step)
+                yield format_sse("section", {"step": step, "content": content})
+            for step in (job.result or {}).get("failed", []):
+                sent.add(step)
+                yield format_sse("failed", {"step": step})
+            for brand_id, progress in (job.result or {}).get("brands", {}).items():
+                yield format_sse("brand", {"brand_id": brand_id, **progress})
+
+            if job.status in TERMINAL_STATUSES:
+                yield format_sse("done", JobService.__summary__(job))
+                return
+
+            while True:
+                try:
+                    event, data = await asyncio.wait_for(
+                        subscriber.get(), timeout=settings.JOB_SSE_KEEP_ALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield keep_alive()
+                    continue
+
+                if event in ("section", "failed"):
+                    if data["step"] in sent:
+                        continue
+                    sent.add(data["step"])
+
+                yield format_sse(event, data)
+                if event == "done":
+                    return
+
+    @staticmethod
+    async def __finish__(job: Job, status: JobStatus, session: AsyncSessionDep, error: str | None = None) -> None:
+        await JobRepository.update_job(job, {"status": status, "error": error}, session)
+        job_queue.publish(job.id, "done", JobService.__summary__(job))
+
+    @staticmethod
+    def __summary__(job: Job) -> dict:
+        return JobReturn.model_validate(job, from_attributes=True).model_dump(mode="json")
@@ -0,0 +1,262 @@
+import asyncio
+import hashlib
+import json
+import random
+from functools import lru_cache
+from typing import TYPE_CHECKING, AsyncIterator, Callable, Protocol
+
+import httpx
+import numpy as np
+import openai as openai_errors
+from openai import AsyncOpenAI
+from pydantic import BaseModel
+
+from core.config import get_settings
+settings = get_settings()
+
+if TYPE_CHECKING:
+    from api.services.OpenAi import ChatOptions
+
+
+class Completion(BaseModel):
+    content: str | None
+    prompt_tokens: int | None = None
+    completion_tokens: int | None = None
+    total_tokens: int | None = None
+
+
+class Embeddings(BaseModel):
+    vectors: list[list[float]]
+    total_tokens: int | None = None
+
+
+class RetryableLLMError(Exception):
+    """Transient backend failure (rate limit, timeout, 5xx) worth retrying."""
+
+    def __init__(self, detail: str, retry_after: float | None = None):
+        super().__init__(detail)
+        self.retry_after = retry_after
+
+
+class LLMBackend(Protocol):
+    """A model provider behind ``OpenAiService``.
+
+    Transient failures are raised as ``RetryableLLMError`` so the service can
+    retry them through the rate-limit scheduler.
+    """
+
+    async def complete(self, messages: list[dict], options: "ChatOptions") -> Completion: ...
+
+    def stream(self, messages: list[dict], options: "ChatOptions") -> AsyncIterator[str]:
+        """Content deltas as they arrive; closing the iterator early releases the request."""
+        ...
+
+    async def embed(self, texts: list[str], model: str, dimensions: int) -> Embeddings: ...
+
+    async def close(self) -> None: ...
+
+
+class OpenAIBackend:
+    """Chat completions against the OpenAI API over a pooled keep-alive HTTP client."""
+
+    def __init__(self):
+        http_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=settings.OPENAI_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.OPENAI_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=settings.OPENAI_KEEPALIVE_EXPIRY,
+            ),
+            timeout=httpx.Timeout(
+                settings.OPENAI_TIMEOUT, connect=settings.OPENAI_CONNECT_TIMEOUT
+            ),
+        )
+        self.client = AsyncOpenAI(
+            api_key=settings.OPENAI_API_KEY,
+            http_client=http_client,
+            # Retries go through the scheduler so they respect the rate limits.
+            max_retries=0,
+        )
+
+    async def complete(self, messages: list[dict], options: "ChatOptions") -> Completion:
+        response = await self.__create__(messages, options)
+        usage = response.usage
+        return Completion(
+            content=response.choices[0].message.content,
+            prompt_tokens=usage.prompt_tokens if usage is not None else None,
+            completion_tokens=usage.completion_tokens if usage is not None else None,
+            total_tokens=usage.total_tokens if usage is not None else None,
+        )
+
+    async def stream(self, messages: list[dict], options: "ChatOptions") -> AsyncIterator[str]:
+        stream = await self.__create__(messages, options, stream=True)
+        try:
+            async for chunk in stream:
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if delta:
+                    yield delta
+        finally:
+            # Closing the generator early must still hand the connection back.
+            await stream.close()
+
+    async def embed(self, texts: list[str], model: str, dimensions: int) -> Embeddings:
+        try:
+            response = await self.client.embeddings.create(input=texts, model=model, dimensions=dimensions)
+        except (openai_errors.APIConnectionError, openai_errors.RateLimitError, openai_errors.InternalServerError) as e:
+            raise RetryableLLMError(str(e), OpenAIBackend.__retry_after__(e)) from e
+        data = sorted(response.data, key=lambda item: item.index)
+        return Embeddings.model_construct(
+            vectors=[item.embedding for item in data],
+            total_tokens=response.usage.total_tokens if response.usage is not None else None,
+        )
+
+    async def close(self) -> None:
+        await self.client.close()
+
+    async def __create__(self, messages: list[dict], options: "ChatOptions", stream: bool = False):
+        try:
+            return await self.client.chat.completions.create(
+                messages=messages,
+                model=options.model,
+                temperature=options.temperature,
+                max_tokens=options.max_tokens,
+                top_p=options.top_p,
+                frequency_penalty=options.frequency_penalty,
+                presence_penalty=options.presence_penalty,
+                **({"response_format": options.response_format} if options.response_format else {}),
+                **({"stream": True} if stream else {}),
+            )
+        except (openai_errors.APIConnectionError, openai_errors.RateLimitError, openai_errors.InternalServerError) as e:
+            raise RetryableLLMError(str(e), OpenAIBackend.__retry_after__(e)) from e
+
+    @staticmethod
+    def __retry_after__(error: Exception) -> float | None:
+        response = getattr(error, "response", None)
+        if response is None:
+            return None
+        try:
+            if "retry-after-ms" in response.headers:
+                return float(response.headers["retry-after-ms"]) / 1000
+            if "retry-after" in response.headers:
+                return float(response.headers["retry-after"])
+        except ValueError:
+            return None
+        return None
+
+
+class StubBackend:
+    """Deterministic local stand-in for load tests; spends no tokens.
+
+    The same messages always produce the same content, latency and token
+    count. Latency and completion length are drawn from normal distributions
+    configured by the ``LLM_STUB_*`` settings, and ``LLM_STUB_ERROR_RATE``
+    injects retryable failures. Structured responses follow the requested
+    JSON schema; arrays get ``minItems`` entries, or three without one.
+    """
+
+    words = ("brand", "audience", "market", "premium", "heritage", "digital", "community",
+             "value", "design", "quality", "trust", "growth", "story", "culture", "craft")
+
+    def __init__(self):
+        self.calls = 0
+
+    async def complete(self, messages: list[dict], options: "ChatOptions") -> Completion:
+        rng, latency, tokens = self.__draw__(messages, options)
+        await asyncio.sleep(latency)
+        if rng.random() < settings.LLM_STUB_ERROR_RATE:
+            raise RetryableLLMError("Stub backend injected failure", retry_after=None)
+
+        prompt_tokens = sum(len(message["content"]) // 4 + 4 for message in messages)
+        return Completion(
+            content=self.__content__(rng, tokens, options),
+            prompt_tokens=prompt_tokens,
+            completion_tokens=tokens,
+            total_tokens=prompt_tokens + tokens,
+        )
+
+    async def stream(self, messages: list[dict], options: "ChatOptions") -> AsyncIterator[str]:
+        rng, latency, tokens = self.__draw__(messages, options)
+        if rng.random() < settings.LLM_STUB_ERROR_RATE:
+            await asyncio.sleep(latency)
+            raise RetryableLLMError("Stub backend injected failure", retry_after=None)
+
+        words = self.__content__(rng, tokens, options).split(" ")
+        for index, word in enumerate(words):
+            await asyncio.sleep(latency / len(words))
+            yield word if index == 0 else " " + word
+
+    async def embed(self, texts: list[str], model: str, dimensions: int) -> Embeddings:
+        """Sum of a fixed random vector per word, so texts sharing words come out similar."""
+        self.calls += 1
+        rng = random.Random(hashlib.sha256(json.dumps([settings.LLM_STUB_SEED, texts]).encode()).digest())
+        await asyncio.sleep(max(0.0, rng.gauss(settings.LLM_STUB_LATENCY_MS, settings.LLM_STUB_LATENCY_JITTER_MS)) / 1000)
+        if rng.random() < settings.LLM_STUB_ERROR_RATE:
+            raise RetryableLLMError("Stub backend injected failure", retry_after=None)
+
+        vectors = []
+        for text in texts:
+            vector = np.zeros(dimensions, dtype=np.float32)
+            for word in text.lower().split():
+                vector += StubBackend.__word_vector__(word.strip(".,;:!?\"'()"), dimensions)
+            vectors.append(vector.tolist())
+        return Embeddings.model_construct(
+            vectors=vectors, total_tokens=sum(len(text) // 4 + 1 for text in texts))
+
+    async def close(self) -> None:
+        return None
+
+    @staticmethod
+    @lru_cache(maxsize=65536)
+    def __word_vector__(word: str, dimensions: int) -> np.ndarray:
+        seed = int.from_bytes(hashlib.sha256(f"{settings.LLM_STUB_SEED}:{word}".encode()).digest()[:8], "little")
+        return np.random.default_rng(seed).standard_normal(dimensions).astype(np.float32)
+
+    def __draw__(self, messages: list[dict], options: "ChatOptions") -> tuple[random.Random, float, int]:
+        self.calls += 1
+        digest = hashlib.sha256(
+            json.dumps([settings.LLM_STUB_SEED, messages], sort_keys=True).encode()
+        ).digest()
+        rng = random.Random(digest)
+        latency = max(0.0, rng.gauss(settings.LLM_STUB_LATENCY_MS, settings.LLM_STUB_LATENCY_JITTER_MS)) / 1000
+        tokens = min(options.max_tokens, max(1, round(rng.gauss(settings.LLM_STUB_TOKENS, settings.LLM_STUB_TOKENS_JITTER))))
+        return rng, latency, tokens
+
+    def __content__(self, rng: random.Random, tokens: int, options: "ChatOptions") -> str:
+        schema = ((options.response_format or {}).get("json_schema") or {}).get("schema")
+        if schema:
+            return json.dumps(self.__fill__(rng, schema, schema, tokens))
+        return " ".join(rng.choices(self.words, k=tokens))
+
+    def __fill__(self, rng: random.Random, node: dict, root: dict, tokens: int):
+        """Build a value matching a JSON schema node, spreading ``tokens`` words over its strings."""
+        if "$ref" in node:
+            node = root["$defs"][node["$ref"].rsplit("/", 1)[-1]]
+        if node.get("type") == "object":
+            properties = node.get("properties", {})
+            share = max(1, tokens // max(1, len(properties)))
+            return {key: self.__fill__(rng, value, root, share) for key, value in properties.items()}
+        if node.get("type") == "array":
+            count = node.get("minItems") or 3
+            return [self.__fill__(rng, node.get("items", {}), root, max(1, tokens // count)) for _ in range(count)]
+        if node.get("type") in ("integer", "number"):
+            return rng.randint(0, 100)
+        if node.get("type") == "boolean":
+            return rng.random() < 0.5
+        return " ".join(rng.choices(self.words, k=tokens))
+
+
+__backends__: dict[str, Callable[[], LLMBackend]] = {
+    "openai": OpenAIBackend,
+    "stub": StubBackend,
+}
+
+
+def register_llm_backend(name: str, factory: Callable[[], LLMBackend]) -> None:
+    """Make ``factory`` selectable with ``LLM_BACKEND=name``."""
+    __backends__[name] = factory
+
+
+def create_llm_backend() -> LLMBackend:
+    factory = __backends__.get(settings.LLM_BACKEND)
+    if factory is None:
+        raise ValueError(f"LLM_BACKEND must be one of {', '.join(__backends__)}, not {settings.LLM_BACKEND!r}")
+    return factory()
@@ -0,0 +1,169 @@
+import hashlib
+import json
+import time
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+
+from sqlalchemy import delete, func, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlmodel import select
+
+from api.models import LLMCacheEntry
+from core.cache import TTLCache
+from core.db import async_session_maker
+
+from core.config import get_settings
+settings = get_settings()
+
+
+class MemoryCacheBackend:
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self.entries = TTLCache(max_entries)
+
+    @property
+    def evictions(self) -> int:
+        return self.entries.evictions
+
+    async def get(self, key: str) -> str | None:
+        return self.entries.get(key)
+
+    async def set(self, key: str, content: str, ttl: int | None) -> None:
+        self.entries.set(key, content, ttl)
+
+    async def size(self) -> int:
+        return len(self.entries)
+
+
+class PostgresCacheBackend:
+    """Cache rows in the ``llm_cache`` table, shared by every worker.
+
+    Hits only read. The keys they touch are remembered in memory, and their
+    ``last_accessed_at`` is bumped in one UPDATE by a sweep at most every
+    ``LLM_CACHE_SWEEP_SECONDS``. The same sweep deletes expired rows and
+    evicts the least recently used ones beyond ``max_entries``, both through
+    indexes rather than a sort of the table.
+    """
+
+    def __init__(self, max_entries: int, sweep_seconds: float):
+        self.max_entries = max_entries
+        self.sweep_seconds = sweep_seconds
+        self.evictions = 0
+        self.touched: set[str] = set()
+        self.next_sweep = time.monotonic() + sweep_seconds
+        self.sweeping = False
+
+    async def get(self, key: str) -> str | None:
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        async with async_session_maker() as session:
+            row = (await session.exec(
+                select(LLMCacheEntry.content, LLMCacheEntry.expires_at).where(LLMCacheEntry.key == key)
+            )).first()
+        # Expired rows are left for the sweep to delete.
+        if row is None or (row.expires_at is not None and row.expires_at < now):
+            return None
+        self.touched.add(key)
+        await self.__maybe_sweep__()
+        return row.content
+
+    async def set(self, key: str, content: str, ttl: int | None) -> None:
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        expires_at = now + timedelta(seconds=ttl) if ttl else None
+        statement = insert(LLMCacheEntry).values(
+            key=key, content=content, expires_at=expires_at, last_accessed_at=now, created_at=now
+        ).on_conflict_do_update(
+            index_elements=[LLMCacheEntry.key],
+            set_={"content": content, "expires_at": expires_at, "last_accessed_at": now},
+        )
+        async with async_session_maker() as session:
+            await session.exec(statement)
+            await session.commit()
+        self.touched.discard(key)
+        await self.__maybe_sweep__()
+
+    async def size(self) -> int:
+        async with async_session_maker() as session:
+            return (await session.exec(select(func.count()).select_from(LLMCacheEntry))).one()
+
+    async def __maybe_sweep__(self) -> None:
+        if self.sweeping or time.monotonic() < self.next_sweep:
+            return
+        self.sweeping = True
+        try:
+            await self.sweep()
+        finally:
+            self.next_sweep = time.monotonic() + self.sweep_seconds
+            self.sweeping = False
+
+    async def sweep(self) -> None:
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        touched, self.touched = self.touched, set()
+        async with async_session_maker() as session:
+            if touched:
+                await session.exec(update(LLMCacheEntry).where(
+                    LLMCacheEntry.key.in_(touched)).values(last_accessed_at=now))
+            result = await session.exec(delete(LLMCacheEntry).where(LLMCacheEntry.expires_at < now))
+            evicted = result.rowcount or 0
+            # Walks the last_accessed_at index down to the max_entries-th row.
+            cutoff = (await session.exec(
+                select(LLMCacheEntry.last_accessed_at)
+                .order_by(LLMCacheEntry.last_accessed_at.desc())
+                .offset(self.max_entries).limit(1)
+            )).first()
+            if cutoff is not None:
+                result = await session.exec(delete(LLMCacheEntry).where(LLMCacheEntry.last_accessed_at <= cutoff))
+                evicted += result.rowcount or 0
+            await session.commit()
+        self.evictions += evicted
+
+
+class LLMCache:
+    def __init__(self, backend: MemoryCacheBackend | PostgresCacheBackend, ttl: int | None):
+        self.backend = backend
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(messages: list[dict], options: dict) -> str:
+        payload = json.dumps(
+            {"messages": messages, "options": options}, sort_keys=True, separators=(",", ":")
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    async def get(self, key: str) -> str | None:
+        content = await self.backend.get(key)
+        if content is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return content
+
+    async def set(self, key: str, content: str) -> None:
+        await self.backend.set(key, content, self.ttl)
+
+    async def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "backend": settings.LLM_CACHE_BACKEND,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "evictions": self.backend.evictions,
+            "size": await self.backend.size(),
+            "max_entries": self.backend.max_entries,
+            "ttl_seconds": self.ttl,
+        }
+
+
+@lru_cache
+def get_llm_cache() -> LLMCache | None:
+    if not settings.LLM_CACHE_ENABLED:
+        return None
+
+    if settings.LLM_CACHE_BACKEND == "postgres":
+        backend = PostgresCacheBackend(settings.LLM_CACHE_MAX_ENTRIES, settings.LLM_CACHE_SWEEP_SECONDS)
+    else:
+        backend = MemoryCacheBackend(settings.LLM_CACHE_MAX_ENTRIES)
+
+    return LLMCache(backend, settings.LLM_CACHE_TTL_SECONDS or None)
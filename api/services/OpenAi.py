@@ -1,14 +1,31 @@
-from openai import OpenAI
+import asyncio
+import random
+
+import numpy as np
+from api.services.LLMBackend import LLMBackend, RetryableLLMError, create_llm_backend
+from api.services.LLMCache import get_llm_cache
 from core.exceptions import *
-from core.db import SessionDep
+from core.db import AsyncSessionDep
 from fastapi import FastAPI, Depends
 from pydantic import BaseModel
-from typing import Literal
+from typing import AsyncIterator, Literal, Optional
+
+from core.metrics import Gauge, llm_tokens, registry, timed
+from core.ratelimit import RateLimitScheduler
+from core.types import Priority
+from core.vectors import normalize
 
 from core.config import get_settings
 settings = get_settings()
 
 
+__backend__: LLMBackend | None = None
+__scheduler__ = RateLimitScheduler(settings.OPENAI_RPM_LIMIT, settings.OPENAI_TPM_LIMIT)
+
+registry.register(Gauge("llm_scheduler_queue_depth", "LLM calls waiting for rate-limit admission.",
+                        lambda: {(): __scheduler__.depth()}))
+
+
 class Message(BaseModel):
     role: Literal["system", "user", "assistant"]
     content: str
@@ -21,30 +38,201 @@ class ChatOptions(BaseModel):
     top_p: float = 1.0
     frequency_penalty: float = 0.0
     presence_penalty: float = 0.0
+    response_format: Optional[dict] = None
 
 
 class OpenAiService:
 
     @staticmethod
-    async def chat(system: str, assistant: str, user: str, session: SessionDep, options: ChatOptions = ChatOptions(), ) -> dict:
+    def open_backend() -> LLMBackend:
+        """Create the process-wide LLM backend selected by ``LLM_BACKEND``."""
+        global __backend__
+        if __backend__ is None:
+            __backend__ = create_llm_backend()
+        return __backend__
+
+    @staticmethod
+    async def close_backend() -> None:
+        global __backend__
+        if __backend__ is not None:
+            await __backend__.close()
+            __backend__ = None
+
+    @staticmethod
+    async def chat(system: str, assistant: str, user: str, session: AsyncSessionDep, options: ChatOptions = ChatOptions(), bypass_cache: bool = False, priority: Priority = Priority.BULK) -> dict:
+        messages = [
+            {"role": "system", "content": system},
+            {"role": "assistant", "content": assistant},
+            {"role": "user", "content": user},
+        ]
+
+        cache = None if bypass_cache else get_llm_cache()
+        if cache is not None:
+            cache_key = cache.make_key(messages, options.model_dump())
+            cached = await cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        estimate = OpenAiService.__estimate_tokens__(messages, options)
+        backend = OpenAiService.open_backend()
+        completion = await OpenAiService.__with_retries__(
+            lambda: backend.complete(messages, options), estimate, priority)
+        if completion.total_tokens is not None:
+            __scheduler__.settle(estimate, completion.total_tokens)
+        if completion.prompt_tokens is not None:
+            llm_tokens.inc(completion.prompt_tokens, model=options.model, kind="prompt")
+            llm_tokens.inc(completion.completion_tokens or 0, model=options.model, kind="completion")
+        content = completion.content
+
+        if cache is not None and content:
+            await cache.set(cache_key, content)
+
+        return content
+
+    @staticmethod
+    async def chat_structured(system: str, assistant: str, user: str, session: AsyncSessionDep, schema: type[BaseModel], name: str, options: ChatOptions = ChatOptions(), bypass_cache: bool = False, priority: Priority = Priority.BULK) -> BaseModel:
+        """Same as ``chat`` but constrained to the JSON schema of ``schema``; returns the validated model.
+
+        Raises ``pydantic.ValidationError`` when the response does not match.
+        """
+        options = options.model_copy(update={"response_format": {
+            "type": "json_schema",
+            "json_schema": {"name": name, "strict": True, "schema": schema.model_json_schema()},
+        }})
+        response = await OpenAiService.chat(system, assistant, user, session, options=options, bypass_cache=bypass_cache, priority=priority)
+        return schema.model_validate_json(response)
+
+    @staticmethod
+    async def chat_stream(system: str, assistant: str, user: str, session: AsyncSessionDep, options: ChatOptions = ChatOptions(), bypass_cache: bool = False, priority: Priority = Priority.INTERACTIVE) -> AsyncIterator[str]:
+        """Same as ``chat`` but yields content deltas as the model produces them."""
+        messages = [
+            {"role": "system", "content": system},
+            {"role": "assistant", "content": assistant},
+            {"role": "user", "content": user},
+        ]
+
+        cache = None if bypass_cache else get_llm_cache()
+        if cache is not None:
+            cache_key = cache.make_key(messages, options.model_dump())
+            cached = await cache.get(cache_key)
+            if cached is not None:
+                yield cached
+                return
+
+        estimate = OpenAiService.__estimate_tokens__(messages, options)
+        backend = OpenAiService.open_backend()
+
+        async def first_delta():
+            stream = backend.stream(messages, options)
+            try:
+                return stream, await anext(stream)
+            except StopAsyncIteration:
+                return stream, None
+            except BaseException:
+                # Release the connection before the next attempt opens another.
+                await stream.aclose()
+                raise
+
+        # Only failures before the first delta are retried; after that the
+        # client has already seen part of the answer.
+        stream, delta = await OpenAiService.__with_retries__(first_delta, estimate, priority)
+        chunks = []
         try:
-            openai = OpenAI(api_key=settings.OPENAI_API_KEY)
-
-            messages = [
-                {"role": "system", "content": system},
-                {"role": "assistant", "content": assistant},
-                {"role": "user", "content": user},
-            ]
-
-            response = openai.chat.completions.create(
-                messages=messages,
-                model=options.model,
-                temperature=options.temperature,
-                max_tokens=options.max_tokens,
-                top_p=options.top_p,
-                frequency_penalty=options.frequency_penalty,
-                presence_penalty=options.presence_penalty
-            )
-            return response.choices[0].message.content
+            while delta is not None:
+                chunks.append(delta)
+                yield delta
+                delta = await anext(stream, None)
         except Exception as e:
             raise InternalServerError(f"OpenAI API error: {str(e)}")
+        finally:
+            # Streams report no usage, so settle on the prompt plus what was
+            # actually received, about four characters per token.
+            __scheduler__.settle(estimate, estimate - options.max_tokens + sum(len(chunk) for chunk in chunks) // 4)
+            # Also reached when the client disconnects partway through.
+            await stream.aclose()
+
+        if cache is not None and chunks:
+            await cache.set(cache_key, "".join(chunks))
+
+    @staticmethod
+    async def embed(texts: list[str], priority: Priority = Priority.BULK) -> np.ndarray:
+        """Embed ``texts`` with ``EMBEDDING_MODEL``, ``EMBEDDING_BATCH_SIZE`` texts per request.
+
+        Returns one unit-length float32 row per text, in order.
+        """
+        backend = OpenAiService.open_backend()
+        texts = [text[:settings.EMBEDDING_MAX_CHARS] for text in texts]
+
+        async def embed_batch(batch: list[str]) -> list[list[float]]:
+            estimate = sum(len(text) // 4 + 1 for text in batch)
+            embeddings = await OpenAiService.__with_retries__(
+                lambda: backend.embed(batch, settings.EMBEDDING_MODEL, settings.EMBEDDING_DIMENSIONS), estimate, priority)
+            if embeddings.total_tokens is not None:
+                __scheduler__.settle(estimate, embeddings.total_tokens)
+                llm_tokens.inc(embeddings.total_tokens, model=settings.EMBEDDING_MODEL, kind="embedding")
+            return embeddings.vectors
+
+        batches = [texts[start:start + settings.EMBEDDING_BATCH_SIZE]
+                   for start in range(0, len(texts), settings.EMBEDDING_BATCH_SIZE)]
+        results = await asyncio.gather(*(embed_batch(batch) for batch in batches))
+        vectors = [vector for result in results for vector in result]
+        if not vectors:
+            return np.zeros((0, settings.EMBEDDING_DIMENSIONS), dtype=np.float32)
+        return normalize(np.asarray(vectors, dtype=np.float32))
+
+    @staticmethod
+    async def __with_retries__(call, estimate: int, priority: Priority):
+        """Run ``call`` once admitted by the rate-limit scheduler.
+
+        Rate limits, timeouts and 5xx responses are retried with jittered
+        exponential backoff, never sooner than the provider's Retry-After.
+        A failed attempt refunds its estimate; on success the caller settles
+        it against the real usage.
+        """
+        attempts = settings.OPENAI_MAX_RETRIES + 1
+
+        for attempt in range(attempts):
+            with timed("llm_queue"):
+                await __scheduler__.acquire(estimate, priority)
+            try:
+                with timed("llm"):
+                    return await call()
+            except RetryableLLMError as e:
+                __scheduler__.settle(estimate, 0)
+                if e.retry_after:
+                    __scheduler__.pause(e.retry_after)
+                if attempt == attempts - 1:
+                    raise ServiceUnavailableException(
+                        f"OpenAI API unavailable: {str(e)}", retry_after=max(1, round(e.retry_after or 0)))
+
+                backoff = random.uniform(0, min(
+                    settings.OPENAI_BACKOFF_MAX_SECONDS, settings.OPENAI_BACKOFF_BASE_SECONDS * 2 ** attempt))
+                await asyncio.sleep(max(backoff, e.retry_after or 0))
+            except asyncio.CancelledError:
+                __scheduler__.settle(estimate, 0)
+                raise
+            except Exception as e:
+                # Requests rejected outright are refunded like retryable ones.
+                __scheduler__.settle(estimate, 0)
+                raise InternalServerError(f"OpenAI API error: {str(e)}")
+
+    @staticmethod
+    def __estimate_tokens__(messages: list[dict], options: ChatOptions) -> int:
+        """Rough prompt size (about four characters per token) plus the completion budget."""
+        prompt = sum(len(message["content"]) // 4 + 4 for message in messages)
+        return prompt + options.max_tokens
+
+    @staticmethod
+    def scheduler_stats() -> dict:
+        stats = __scheduler__.stats()
+        stats["queued_by_priority"] = {
+            Priority(priority).name.lower(): count for priority, count in stats["queued_by_priority"].items()
+        }
+        return stats
+
+    @staticmethod
+    async def cache_stats() -> dict:
+        cache = get_llm_cache()
+        if cache is None:
+            return {"enabled": False}
+        return {"enabled": True, **await cache.stats()}
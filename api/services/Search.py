@@ -0,0 +1,23 @@
+from fastapi.responses import ORJSONResponse
+
+from api.repositories import SearchRepository
+from api.schemas import SearchQuery, UserReturn
+from core.exceptions import *
+from core.db import AsyncSessionDep
+from core.types import SearchKind
+
+
+class SearchService:
+    @staticmethod
+    async def search(query: SearchQuery, session: AsyncSessionDep, current_user: UserReturn) -> ORJSONResponse:
+        kinds = list(SearchKind)
+        if query.kinds:
+            try:
+                kinds = [SearchKind(kind.strip()) for kind in query.kinds.split(",") if kind.strip()]
+            except ValueError:
+                kinds = []
+            if not kinds:
+                raise BadRequestException(f"kinds must be a comma separated list of {', '.join(kind.value for kind in SearchKind)}")
+
+        items, next_cursor = await SearchRepository.search(query, kinds, current_user.id, session)
+        return ORJSONResponse({"items": items, "next_cursor": next_cursor})
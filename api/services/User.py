@@ -4,17 +4,19 @@ from uuid import UUID
 
 from api.repositories.User import UserRepository
 from api.models import User
+from api.schemas import UserQuery
 from core.exceptions import *
-from core.db import SessionDep
+from core.db import AsyncSessionDep
 
 
 class UserService:
     @staticmethod
-    async def get_all_users(session: SessionDep) -> list[User]:
-        return await UserRepository.get_all_users(session)
+    async def get_users_page(query: UserQuery, session: AsyncSessionDep) -> dict:
+        items, next_cursor = await UserRepository.get_users_page(query, session)
+        return {"items": items, "next_cursor": next_cursor}
 
     @staticmethod
-    async def get_user_by_id(user_id: UUID, session: SessionDep) -> User:
+    async def get_user_by_id(user_id: UUID, session: AsyncSessionDep) -> User:
         user = await UserRepository.get_user_by_id(user_id, session)
         if not user:
             raise NotFoundException(f"User with id {user_id} not found")
@@ -2,3 +2,7 @@ from api.services.User import UserService
 from api.services.Auth import AuthService
 from api.services.Brand import BrandService
 from api.services.OpenAi import OpenAiService
+from api.services.Embedding import EmbeddingService
+from api.services.Job import JobService
+from api.services.Audience import AudienceService
+from api.services.Search import SearchService
@@ -0,0 +1,140 @@
+"""Micro-benchmark for the response path of the list and detail endpoints.
+
+Seeds one user with ``--brands`` fully generated brands (1k by default, with
+prose sized like real generations), then repeatedly pages through
+``GET /brand/`` and fetches ``GET /brand/{id}`` in-process. Prints latency
+percentiles plus the ``serialize`` stage from the Server-Timing header, which
+covers response validation and JSON encoding. ``--conditional`` revalidates
+with the ETags of earlier responses, so unchanged brands come back as 304.
+
+    python -m benchmarks.serialization --brands 1000 --rounds 20
+    python -m benchmarks.serialization --conditional --accept-encoding gzip
+"""
+import argparse
+import asyncio
+import os
+import random
+import re
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.e2e import percentile
+
+
+def stage_ms(response: httpx.Response, stage: str) -> float:
+    match = re.search(rf"{stage};dur=([\d.]+)", response.headers.get("server-timing", ""))
+    return float(match.group(1)) if match else 0.0
+
+
+def prose(rng: random.Random, words: int) -> str:
+    vocabulary = ("brand", "audience", "market", "premium", "heritage", "digital", "community",
+                  "value", "design", "quality", "trust", "growth", "story", "culture", "craft")
+    return " ".join(rng.choices(vocabulary, k=words))
+
+
+async def seed(client: httpx.AsyncClient, brands: int) -> tuple[dict, list[str]]:
+    from api.repositories import BrandRepository, UserRepository
+    from core.db import async_session_maker
+
+    email = f"bench-{uuid.uuid4().hex}@example.com"
+    await client.post("/auth/register", json={"username": "bench", "email": email, "password": "Benchmark1!"})
+    token = (await client.post("/auth/login", data={"username": email, "password": "Benchmark1!"})).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    async with async_session_maker() as session:
+        user_id = (await UserRepository.get_user_by_email(email, session)).id
+        rng = random.Random(0)
+        rows = [{
+            "name": f"Brand {index:05d}",
+            "website_url": "https://example.com",
+            "about": prose(rng, 180),
+            "key_characteristics": prose(rng, 60),
+            "category": prose(rng, 2),
+            "positioning": prose(rng, 40),
+            "target_audience": prose(rng, 60),
+            "key_competitors": prose(rng, 80),
+            "pending_steps": [],
+            "user_id": user_id,
+        } for index in range(brands)]
+        created = await BrandRepository.create_brands(rows, session, 500)
+        return headers, [str(brand.id) for brand in created]
+
+
+async def run(args: argparse.Namespace) -> None:
+    import main
+    from core.db import engine
+
+    list_samples, list_serialize, detail_samples, detail_serialize = [], [], [], []
+    etags: dict[str, str] = {}
+
+    def conditional(key: str) -> dict:
+        return {**headers, "If-None-Match": etags[key]} if args.conditional and key in etags else headers
+    async with main.app.router.lifespan_context(main.app):
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60,
+                                     headers={"Accept-Encoding": args.accept_encoding}) as client:
+            headers, brand_ids = await seed(client, args.brands)
+            pages: dict[str | None, str | None] = {}
+
+            for _ in range(args.rounds):
+                cursor = None
+                while True:
+                    params = {"limit": args.page_size, **({"cursor": cursor} if cursor else {})}
+                    started = time.perf_counter()
+                    response = await client.get("/brand/", headers=conditional(f"page:{cursor}"), params=params)
+                    list_samples.append(time.perf_counter() - started)
+                    list_serialize.append(stage_ms(response, "serialize"))
+                    if response.status_code == 200:
+                        etags[f"page:{cursor}"] = response.headers["etag"]
+                        pages[cursor] = response.json()["next_cursor"]
+                    cursor = pages[cursor]
+                    if not cursor:
+                        break
+
+                for brand_id in random.sample(brand_ids, min(args.details, len(brand_ids))):
+                    started = time.perf_counter()
+                    response = await client.get(f"/brand/{brand_id}", headers=conditional(brand_id))
+                    if response.status_code == 200:
+                        etags[brand_id] = response.headers["etag"]
+                    detail_samples.append(time.perf_counter() - started)
+                    detail_serialize.append(stage_ms(response, "serialize"))
+    await engine.dispose()
+
+    print(f"{args.brands} brands, page size {args.page_size}, {args.rounds} rounds")
+    print(f"{'endpoint':<18}{'count':>7}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'serialize p50 ms':>18}")
+    for name, samples, serialize in (("GET /brand/", list_samples, list_serialize),
+                                     ("GET /brand/{id}", detail_samples, detail_serialize)):
+        print(f"{name:<18}{len(samples):>7}{percentile(samples, 50):>10.1f}{percentile(samples, 95):>10.1f}"
+              f"{percentile(samples, 99):>10.1f}{statistics.median(serialize):>18.2f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--brands", type=int, default=1000)
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--page-size", type=int, default=500)
+    parser.add_argument("--details", type=int, default=50, help="Brands fetched one by one per round")
+    parser.add_argument("--conditional", action="store_true", help="Revalidate with If-None-Match, as polling dashboards do")
+    parser.add_argument("--accept-encoding", default="identity", help="e.g. gzip to include response compression")
+    parser.add_argument("--database", help="Database URL; a throwaway SQLite file by default")
+    args = parser.parse_args()
+
+    os.environ.update({
+        "DATABASE_STRING": args.database or f"sqlite:///{tempfile.mkdtemp()}/bench.sqlite",
+        "LLM_BACKEND": "stub",
+        "BCRYPT_ROUNDS": "4",
+        "LOG_LEVEL": "WARNING",
+    })
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Micro-benchmark for the in-memory similarity index behind ``/similar``.
+
+Fills a ``PartitionedIndex`` with ``--rows`` random unit vectors (100k
+audiences of 256 dimensions by default) spread over ``--users`` owners, then
+times top-k queries of one owner plus the incremental updates that follow
+edits and deletes. With the default single owner every query scans all rows.
+
+    python -m benchmarks.similarity --rows 100000 --queries 200
+    python -m benchmarks.similarity --users 100
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.e2e import percentile
+from core.vectors import PartitionedIndex, normalize
+
+
+def run(args: argparse.Namespace) -> None:
+    rng = np.random.default_rng(0)
+    vectors = normalize(rng.standard_normal((args.rows, args.dimensions), dtype=np.float32))
+    owners = rng.integers(0, args.users, args.rows)
+    index = PartitionedIndex(args.dimensions)
+
+    started = time.perf_counter()
+    for row in range(args.rows):
+        index.upsert(row, vectors[row], int(owners[row]))
+    load_seconds = time.perf_counter() - started
+
+    samples: dict[str, list[float]] = {"top_k": [], "upsert": [], "remove": []}
+    queries = normalize(rng.standard_normal((args.queries, args.dimensions), dtype=np.float32))
+    for query in queries:
+        row = int(rng.integers(0, args.rows))
+        started = time.perf_counter()
+        index.top_k(query, args.k, group=int(owners[row]), exclude=(row,))
+        samples["top_k"].append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        index.upsert(row, query, int(owners[row]))
+        samples["upsert"].append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        index.remove(row)
+        samples["remove"].append(time.perf_counter() - started)
+        index.upsert(row, vectors[row], int(owners[row]))
+
+    print(f"{args.rows} rows x {args.dimensions} dimensions, {args.users} users, k={args.k}; loaded in {load_seconds:.2f}s")
+    print(f"{'operation':<18}{'count':>7}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for name, values in samples.items():
+        print(f"{name:<18}{len(values):>7}{percentile(values, 50):>10.3f}{percentile(values, 95):>10.3f}{percentile(values, 99):>10.3f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--dimensions", type=int, default=256)
+    parser.add_argument("--users", type=int, default=1)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("-k", type=int, default=10)
+    run(parser.parse_args())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+import time
+from collections import OrderedDict
+from typing import Any, Hashable
+
+
+class TTLCache:
+    """Bounded in-process LRU cache whose entries expire after ``ttl`` seconds."""
+
+    def __init__(self, max_entries: int, ttl: float | None = None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.entries: OrderedDict[Hashable, tuple[float | None, Any]] = OrderedDict()
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Any | None:
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at is not None and expires_at < time.monotonic():
+            del self.entries[key]
+            return None
+        self.entries.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: float | None = None) -> None:
+        ttl = ttl if ttl is not None else self.ttl
+        expires_at = time.monotonic() + ttl if ttl else None
+        self.entries[key] = (expires_at, value)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, key: Hashable) -> None:
+        self.entries.pop(key, None)
+
+    def clear(self) -> None:
+        self.entries.clear()
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+
+class RevocationSet:
+    """In-process set of revoked token ids grouped into buckets by expiry.
+
+    A revoked token only needs remembering until it would have expired anyway,
+    so whole buckets are dropped once their window has passed.
+    """
+
+    def __init__(self, bucket_seconds: int):
+        self.bucket_seconds = bucket_seconds
+        self.buckets: dict[int, set[str]] = {}
+
+    def add(self, token_id: str, expires_at: float) -> None:
+        self.buckets.setdefault(int(expires_at // self.bucket_seconds), set()).add(token_id)
+
+    def prune(self) -> None:
+        current = int(time.time() // self.bucket_seconds)
+        for bucket in [bucket for bucket in self.buckets if bucket < current]:
+            del self.buckets[bucket]
+
+    def clear(self) -> None:
+        self.buckets.clear()
+
+    def __contains__(self, token_id: str) -> bool:
+        self.prune()
+        return any(token_id in bucket for bucket in self.buckets.values())
+
+    def __len__(self) -> int:
+        return sum(len(bucket) for bucket in self.buckets.values())
@@ -0,0 +1,107 @@
+import asyncio
+import gzip
+import time
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from core.metrics import record_stage
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; without it responses are only gzipped
+    brotli = None
+
+__compressible_types__ = ("application/json", "text/")
+# Bodies at least this large are compressed on a worker thread (zlib and
+# brotli release the GIL) instead of stalling the event loop.
+__threaded_size__ = 64 * 1024
+
+
+class CompressionMiddleware:
+    """Compresses buffered responses of at least ``minimum_size`` bytes with
+    brotli (when installed) or gzip, as negotiated through Accept-Encoding.
+
+    Streaming responses are passed through untouched so SSE keeps flushing
+    event by event. Strong ETags get the encoding appended, the way a
+    different representation needs a different tag.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024, gzip_level: int = 4, brotli_quality: int = 4):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = self.__negotiate__(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start: Message | None = None
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start
+            if message["type"] == "http.response.start":
+                start = message
+                return
+            if message["type"] != "http.response.body" or start is None:
+                await send(message)
+                return
+
+            response_start, start = start, None
+            headers = MutableHeaders(raw=list(response_start.get("headers", [])))
+            body = message.get("body", b"")
+            compressible = headers.get("content-type", "").startswith(__compressible_types__)
+            if compressible:
+                headers.add_vary_header("Accept-Encoding")
+            if (not compressible or message.get("more_body") or len(body) < self.minimum_size
+                    or "content-encoding" in headers):
+                await send({**response_start, "headers": headers.raw})
+                await send(message)
+                return
+
+            started = time.perf_counter()
+            if len(body) >= __threaded_size__:
+                body = await asyncio.to_thread(self.__compress__, body, encoding)
+            else:
+                body = self.__compress__(body, encoding)
+            record_stage("compress", time.perf_counter() - started)
+
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(body))
+            etag = headers.get("etag")
+            if etag and not etag.startswith("W/") and etag.endswith('"'):
+                headers["ETag"] = f'{etag[:-1]}-{"br" if encoding == "br" else "gzip"}"'
+            await send({**response_start, "headers": headers.raw})
+            await send({**message, "body": body})
+
+        await self.app(scope, receive, send_compressed)
+
+    def __compress__(self, body: bytes, encoding: str) -> bytes:
+        if encoding == "br":
+            return brotli.compress(body, quality=self.brotli_quality)
+        return gzip.compress(body, compresslevel=self.gzip_level, mtime=0)
+
+    @staticmethod
+    def __negotiate__(accept_encoding: str) -> str | None:
+        accepted = set()
+        for item in accept_encoding.split(","):
+            coding, _, params = item.strip().partition(";")
+            quality = params.strip().removeprefix("q=")
+            try:
+                if params and float(quality) == 0:
+                    continue
+            except ValueError:
+                continue
+            accepted.add(coding.strip().lower())
+        if brotli is not None and "br" in accepted:
+            return "br"
+        if "gzip" in accepted:
+            return "gzip"
+        return None
@@ -9,10 +9,72 @@ class __Settings__(BaseSettings):
     OPENAI_API_KEY: str = "your_openai_api_key"
     DATABASE_STRING_NAME: Optional[str] = "db"
     ACCESS_TOKEN_EXPIRE_MINUTE: Optional[int] = 10
+    AUTH_PRINCIPAL_CACHE_TTL_SECONDS: float = 30.0
+    AUTH_PRINCIPAL_CACHE_MAX_ENTRIES: int = 10000
+    AUTH_TRUST_TOKEN_CLAIMS_SECONDS: int = 0
     REFRESH_TOKEN_EXPIRE_DAY: Optional[int] = 7
+    REVOCATION_BUCKET_SECONDS: int = 3600
+    REVOCATION_SYNC_SECONDS: float = 30.0
     SECRET_KEY: str = "my_secret_key"
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_PENDING: int = 64
+    PASSWORD_HASH_QUEUE_TIMEOUT: float = 5.0
     ALGORITHM: str = "HS256"
     TIMEZONE: Optional[int] = 0
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    DB_ECHO: bool = False
+    LOG_LEVEL: str = "INFO"
+    LOG_SAMPLE_RATE: float = 1.0
+    LOG_SLOW_REQUEST_MS: float = 1000.0
+    SERVER_TIMING_ENABLED: bool = True
+    METRICS_ENABLED: bool = True
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MIN_SIZE: int = 1024
+    COMPRESSION_GZIP_LEVEL: int = 4
+    COMPRESSION_BROTLI_QUALITY: int = 4
+    BRAND_GENERATION_CONCURRENCY: int = 6
+    BRAND_GENERATION_MODE: str = "per_field"
+    BRAND_STRUCTURED_MAX_TOKENS: int = 4000
+    BRAND_IMPORT_MAX_ROWS: int = 1000
+    BRAND_IMPORT_BATCH_SIZE: int = 100
+    BRAND_IMPORT_CONCURRENCY: int = 4
+    AUDIENCE_GENERATION_CONCURRENCY: int = 6
+    AUDIENCE_STRUCTURED_MAX_TOKENS: int = 4000
+    OPENAI_MAX_CONNECTIONS: int = 100
+    OPENAI_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    OPENAI_KEEPALIVE_EXPIRY: float = 30.0
+    OPENAI_TIMEOUT: float = 60.0
+    OPENAI_CONNECT_TIMEOUT: float = 5.0
+    OPENAI_MAX_RETRIES: int = 5
+    OPENAI_BACKOFF_BASE_SECONDS: float = 0.5
+    OPENAI_BACKOFF_MAX_SECONDS: float = 30.0
+    OPENAI_RPM_LIMIT: int = 500
+    OPENAI_TPM_LIMIT: int = 30000
+    LLM_BACKEND: str = "openai"
+    LLM_STUB_LATENCY_MS: float = 800.0
+    LLM_STUB_LATENCY_JITTER_MS: float = 200.0
+    LLM_STUB_TOKENS: int = 250
+    LLM_STUB_TOKENS_JITTER: int = 60
+    LLM_STUB_ERROR_RATE: float = 0.0
+    LLM_STUB_SEED: int = 0
+    LLM_CACHE_ENABLED: bool = False
+    LLM_CACHE_BACKEND: str = "memory"
+    LLM_CACHE_TTL_SECONDS: int = 86400
+    LLM_CACHE_MAX_ENTRIES: int = 10000
+    LLM_CACHE_SWEEP_SECONDS: float = 60.0
+    EMBEDDING_MODEL: str = "text-embedding-3-small"
+    EMBEDDING_DIMENSIONS: int = 256
+    EMBEDDING_BATCH_SIZE: int = 128
+    EMBEDDING_MAX_CHARS: int = 8000
+    EMBEDDING_FLUSH_SECONDS: float = 1.0
+    EMBEDDING_SYNC_SECONDS: float = 30.0
+    JOB_WORKERS: int = 4
+    JOB_SSE_KEEP_ALIVE_SECONDS: float = 15.0
 
     class Config:
         env_file = ".env"
@@ -1,22 +1,221 @@
-from sqlmodel import Session, SQLModel, create_engine
+import time
+from pathlib import Path
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import event, exc, insert, inspect, text, update
+from sqlalchemy.engine import Connection
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlmodel import SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
 from fastapi import Depends
-from typing import Annotated
+from typing import Annotated, AsyncIterator
 from core.config import get_settings
+from core.log import get_logger
+from core.metrics import Gauge, record_stage, registry
 
 settings = get_settings()
-postgresql_database_url = settings.DATABASE_STRING
 
-engine = create_engine(postgresql_database_url, echo=True)
+logger = get_logger("db")
+
+__async_drivers__ = {
+    "postgresql": "postgresql+asyncpg",
+    "postgres": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def get_async_database_url(database_url: str) -> str:
+    url = make_url(database_url)
+    return url.set(drivername=__async_drivers__.get(url.drivername, url.drivername)).render_as_string(hide_password=False)
+
+
+postgresql_database_url = get_async_database_url(settings.DATABASE_STRING)
+
+
+class PoolMetrics:
+    def __init__(self):
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.connects = 0
+        self.connect_total = 0.0
+        self.connect_max = 0.0
+
+    def record_wait(self, seconds: float) -> None:
+        self.checkouts += 1
+        self.wait_total += seconds
+        self.wait_max = max(self.wait_max, seconds)
+
+    def record_connect(self, seconds: float) -> None:
+        self.connects += 1
+        self.connect_total += seconds
+        self.connect_max = max(self.connect_max, seconds)
+
+    def snapshot(self, pool: AsyncAdaptedQueuePool) -> dict:
+        return {
+            "size": pool.size(),
+            "checked_in": pool.checkedin(),
+            "checked_out": pool.checkedout(),
+            "overflow": max(pool.overflow(), 0),
+            "max_overflow": settings.DB_MAX_OVERFLOW,
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "wait_avg_ms": self.wait_total / self.checkouts * 1000 if self.checkouts else 0.0,
+            "wait_max_ms": self.wait_max * 1000,
+            "connects": self.connects,
+            "connect_avg_ms": self.connect_total / self.connects * 1000 if self.connects else 0.0,
+            "connect_max_ms": self.connect_max * 1000,
+        }
+
+
+pool_metrics = PoolMetrics()
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """Queue pool that records checkout wait time and connect latency."""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            pool_metrics.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - start
+            pool_metrics.record_wait(waited)
+            record_stage("db_pool", waited)
+
+    def _create_connection(self):
+        start = time.perf_counter()
+        try:
+            return super()._create_connection()
+        finally:
+            pool_metrics.record_connect(time.perf_counter() - start)
+
+
+engine = create_async_engine(
+    postgresql_database_url,
+    echo=settings.DB_ECHO,
+    poolclass=InstrumentedPool,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    pool_pre_ping=settings.DB_POOL_PRE_PING,
+)
+
+
+# The start time lives on the statement's execution context rather than the
+# pooled connection, so a statement that raises cannot leave it behind.
+@event.listens_for(engine.sync_engine, "before_cursor_execute")
+def __before_cursor_execute__(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context.query_started = time.perf_counter()
+
+
+@event.listens_for(engine.sync_engine, "after_cursor_execute")
+def __after_cursor_execute__(conn, cursor, statement, parameters, context, executemany):
+    __record_query__(context)
 
 
-def initialize_db():
-    print("init db")
-    SQLModel.metadata.create_all(engine)
+@event.listens_for(engine.sync_engine, "handle_error")
+def __handle_error__(exception_context):
+    __record_query__(exception_context.execution_context)
 
 
-def get_session():
-    with Session(engine) as session:
+def __record_query__(context) -> None:
+    started = vars(context).pop("query_started", None) if context is not None else None
+    if started is not None:
+        record_stage("db", time.perf_counter() - started)
+
+
+def get_pool_stats() -> dict:
+    return pool_metrics.snapshot(engine.pool)
+
+
+registry.register(Gauge(
+    "db_pool_connections", "Database pool connections by state.",
+    lambda: {
+        ("checked_out",): engine.pool.checkedout(),
+        ("checked_in",): engine.pool.checkedin(),
+        ("overflow",): max(engine.pool.overflow(), 0),
+    },
+    ("state",),
+))
+
+
+async_session_maker = async_sessionmaker(
+    engine, class_=AsyncSession, expire_on_commit=False)
+
+
+__alembic_ini__ = Path(__file__).resolve().parent.parent / "alembic.ini"
+
+
+def run_migrations(connection: Connection) -> None:
+    config = Config(str(__alembic_ini__))
+    config.attributes["connection"] = connection
+
+    if connection.dialect.name == "postgresql":
+        # Several workers may boot at once; only one of them migrates at a time.
+        connection.execute(text("SELECT pg_advisory_xact_lock(7253315)"))
+
+    tables = inspect(connection).get_table_names()
+    if "users" in tables and "alembic_version" not in tables:
+        # Database created by the old create_all bootstrap: adopt it at the baseline.
+        command.stamp(config, "0001")
+
+    command.upgrade(config, "head")
+
+
+async def initialize_db():
+    logger.info("applying migrations")
+    async with engine.begin() as connection:
+        await connection.run_sync(run_migrations)
+
+
+async def get_session() -> AsyncIterator[AsyncSession]:
+    async with async_session_maker() as session:
         yield session
 
 
-SessionDep = Annotated[Session, Depends(get_session)]
+AsyncSessionDep = Annotated[AsyncSession, Depends(get_session)]
+
+
+async def insert_returning(instance: SQLModel, session: AsyncSession) -> SQLModel:
+    """INSERT ... RETURNING, so the stored row comes back without a second SELECT."""
+    model = type(instance)
+    statement = insert(model).values(**instance.model_dump()).returning(model)
+    return (await session.execute(statement)).scalar_one()
+
+
+async def update_returning(instance: SQLModel, update_data: dict, session: AsyncSession,
+                           expected_version: int | None = None) -> SQLModel | None:
+    """UPDATE ... RETURNING only the columns of ``update_data`` that differ from
+    ``instance``, bumping its optimistic-concurrency ``version``. Keys that are
+    not columns of the table are ignored.
+
+    When ``expected_version`` is given the row is only written if it still has
+    that version; None is returned when it does not.
+    """
+    model = type(instance)
+    columns = model.__table__.columns
+    changes = {key: value for key, value in update_data.items() if key in columns and getattr(instance, key) != value}
+    if not changes:
+        return instance if expected_version in (None, instance.version) else None
+
+    statement = (
+        update(model)
+        .where(model.id == instance.id)
+        .values(**changes, version=model.version + 1)
+        .returning(model)
+        .execution_options(populate_existing=True)
+    )
+    if expected_version is not None:
+        statement = statement.where(model.version == expected_version)
+    return (await session.execute(statement)).scalar_one_or_none()
@@ -26,6 +26,20 @@ class ForbiddenException(HTTPException):
         super().__init__(status_code=HTTPStatus.FORBIDDEN, detail=detail)
 
 
+class ServiceUnavailableException(HTTPException):
+    def __init__(self, detail: str = "Service Unavailable", retry_after: int = 1):
+        super().__init__(
+            status_code=HTTPStatus.SERVICE_UNAVAILABLE,
+            detail=detail,
+            headers={"Retry-After": str(retry_after)},
+        )
+
+
 class InternalServerError(HTTPException):
     def __init__(self, detail: str = "Internal Server Error"):
         super().__init__(status_code=HTTPStatus.INTERNAL_SERVER_ERROR, detail=detail)
+
+
+class BadRequestException(HTTPException):
+    def __init__(self, detail: str = "Bad Request"):
+        super().__init__(status_code=HTTPStatus.BAD_REQUEST, detail=detail)
@@ -0,0 +1,91 @@
+import asyncio
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Awaitable, Callable
+from uuid import UUID
+
+from core.log import get_logger
+from core.metrics import Gauge, registry
+
+logger = get_logger("jobs")
+
+
+class JobQueue:
+    """In-process asyncio worker pool for persisted background jobs.
+
+    Only job ids travel through the queue; the job rows themselves live in the
+    database so they can be resumed after a restart.
+    """
+
+    def __init__(self):
+        self.handlers: dict[str, Callable] = {}
+        self.subscribers: dict[UUID, set[asyncio.Queue]] = defaultdict(set)
+        self.queue: asyncio.Queue | None = None
+        self.workers: list[asyncio.Task] = []
+        self.on_failure: Callable[[UUID, Exception], Awaitable[None]] | None = None
+
+    def register(self, kind: str, handler: Callable) -> None:
+        self.handlers[kind] = handler
+
+    async def start(self, workers: int, runner: Callable[[UUID], Awaitable[None]],
+                    on_failure: Callable[[UUID, Exception], Awaitable[None]] | None = None) -> None:
+        """Start ``workers`` tasks running queued job ids through ``runner``.
+
+        ``on_failure`` gets the job id and the error whenever ``runner``
+        itself raises, so the job can still be marked as failed.
+        """
+        self.on_failure = on_failure
+        self.queue = asyncio.Queue()
+        self.workers = [
+            asyncio.create_task(self.__work__(runner)) for _ in range(workers)
+        ]
+
+    async def stop(self) -> None:
+        for worker in self.workers:
+            worker.cancel()
+        await asyncio.gather(*self.workers, return_exceptions=True)
+        self.workers = []
+        self.queue = None
+
+    def enqueue(self, job_id: UUID) -> None:
+        if self.queue is None:
+            raise RuntimeError("Job queue is not running")
+        self.queue.put_nowait(job_id)
+
+    def depth(self) -> int:
+        return self.queue.qsize() if self.queue is not None else 0
+
+    def publish(self, job_id: UUID, event: str, data: dict) -> None:
+        for subscriber in self.subscribers.get(job_id, ()):
+            subscriber.put_nowait((event, data))
+
+    @contextmanager
+    def subscribe(self, job_id: UUID):
+        subscriber = asyncio.Queue()
+        self.subscribers[job_id].add(subscriber)
+        try:
+            yield subscriber
+        finally:
+            self.subscribers[job_id].discard(subscriber)
+            if not self.subscribers[job_id]:
+                del self.subscribers[job_id]
+
+    async def __work__(self, runner: Callable[[UUID], Awaitable[None]]) -> None:
+        while True:
+            job_id = await self.queue.get()
+            try:
+                await runner(job_id)
+            except Exception as e:
+                logger.exception("job runner failed", extra={"job_id": str(job_id)})
+                if self.on_failure is not None:
+                    try:
+                        await self.on_failure(job_id, e)
+                    except Exception:
+                        logger.exception("could not mark job as failed", extra={"job_id": str(job_id)})
+            finally:
+                self.queue.task_done()
+
+
+job_queue = JobQueue()
+
+registry.register(Gauge("job_queue_depth", "Jobs waiting for a worker.", lambda: {(): job_queue.depth()}))
@@ -0,0 +1,139 @@
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Iterator
+
+
+# Buckets in seconds, spanning sub-millisecond SQL up to long LLM completions.
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = tuple(str(labels[label]) for label in self.labels)
+        self.values[key] = self.values.get(key, 0.0) + amount
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for key, value in self.values.items():
+            lines.append(f"{self.name}{__labels__(self.labels, key)} {value}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = (), buckets: tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = buckets
+        self.values: dict[tuple[str, ...], tuple[list[int], list[float]]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = tuple(str(labels[label]) for label in self.labels)
+        counts, totals = self.values.setdefault(key, ([0] * (len(self.buckets) + 1), [0.0]))
+        counts[bisect_left(self.buckets, value)] += 1
+        totals[0] += value
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for key, (counts, totals) in self.values.items():
+            cumulative = 0
+            for bound, count in zip((*self.buckets, float("inf")), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f"{self.name}_bucket{__labels__((*self.labels, 'le'), (*key, le))} {cumulative}")
+            lines.append(f"{self.name}_sum{__labels__(self.labels, key)} {totals[0]}")
+            lines.append(f"{self.name}_count{__labels__(self.labels, key)} {cumulative}")
+        return lines
+
+
+class Gauge:
+    """Gauge read from ``collect`` at scrape time; returns ``{label values: value}``."""
+
+    def __init__(self, name: str, help: str, collect: Callable[[], dict[tuple[str, ...], float]], labels: tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.collect = collect
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} gauge"]
+        for key, value in self.collect().items():
+            lines.append(f"{self.name}{__labels__(self.labels, key)} {value}")
+        return lines
+
+
+def __labels__(names: tuple[str, ...], values: tuple[str, ...]) -> str:
+    if not names:
+        return ""
+    escaped = (value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for value in values)
+    return "{" + ",".join(f'{name}="{value}"' for name, value in zip(names, escaped)) + "}"
+
+
+class Registry:
+    def __init__(self):
+        self.metrics: list[Counter | Histogram | Gauge] = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+request_duration = registry.register(Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route.", ("method", "route", "status")))
+stage_duration = registry.register(Histogram(
+    "stage_duration_seconds", "Time spent in a request sub-stage (jwt, auth_user, db, db_pool, llm, llm_queue, serialize, ...).", ("stage",)))
+llm_tokens = registry.register(Counter(
+    "llm_tokens_total", "Tokens used by LLM calls.", ("model", "kind")))
+
+
+# Per-request accumulator of stage name -> [total seconds, count].
+__stages__: ContextVar[dict[str, list[float]] | None] = ContextVar("stages", default=None)
+
+
+def start_request_timings() -> dict[str, list[float]]:
+    stages: dict[str, list[float]] = {}
+    __stages__.set(stages)
+    return stages
+
+
+def record_stage(stage: str, seconds: float) -> None:
+    stage_duration.observe(seconds, stage=stage)
+    stages = __stages__.get()
+    if stages is not None:
+        totals = stages.setdefault(stage, [0.0, 0])
+        totals[0] += seconds
+        totals[1] += 1
+
+
+@contextmanager
+def timed(stage: str) -> Iterator[None]:
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(stage, time.perf_counter() - started)
+
+
+def server_timing(stages: dict[str, list[float]], total: float) -> str:
+    entries = [
+        f'{stage};dur={seconds * 1000:.1f};desc="{int(count)}x"'
+        for stage, (seconds, count) in stages.items()
+    ]
+    entries.append(f"total;dur={total * 1000:.1f}")
+    return ", ".join(entries)
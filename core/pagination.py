@@ -0,0 +1,79 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any
+from uuid import UUID
+
+from sqlalchemy import tuple_
+from sqlmodel import SQLModel, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from core.exceptions import BadRequestException
+
+
+def encode_keyset(values: list) -> str:
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode().rstrip("=")
+
+
+def decode_keyset(cursor: str) -> list:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded))
+    except ValueError:
+        raise BadRequestException("Invalid cursor")
+    if not isinstance(values, list):
+        raise BadRequestException("Invalid cursor")
+    return values
+
+
+def encode_cursor(created_at: datetime, id: UUID) -> str:
+    return encode_keyset([created_at.isoformat(), str(id)])
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, UUID]:
+    try:
+        created_at, id = decode_keyset(cursor)
+        return datetime.fromisoformat(created_at), UUID(id)
+    except (ValueError, TypeError):
+        raise BadRequestException("Invalid cursor")
+
+
+def parse_fields(fields: str | None, allowed: set[str]) -> list[str]:
+    if not fields:
+        return sorted(allowed)
+    requested = [field.strip() for field in fields.split(",") if field.strip()]
+    unknown = set(requested) - allowed
+    if unknown:
+        raise BadRequestException(f"Unknown fields: {', '.join(sorted(unknown))}")
+    return requested
+
+
+async def fetch_page(
+    session: AsyncSession,
+    model: type[SQLModel],
+    filters: list,
+    fields: list[str],
+    limit: int,
+    cursor: str | None = None,
+) -> tuple[list[dict[str, Any]], str | None]:
+    """Keyset-paginate ``model`` on (created_at, id), selecting only ``fields``.
+
+    Rows come back as plain dicts holding just the requested columns, so long
+    text columns are never loaded unless asked for.
+    """
+    columns = [getattr(model, field) for field in fields]
+    statement = select(*columns, model.created_at.label("cursor_created_at"), model.id.label("cursor_id")).where(*filters)
+    if cursor:
+        statement = statement.where(
+            tuple_(model.created_at, model.id) > tuple_(*decode_cursor(cursor))
+        )
+    statement = statement.order_by(model.created_at, model.id).limit(limit + 1)
+
+    rows = (await session.exec(statement)).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]._mapping
+        next_cursor = encode_cursor(last["cursor_created_at"], last["cursor_id"])
+
+    return [{field: row._mapping[field] for field in fields} for row in rows], next_cursor
@@ -0,0 +1,132 @@
+import asyncio
+import heapq
+import itertools
+import time
+
+
+class TokenBucket:
+    """Continuously refilling bucket holding at most ``capacity`` units per ``period`` seconds.
+
+    A capacity of 0 disables the limit.
+    """
+
+    def __init__(self, capacity: float, period: float = 60.0):
+        self.capacity = capacity
+        self.rate = capacity / period if capacity else 0.0
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+
+    def __refill__(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until ``amount`` units are available; 0 when they already are."""
+        if not self.capacity:
+            return 0.0
+        self.__refill__()
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+    def consume(self, amount: float) -> None:
+        if self.capacity:
+            self.__refill__()
+            self.tokens -= min(amount, self.capacity)
+
+    def refund(self, amount: float) -> None:
+        if self.capacity:
+            self.__refill__()
+            self.tokens = min(self.capacity, self.tokens + amount)
+
+    def available(self) -> float | None:
+        if not self.capacity:
+            return None
+        self.__refill__()
+        return self.tokens
+
+
+class RateLimitScheduler:
+    """Process-wide admission queue for calls to a rate-limited API.
+
+    Callers wait in priority order (then FIFO) until both the request and the
+    token buckets can cover their estimate. ``pause`` holds every caller back,
+    e.g. for a provider's Retry-After.
+    """
+
+    def __init__(self, requests_per_minute: int, tokens_per_minute: int):
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.waiters: list[tuple[int, int, int]] = []
+        self.sequence = itertools.count()
+        self.condition: asyncio.Condition | None = None
+        self.paused_until = 0.0
+        self.admitted = 0
+        self.throttled = 0
+
+    async def acquire(self, tokens: int, priority: int = 0) -> None:
+        if self.condition is None:
+            self.condition = asyncio.Condition()
+
+        entry = (priority, next(self.sequence), tokens)
+        async with self.condition:
+            heapq.heappush(self.waiters, entry)
+            try:
+                while True:
+                    wait = None
+                    if self.waiters[0] is entry:
+                        wait = self.__wait_time__(tokens)
+                        if wait <= 0:
+                            heapq.heappop(self.waiters)
+                            self.requests.consume(1)
+                            self.tokens.consume(tokens)
+                            self.admitted += 1
+                            self.condition.notify_all()
+                            return
+                        self.throttled += 1
+                    try:
+                        await asyncio.wait_for(self.condition.wait(), wait)
+                    except asyncio.TimeoutError:
+                        pass
+            except BaseException:
+                if entry in self.waiters:
+                    self.waiters.remove(entry)
+                    heapq.heapify(self.waiters)
+                    self.condition.notify_all()
+                raise
+
+    def settle(self, estimated: int, actual: int) -> None:
+        """Correct the token bucket once the real usage of a call is known."""
+        if actual < estimated:
+            self.tokens.refund(estimated - actual)
+        elif actual > estimated:
+            self.tokens.consume(actual - estimated)
+
+    def pause(self, seconds: float) -> None:
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+    def depth(self) -> int:
+        return len(self.waiters)
+
+    def stats(self) -> dict:
+        by_priority: dict[int, int] = {}
+        for priority, _, _ in self.waiters:
+            by_priority[priority] = by_priority.get(priority, 0) + 1
+        return {
+            "queued": self.depth(),
+            "queued_by_priority": by_priority,
+            "admitted": self.admitted,
+            "throttled": self.throttled,
+            "requests_available": self.requests.available(),
+            "tokens_available": self.tokens.available(),
+            "paused_for": max(0.0, self.paused_until - time.monotonic()),
+        }
+
+    def __wait_time__(self, tokens: int) -> float:
+        return max(
+            self.paused_until - time.monotonic(),
+            self.requests.wait_time(1),
+            self.tokens.wait_time(tokens),
+        )
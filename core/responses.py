@@ -0,0 +1,55 @@
+import hashlib
+from typing import Any
+
+from fastapi import Response
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+
+# Suffixes CompressionMiddleware appends to the ETag of an encoded response.
+__etag_encodings__ = ("-gzip", "-br")
+
+
+def orm_fields(obj: Any, schema: type[BaseModel]) -> dict[str, Any]:
+    """Read ``schema``'s fields straight off an ORM instance, without validating them again."""
+    return {field: getattr(obj, field) for field in schema.model_fields}
+
+
+def orm_response(obj: Any, schema: type[BaseModel], status_code: int = 200) -> ORJSONResponse:
+    return ORJSONResponse(orm_fields(obj, schema), status_code=status_code)
+
+
+def model_response(content: BaseModel | list[BaseModel], status_code: int = 200) -> ORJSONResponse:
+    """Render models the service already validated.
+
+    Returning a response directly skips FastAPI's second validation pass
+    against ``response_model``; the route keeps it for the OpenAPI schema.
+    """
+    if isinstance(content, list):
+        return ORJSONResponse([model.model_dump() for model in content], status_code=status_code)
+    return ORJSONResponse(content.model_dump(), status_code=status_code)
+
+
+def make_etag(*parts: Any) -> str:
+    """Strong ETag hashing ``parts``, e.g. a row's id, version and updated_at."""
+    digest = hashlib.blake2b("|".join(map(str, parts)).encode(), digest_size=16).hexdigest()
+    return f'"{digest}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against ``etag``, as RFC 9110 asks for GET."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip().removeprefix("W/")
+        for suffix in __etag_encodings__:
+            if candidate.endswith(suffix + '"'):
+                candidate = candidate[:-len(suffix) - 1] + '"'
+        if candidate == etag:
+            return True
+    return False
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag})
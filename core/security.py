@@ -1,19 +1,48 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, UTC
 from passlib.context import CryptContext
 import jwt
 
 from fastapi.security import OAuth2PasswordBearer
 
+from core.cache import RevocationSet, TTLCache
 from core.config import get_settings
+from core.exceptions import ServiceUnavailableException
+from core.metrics import timed
 from core.types import TokenType
 
 settings = get_settings()
 
 
-__pwd_context__ = CryptContext(schemes=["bcrypt"], deprecated="auto")
+__pwd_context__ = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__min_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__max_rounds=settings.BCRYPT_ROUNDS,
+)
+
+# bcrypt releases the GIL, so a small thread pool keeps hashing off the event
+# loop. The semaphore bounds how many hashes may be queued at once so a login
+# burst is answered with 503 instead of growing an unbounded backlog. Both are
+# created by open_hash_pool and torn down by shutdown_hash_pool.
+__hash_executor__: ThreadPoolExecutor | None = None
+__hash_slots__: asyncio.Semaphore | None = None
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
+# Per-process cache of user principal state (active/verified/superuser) keyed by
+# user id. Entries are dropped whenever those flags change in this process; the
+# short TTL bounds how stale another worker's copy can get.
+principal_cache = TTLCache(
+    settings.AUTH_PRINCIPAL_CACHE_MAX_ENTRIES, settings.AUTH_PRINCIPAL_CACHE_TTL_SECONDS
+)
+
+# Refresh tokens that were rotated out, and token families ended after a reuse,
+# mirrored from the revoked_tokens table so refreshes are checked in memory.
+revoked_tokens = RevocationSet(settings.REVOCATION_BUCKET_SECONDS)
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return __pwd_context__.verify(plain_password, hashed_password)
@@ -23,6 +52,51 @@ def get_password_hash(password: str) -> str:
     return __pwd_context__.hash(password)
 
 
+def open_hash_pool() -> tuple[ThreadPoolExecutor, asyncio.Semaphore]:
+    """Create the process-wide password hashing pool on first use."""
+    global __hash_executor__, __hash_slots__
+    if __hash_executor__ is None:
+        __hash_executor__ = ThreadPoolExecutor(
+            max_workers=settings.PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash"
+        )
+        __hash_slots__ = asyncio.Semaphore(settings.PASSWORD_HASH_MAX_PENDING)
+    return __hash_executor__, __hash_slots__
+
+
+async def __run_in_hash_pool__(func, *args):
+    executor, slots = open_hash_pool()
+    try:
+        await asyncio.wait_for(slots.acquire(), settings.PASSWORD_HASH_QUEUE_TIMEOUT)
+    except asyncio.TimeoutError:
+        raise ServiceUnavailableException("Too many concurrent password operations, retry shortly.")
+    try:
+        with timed("password_hash"):
+            return await asyncio.get_running_loop().run_in_executor(executor, func, *args)
+    finally:
+        slots.release()
+
+
+async def hash_password(password: str) -> str:
+    return await __run_in_hash_pool__(__pwd_context__.hash, password)
+
+
+async def verify_and_rehash_password(plain_password: str, hashed_password: str) -> tuple[bool, str | None]:
+    """Verify a password off the event loop.
+
+    Also returns a fresh hash when the stored one was made with a different
+    cost factor than ``BCRYPT_ROUNDS``, so the caller can transparently upgrade it.
+    """
+    return await __run_in_hash_pool__(__pwd_context__.verify_and_update, plain_password, hashed_password)
+
+
+def shutdown_hash_pool() -> None:
+    global __hash_executor__, __hash_slots__
+    if __hash_executor__ is not None:
+        __hash_executor__.shutdown(wait=False, cancel_futures=True)
+        __hash_executor__ = None
+        __hash_slots__ = None
+
+
 def create_access_token(data: dict, expires_delta: timedelta | None = None) -> str:
     to_encode = data.copy()
     if expires_delta:
@@ -31,7 +105,7 @@ def create_access_token(data: dict, expires_delta: timedelta | None = None) -> s
         expire = datetime.now(UTC).replace(tzinfo=None) + timedelta(
             minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTE
         )
-    to_encode.update({"exp": expire, "token_type": TokenType.ACCESS})
+    to_encode.update({"exp": expire, "iat": datetime.now(UTC), "token_type": TokenType.ACCESS})
     encoded_jwt = jwt.encode(
         to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
@@ -52,11 +126,9 @@ def create_refresh_token(data: dict, expires_delta: timedelta | None = None) ->
 
 def verify_token(token: str, token_type: TokenType):
     try:
-        print(token_type)
-        print(token)
-        payload = jwt.decode(token, settings.SECRET_KEY,
-                             algorithms=[settings.ALGORITHM])
-        print(payload)
+        with timed("jwt"):
+            payload = jwt.decode(token, settings.SECRET_KEY,
+                                 algorithms=[settings.ALGORITHM])
         if payload["token_type"] != token_type:
             return False
         return payload
@@ -0,0 +1,12 @@
+import json
+
+
+def format_sse(event: str, data: dict | str) -> str:
+    if not isinstance(data, str):
+        data = json.dumps(data, default=str)
+    lines = "".join(f"data: {line}\n" for line in data.splitlines() or [""])
+    return f"event: {event}\n{lines}\n"
+
+
+def keep_alive() -> str:
+    return ": keep-alive\n\n"
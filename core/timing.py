@@ -0,0 +1,93 @@
+import time
+from contextvars import ContextVar
+from functools import wraps
+from typing import Callable
+
+from fastapi import Request, Response
+from fastapi.routing import APIRoute
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from core.log import get_logger
+from core.metrics import record_stage, request_duration, server_timing, start_request_timings
+
+from core.config import get_settings
+settings = get_settings()
+
+logger = get_logger("http")
+
+# perf_counter() at which the endpoint function returned, so the route can
+# attribute the remaining handler time to response validation and rendering.
+__endpoint_done__: ContextVar[float | None] = ContextVar("endpoint_done", default=None)
+
+
+class TimedRoute(APIRoute):
+    """APIRoute that records the time spent serializing the endpoint's return value."""
+
+    def __init__(self, path: str, endpoint: Callable, **kwargs):
+        @wraps(endpoint)
+        async def timed_endpoint(*args, **kwargs):
+            try:
+                return await endpoint(*args, **kwargs)
+            finally:
+                __endpoint_done__.set(time.perf_counter())
+
+        super().__init__(path, timed_endpoint, **kwargs)
+
+    def get_route_handler(self) -> Callable[[Request], Response]:
+        handler = super().get_route_handler()
+
+        async def timed_handler(request: Request) -> Response:
+            response = await handler(request)
+            endpoint_done = __endpoint_done__.get()
+            if endpoint_done is not None:
+                record_stage("serialize", time.perf_counter() - endpoint_done)
+            return response
+
+        return timed_handler
+
+
+class TimingMiddleware:
+    """Records latency per route, adds a Server-Timing header with the
+    per-stage breakdown and logs one sampled line per request."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        stages = start_request_timings()
+        status = 500
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if settings.SERVER_TIMING_ENABLED:
+                    headers = list(message.get("headers", []))
+                    headers.append((b"server-timing", server_timing(stages, time.perf_counter() - started).encode()))
+                    message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            elapsed = time.perf_counter() - started
+            route = scope.get("route")
+            route_path = getattr(route, "path", "unmatched")
+            request_duration.observe(elapsed, method=scope["method"], route=route_path, status=status)
+
+            fields = {
+                "method": scope["method"],
+                "route": route_path,
+                "status": status,
+                "duration_ms": round(elapsed * 1000, 1),
+                "stages_ms": {stage: round(seconds * 1000, 1) for stage, (seconds, _) in stages.items()},
+            }
+            if elapsed * 1000 >= settings.LOG_SLOW_REQUEST_MS:
+                logger.warning("slow request", extra=fields)
+            else:
+                logger.info("request", extra=fields)
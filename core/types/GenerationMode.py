@@ -0,0 +1,6 @@
+from enum import Enum
+
+
+class GenerationMode(str, Enum):
+    PER_FIELD = "per_field"
+    STRUCTURED = "structured"
@@ -0,0 +1,8 @@
+from enum import Enum
+
+
+class JobKind(str, Enum):
+    GENERATE_BRAND = "generate_brand"
+    RERUN_STEP = "rerun_step"
+    IMPORT_BRANDS = "import_brands"
+    GENERATE_AUDIENCES = "generate_audiences"
@@ -0,0 +1,7 @@
+from enum import IntEnum
+
+
+class Priority(IntEnum):
+    """Scheduling class of an LLM request; lower values are served first."""
+    INTERACTIVE = 0
+    BULK = 1
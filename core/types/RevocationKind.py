@@ -0,0 +1,6 @@
+from enum import Enum
+
+
+class RevocationKind(str, Enum):
+    TOKEN = "token"
+    FAMILY = "family"
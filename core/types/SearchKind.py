@@ -0,0 +1,7 @@
+from enum import Enum
+
+
+class SearchKind(str, Enum):
+    BRAND = "brand"
+    AUDIENCE = "audience"
+    TRIGGER = "trigger"
@@ -1 +1,7 @@
 from core.types.TokenType import TokenType
+from core.types.JobStatus import JobStatus
+from core.types.JobKind import JobKind
+from core.types.GenerationMode import GenerationMode
+from core.types.Priority import Priority
+from core.types.RevocationKind import RevocationKind
+from core.types.SearchKind import SearchKind
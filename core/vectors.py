@@ -0,0 +1,135 @@
+from typing import Hashable
+
+import numpy as np
+
+
+def normalize(vectors: np.ndarray) -> np.ndarray:
+    """Scale rows to unit length so dot products are cosine similarities."""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.maximum(norms, np.float32(1e-12))
+
+
+def to_bytes(vector: np.ndarray) -> bytes:
+    return np.asarray(vector, dtype="<f4").tobytes()
+
+
+def from_bytes(data: bytes) -> np.ndarray:
+    return np.frombuffer(data, dtype="<f4")
+
+
+class VectorIndex:
+    """Unit vectors held in one contiguous float32 matrix for exact cosine top-k.
+
+    A query is a single matrix-vector product over the filled rows. Rows are
+    updated in place, appended into spare capacity and deleted by moving the
+    last row into the hole, so no change rebuilds the matrix.
+    """
+
+    def __init__(self, dimensions: int, capacity: int = 16):
+        self.dimensions = dimensions
+        self.vectors = np.zeros((capacity, dimensions), dtype=np.float32)
+        self.ids: list[Hashable] = []
+        self.rows: dict[Hashable, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __contains__(self, id: Hashable) -> bool:
+        return id in self.rows
+
+    def get(self, id: Hashable) -> np.ndarray | None:
+        row = self.rows.get(id)
+        return None if row is None else self.vectors[row].copy()
+
+    def upsert(self, id: Hashable, vector: np.ndarray) -> None:
+        """Insert or replace the vector of ``id``; it must already be unit length."""
+        row = self.rows.get(id)
+        if row is None:
+            row = len(self.ids)
+            if row == len(self.vectors):
+                self.__grow__()
+            self.ids.append(id)
+            self.rows[id] = row
+        self.vectors[row] = vector
+
+    def remove(self, id: Hashable) -> None:
+        row = self.rows.pop(id, None)
+        if row is None:
+            return
+        last = len(self.ids) - 1
+        if row != last:
+            moved = self.ids[last]
+            self.vectors[row] = self.vectors[last]
+            self.ids[row] = moved
+            self.rows[moved] = row
+        self.ids.pop()
+
+    def top_k(self, vector: np.ndarray, k: int, exclude: tuple[Hashable, ...] = ()) -> list[tuple[Hashable, float]]:
+        """The ``k`` rows most similar to ``vector``, best first, as (id, cosine similarity)."""
+        count = len(self.ids)
+        if count == 0 or k <= 0:
+            return []
+        scores = self.vectors[:count] @ np.asarray(vector, dtype=np.float32)
+        for id in exclude:
+            row = self.rows.get(id)
+            if row is not None:
+                scores[row] = -np.inf
+
+        k = min(k, count)
+        # argpartition finds the top k in linear time; only those k get sorted.
+        top = np.argpartition(scores, count - k)[count - k:]
+        top = top[np.argsort(scores[top])[::-1]]
+        return [(self.ids[row], float(scores[row])) for row in top if scores[row] > -np.inf]
+
+    def __grow__(self) -> None:
+        vectors = np.zeros((len(self.vectors) * 2, self.dimensions), dtype=np.float32)
+        vectors[:len(self.vectors)] = self.vectors
+        self.vectors = vectors
+
+
+class PartitionedIndex:
+    """One ``VectorIndex`` per group (the owning user), so a query only scans
+    the rows it may return rather than masking everybody else's.
+    """
+
+    def __init__(self, dimensions: int):
+        self.dimensions = dimensions
+        self.partitions: dict[Hashable, VectorIndex] = {}
+        self.groups: dict[Hashable, Hashable] = {}
+
+    def __len__(self) -> int:
+        return len(self.groups)
+
+    def __contains__(self, id: Hashable) -> bool:
+        return id in self.groups
+
+    def get(self, id: Hashable) -> np.ndarray | None:
+        group = self.groups.get(id)
+        return None if group is None else self.partitions[group].get(id)
+
+    def group_of(self, id: Hashable) -> Hashable | None:
+        return self.groups.get(id)
+
+    def upsert(self, id: Hashable, vector: np.ndarray, group: Hashable) -> None:
+        if self.groups.get(id, group) != group:
+            self.remove(id)
+        partition = self.partitions.get(group)
+        if partition is None:
+            partition = self.partitions[group] = VectorIndex(self.dimensions)
+        partition.upsert(id, vector)
+        self.groups[id] = group
+
+    def remove(self, id: Hashable) -> None:
+        group = self.groups.pop(id, None)
+        if group is None:
+            return
+        partition = self.partitions[group]
+        partition.remove(id)
+        if not partition:
+            del self.partitions[group]
+
+    def top_k(self, vector: np.ndarray, k: int, group: Hashable,
+              exclude: tuple[Hashable, ...] = ()) -> list[tuple[Hashable, float]]:
+        partition = self.partitions.get(group)
+        return partition.top_k(vector, k, exclude) if partition is not None else []
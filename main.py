@@ -1,22 +1,58 @@
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from contextlib import asynccontextmanager
 from api.models import Brand, User, Audience, StrategicGoal
 
 from api.routers import *
 
-from core.db import initialize_db
+from api.services import AuthService, EmbeddingService, OpenAiService, JobService
+from core.compression import CompressionMiddleware
+from core.db import engine, initialize_db
+from core.log import configure_logging, get_logger
+from core.security import open_hash_pool, shutdown_hash_pool
+from core.timing import TimingMiddleware
+
+from core.config import get_settings
+settings = get_settings()
+
+configure_logging()
+logger = get_logger("app")
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    print("Starting db...")
-    initialize_db()
+    logger.info("starting")
+    await initialize_db()
+    await AuthService.load_revocations()
+    OpenAiService.open_backend()
+    open_hash_pool()
+    await JobService.start()
+    await EmbeddingService.start()
     yield
-    print("Stopping db...")
+    await EmbeddingService.stop()
+    await JobService.stop()
+    await OpenAiService.close_backend()
+    shutdown_hash_pool()
+    logger.info("stopping")
+    await engine.dispose()
 
 
-app = FastAPI(lifespan=lifespan)
+app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.COMPRESSION_MIN_SIZE,
+        gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+        brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
+    )
+app.add_middleware(TimingMiddleware)
 
 app.include_router(user_router)
 app.include_router(auth_router)
 app.include_router(brand_router)
+app.include_router(audience_router)
+app.include_router(search_router)
+app.include_router(job_router)
+app.include_router(internal_router)
+if settings.METRICS_ENABLED:
+    app.include_router(metrics_router)
@@ -0,0 +1,129 @@
+"""initial schema
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18 00:00:00.000000
+
+Matches the tables that ``SQLModel.metadata.create_all`` used to create at
+startup. Databases created that way are stamped at this revision instead of
+running it.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0001"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def timestamps() -> list[sa.Column]:
+    return [
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+    ]
+
+
+def upgrade() -> None:
+    op.create_table(
+        "users",
+        sa.Column("id", sa.Uuid(), nullable=False),
+        sa.Column("username", sa.String(), nullable=False),
+        sa.Column("email", sa.String(), nullable=False),
+        sa.Column("hashed_password", sa.String(), nullable=False),
+        sa.Column("is_active", sa.Boolean(), nullable=False),
+        sa.Column("is_verified", sa.Boolean(), nullable=False),
+        sa.Column("is_superuser", sa.Boolean(), nullable=False),
+        *timestamps(),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_table(
+        "brands",
+        sa.Column("id", sa.Uuid(), nullable=False),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("website_url", sa.String(), nullable=True),
+        sa.Column("about", sa.String(), nullable=True),
+        sa.Column("key_characteristics", sa.String(), nullable=True),
+        sa.Column("category", sa.String(), nullable=True),
+        sa.Column("positioning", sa.String(), nullable=True),
+        sa.Column("target_audience", sa.String(), nullable=True),
+        sa.Column("key_competitors", sa.String(), nullable=True),
+        sa.Column("first_access", sa.Boolean(), nullable=False),
+        sa.Column("brand_summary_active", sa.Boolean(), nullable=True),
+        sa.Column("ad_legacy_active", sa.Boolean(), nullable=True),
+        sa.Column("strategic_goals_active", sa.Boolean(), nullable=True),
+        sa.Column("audience_active", sa.Boolean(), nullable=True),
+        sa.Column("brand_universe_active", sa.Boolean(), nullable=True),
+        sa.Column("user_id", sa.Uuid(), nullable=False),
+        *timestamps(),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_table(
+        "audiences",
+        sa.Column("id", sa.Uuid(), nullable=False),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("description", sa.String(), nullable=True),
+        sa.Column("image_prompt", sa.String(), nullable=True),
+        sa.Column("image_url", sa.String(), nullable=True),
+        sa.Column("key_tags", sa.String(), nullable=True),
+        sa.Column("psycho_graphic", sa.String(), nullable=True),
+        sa.Column("attitudinal", sa.String(), nullable=True),
+        sa.Column("self_concept", sa.String(), nullable=True),
+        sa.Column("lifestyle", sa.String(), nullable=True),
+        sa.Column("media_habits", sa.String(), nullable=True),
+        sa.Column("general_keywords", sa.String(), nullable=True),
+        sa.Column("brand_keywords", sa.String(), nullable=True),
+        sa.Column("brand_id", sa.Uuid(), nullable=False),
+        *timestamps(),
+        sa.ForeignKeyConstraint(["brand_id"], ["brands.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_table(
+        "strategic_goals",
+        sa.Column("id", sa.Uuid(), nullable=False),
+        sa.Column("strategic_goal", sa.String(), nullable=False),
+        *timestamps(),
+        sa.Column("brand_id", sa.Uuid(), nullable=False),
+        sa.ForeignKeyConstraint(["brand_id"], ["brands.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_table(
+        "demographics",
+        sa.Column("id", sa.Uuid(), nullable=False),
+        sa.Column("audience_id", sa.Uuid(), nullable=False),
+        sa.Column("gender", sa.String(), nullable=True),
+        sa.Column("age_bracket", sa.String(), nullable=True),
+        sa.Column("hhi", sa.String(), nullable=True),
+        sa.Column("race", sa.String(), nullable=True),
+        sa.Column("education", sa.String(), nullable=True),
+        sa.Column("location", sa.String(), nullable=True),
+        *timestamps(),
+        sa.ForeignKeyConstraint(["audience_id"], ["audiences.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_table(
+        "triggers",
+        sa.Column("id", sa.Uuid(), nullable=False),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("description", sa.String(), nullable=False),
+        sa.Column("image_prompt", sa.String(), nullable=False),
+        sa.Column("trigger_img", sa.String(), nullable=True),
+        sa.Column("territory", sa.String(), nullable=True),
+        *timestamps(),
+        sa.Column("audience_id", sa.Uuid(), nullable=False),
+        sa.ForeignKeyConstraint(["audience_id"], ["audiences.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("triggers")
+    op.drop_table("demographics")
+    op.drop_table("strategic_goals")
+    op.drop_table("audiences")
+    op.drop_table("brands")
+    op.drop_table("users")
@@ -0,0 +1,63 @@
+"""jobs, llm cache and brand pending steps
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 00:00:00.000000
+
+Databases that picked these up through ``create_all`` before migrations
+existed already have some of them, so each step checks first.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0002"
+down_revision: Union[str, None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    tables = inspector.get_table_names()
+
+    if "pending_steps" not in {column["name"] for column in inspector.get_columns("brands")}:
+        op.add_column("brands", sa.Column("pending_steps", sa.JSON(), nullable=True))
+
+    if "jobs" not in tables:
+        op.create_table(
+            "jobs",
+            sa.Column("id", sa.Uuid(), nullable=False),
+            sa.Column("kind", sa.String(), nullable=False),
+            sa.Column("status", sa.String(), nullable=False),
+            sa.Column("payload", sa.JSON(), nullable=True),
+            sa.Column("result", sa.JSON(), nullable=True),
+            sa.Column("error", sa.String(), nullable=True),
+            sa.Column("user_id", sa.Uuid(), nullable=False),
+            sa.Column("brand_id", sa.Uuid(), nullable=True),
+            sa.Column("created_at", sa.DateTime(), nullable=True),
+            sa.Column("updated_at", sa.DateTime(), nullable=True),
+            sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+            sa.PrimaryKeyConstraint("id"),
+        )
+
+    if "llm_cache" not in tables:
+        op.create_table(
+            "llm_cache",
+            sa.Column("key", sa.String(length=64), nullable=False),
+            sa.Column("content", sa.String(), nullable=False),
+            sa.Column("expires_at", sa.DateTime(), nullable=True),
+            sa.Column("last_accessed_at", sa.DateTime(), nullable=False),
+            sa.Column("created_at", sa.DateTime(), nullable=True),
+            sa.PrimaryKeyConstraint("key"),
+        )
+        op.create_index("ix_llm_cache_last_accessed_at", "llm_cache", ["last_accessed_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_llm_cache_last_accessed_at", table_name="llm_cache")
+    op.drop_table("llm_cache")
+    op.drop_table("jobs")
+    op.drop_column("brands", "pending_steps")
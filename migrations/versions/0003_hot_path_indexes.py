@@ -0,0 +1,92 @@
+"""indexes and unique constraints for the hot lookup columns
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 00:00:00.000000
+
+Databases built with ``create_all`` by earlier releases may already have
+some of these, so each one is only created when missing.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0003"
+down_revision: Union[str, None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Databases bootstrapped with create_all never enforced these constraints.
+    __check_duplicate_emails__()
+    __rename_duplicate_brands__()
+
+    __create_index__("ix_users_email", "users", ["email"], unique=True)
+    __create_index__("ix_users_created_at_id", "users", ["created_at", "id"])
+
+    if "uq_brands_user_id_name" not in {constraint["name"] for constraint in sa.inspect(op.get_bind()).get_unique_constraints("brands")}:
+        with op.batch_alter_table("brands") as batch_op:
+            batch_op.create_unique_constraint("uq_brands_user_id_name", ["user_id", "name"])
+    __create_index__("ix_brands_user_id_created_at_id", "brands", ["user_id", "created_at", "id"])
+    __create_index__("ix_brands_created_at_id", "brands", ["created_at", "id"])
+
+    __create_index__("ix_audiences_brand_id", "audiences", ["brand_id"])
+    __create_index__("ix_strategic_goals_brand_id", "strategic_goals", ["brand_id"])
+    __create_index__("ix_demographics_audience_id", "demographics", ["audience_id"])
+    __create_index__("ix_triggers_audience_id", "triggers", ["audience_id"])
+    __create_index__("ix_jobs_status", "jobs", ["status"])
+
+
+def __create_index__(name: str, table: str, columns: list[str], unique: bool = False) -> None:
+    if name not in {index["name"] for index in sa.inspect(op.get_bind()).get_indexes(table)}:
+        op.create_index(name, table, columns, unique=unique)
+
+def __check_duplicate_emails__() -> None:
+    """Abort before the unique index is created if two users share an email.
+
+    Which account keeps an email is for an operator to decide, so nothing is
+    changed automatically.
+    """
+    rows = op.get_bind().execute(sa.text(
+        "SELECT email, id FROM users WHERE email IN "
+        "(SELECT email FROM users GROUP BY email HAVING COUNT(*) > 1) ORDER BY email, created_at, id"
+    )).all()
+    if rows:
+        duplicates = "; ".join(f"{email} (user {id})" for email, id in rows)
+        raise RuntimeError(
+            f"Cannot add the unique index on users.email: duplicate emails found: {duplicates}. "
+            "Merge or rename these users, then restart to finish the migration.")
+
+
+def __rename_duplicate_brands__() -> None:
+    """Suffix repeated brand names of a user with the brand's short id; the oldest keeps its name."""
+    bind = op.get_bind()
+    rows = bind.execute(sa.text(
+        "SELECT b.id, b.user_id, b.name FROM brands b JOIN "
+        "(SELECT user_id, name FROM brands GROUP BY user_id, name HAVING COUNT(*) > 1) d "
+        "ON b.user_id = d.user_id AND b.name = d.name ORDER BY b.user_id, b.name, b.created_at, b.id"
+    )).all()
+    seen = set()
+    for id, user_id, name in rows:
+        if (user_id, name) not in seen:
+            seen.add((user_id, name))
+            continue
+        bind.execute(sa.text("UPDATE brands SET name = :name WHERE id = :id"),
+                     {"name": f"{name} ({str(id).replace('-', '')[:8]})", "id": id})
+
+
+def downgrade() -> None:
+    op.drop_index("ix_jobs_status", table_name="jobs")
+    op.drop_index("ix_triggers_audience_id", table_name="triggers")
+    op.drop_index("ix_demographics_audience_id", table_name="demographics")
+    op.drop_index("ix_strategic_goals_brand_id", table_name="strategic_goals")
+    op.drop_index("ix_audiences_brand_id", table_name="audiences")
+    op.drop_index("ix_brands_created_at_id", table_name="brands")
+    op.drop_index("ix_brands_user_id_created_at_id", table_name="brands")
+    with op.batch_alter_table("brands") as batch_op:
+        batch_op.drop_constraint("uq_brands_user_id_name", type_="unique")
+    op.drop_index("ix_users_created_at_id", table_name="users")
+    op.drop_index("ix_users_email", table_name="users")
@@ -0,0 +1,24 @@
+"""brand section input hashes
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 00:00:00.000000
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0004"
+down_revision: Union[str, None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("brands", sa.Column("section_hashes", sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("brands", "section_hashes")
@@ -0,0 +1,65 @@
+"""full-text search vectors on brands, audiences and triggers
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18 00:00:00.000000
+
+Postgres only: each table gets a stored generated tsvector column with a GIN
+index. The columns are not mapped on the models, so other databases fall
+back to LIKE matching in SearchRepository.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = "0007"
+down_revision: Union[str, None] = "0006"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Columns per weight class: A ranks highest.
+__vectors__ = {
+    "brands": {
+        "A": ["name"],
+        "B": ["about", "positioning"],
+        "C": ["target_audience", "key_competitors"],
+    },
+    "audiences": {
+        "A": ["name", "key_tags"],
+        "B": ["description", "general_keywords", "brand_keywords"],
+        "C": ["psycho_graphic", "attitudinal", "self_concept", "lifestyle", "media_habits"],
+    },
+    "triggers": {
+        "A": ["name", "territory"],
+        "B": ["description"],
+    },
+}
+
+
+def __expression__(weights: dict[str, list[str]]) -> str:
+    parts = []
+    for weight, columns in weights.items():
+        document = " || ' ' || ".join(f"coalesce({column}, '')" for column in columns)
+        parts.append(f"setweight(to_tsvector('english'::regconfig, {document}), '{weight}')")
+    return " || ".join(parts)
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    for table, weights in __vectors__.items():
+        op.execute(
+            f"ALTER TABLE {table} ADD COLUMN search_vector tsvector "
+            f"GENERATED ALWAYS AS ({__expression__(weights)}) STORED"
+        )
+        op.execute(f"CREATE INDEX ix_{table}_search_vector ON {table} USING gin (search_vector)")
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    for table in __vectors__:
+        op.execute(f"DROP INDEX ix_{table}_search_vector")
+        op.execute(f"ALTER TABLE {table} DROP COLUMN search_vector")
@@ -0,0 +1,38 @@
+"""embeddings of brands and audiences
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-18 00:00:00.000000
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0008"
+down_revision: Union[str, None] = "0007"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "embeddings",
+        sa.Column("kind", sa.String(length=16), nullable=False),
+        sa.Column("item_id", sa.Uuid(), nullable=False),
+        sa.Column("user_id", sa.Uuid(), nullable=False),
+        sa.Column("model", sa.String(), nullable=False),
+        sa.Column("content_hash", sa.String(length=64), nullable=False),
+        sa.Column("vector", sa.LargeBinary(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("kind", "item_id"),
+    )
+    op.create_index("ix_embeddings_user_id", "embeddings", ["user_id"])
+    op.create_index("ix_embeddings_updated_at", "embeddings", ["updated_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_embeddings_updated_at", table_name="embeddings")
+    op.drop_index("ix_embeddings_user_id", table_name="embeddings")
+    op.drop_table("embeddings")
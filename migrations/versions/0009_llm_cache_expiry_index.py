@@ -0,0 +1,23 @@
+"""index llm_cache.expires_at for the expiry sweep
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-18 00:00:00.000000
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = "0009"
+down_revision: Union[str, None] = "0008"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_llm_cache_expires_at", "llm_cache", ["expires_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_llm_cache_expires_at", table_name="llm_cache")
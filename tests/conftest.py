@@ -0,0 +1,45 @@
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# Settings are read once, so the test database has to be chosen before any app import.
+os.environ["DATABASE_STRING"] = f"sqlite:///{tempfile.mkdtemp()}/test.sqlite"
+os.environ["LLM_BACKEND"] = "stub"
+os.environ["LLM_STUB_LATENCY_MS"] = "0"
+os.environ["LLM_STUB_LATENCY_JITTER_MS"] = "0"
+
+from api.models import User
+from core.db import async_session_maker, engine, initialize_db
+
+
+@pytest.fixture(scope="session")
+def anyio_backend() -> str:
+    return "asyncio"
+
+
+@pytest.fixture(scope="session")
+async def database():
+    await initialize_db()
+    yield
+    # aiosqlite connections run on threads that keep the interpreter alive until closed.
+    await engine.dispose()
+
+
+@pytest.fixture
+async def session(database):
+    async with async_session_maker() as session:
+        yield session
+
+
+@pytest.fixture
+async def user(session) -> User:
+    user = User(username="tester", email=f"{os.urandom(6).hex()}@example.com", hashed_password="x")
+    session.add(user)
+    await session.commit()
+    await session.refresh(user)
+    return user
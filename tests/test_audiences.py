@@ -0,0 +1,16 @@
+import pytest
+
+from api.models import Brand
+from api.services import AudienceService
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.mark.parametrize("count", [1, 5, 10])
+async def test_stub_backend_outlines_the_requested_count(session, user, count):
+    brand = Brand(name="Bean There", about="Single origin coffee", user_id=user.id)
+    outline = await AudienceService.__outline__(brand, count, session)
+    assert len(outline.audiences) == count
+
+    triggers = await AudienceService.__triggers__(brand, outline.audiences[0].model_dump(), count, session)
+    assert len(triggers.triggers) == count
@@ -0,0 +1,64 @@
+import asyncio
+
+import pytest
+
+import api.services.Embedding as embedding
+from api.models import Brand
+from api.services import EmbeddingService, OpenAiService
+from core.types import SearchKind
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def brands(session, user) -> list[Brand]:
+    """Two coffee brands and a tyre brand; the stub backend embeds shared words close together."""
+    brands = [
+        Brand(name="Bean There", about="Single origin coffee roasted to order", user_id=user.id),
+        Brand(name="Daily Grind", about="Fresh coffee roasted for cafes", user_id=user.id),
+        Brand(name="Tread Well", about="All season tyres for family cars", user_id=user.id),
+    ]
+    session.add_all(brands)
+    await session.commit()
+    return brands
+
+
+async def test_refresh_indexes_changed_rows_only(brands):
+    index = embedding.__indexes__[SearchKind.BRAND]
+    backend = OpenAiService.open_backend()
+    ids = [brand.id for brand in brands]
+
+    await EmbeddingService.refresh(SearchKind.BRAND, ids)
+    assert all(id in index for id in ids)
+    hits = index.top_k(index.get(ids[0]), 2, group=brands[0].user_id, exclude=(ids[0],))
+    assert [id for id, _ in hits] == [ids[1], ids[2]]
+
+    calls = backend.calls
+    await EmbeddingService.refresh(SearchKind.BRAND, ids)
+    assert backend.calls == calls
+
+
+async def test_failed_rounds_are_retried(brands, monkeypatch):
+    monkeypatch.setattr(embedding.settings, "EMBEDDING_FLUSH_SECONDS", 0.01)
+    refresh = EmbeddingService.refresh
+    attempts = []
+
+    async def flaky_refresh(kind, ids):
+        attempts.append(ids)
+        if len(attempts) == 1:
+            raise RuntimeError("embedding backend down")
+        await refresh(kind, ids)
+
+    monkeypatch.setattr(EmbeddingService, "refresh", staticmethod(flaky_refresh))
+    await EmbeddingService.start()
+    try:
+        EmbeddingService.schedule(SearchKind.BRAND, [brands[0].id])
+        for _ in range(100):
+            if brands[0].id in embedding.__indexes__[SearchKind.BRAND]:
+                break
+            await asyncio.sleep(0.01)
+    finally:
+        await EmbeddingService.stop()
+
+    assert brands[0].id in embedding.__indexes__[SearchKind.BRAND]
+    assert any(brands[0].id in ids for ids in attempts[1:])
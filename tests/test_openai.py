@@ -0,0 +1,47 @@
+import pytest
+
+import api.services.OpenAi as openai_service
+from api.services import OpenAiService
+from api.services.LLMBackend import RetryableLLMError
+
+pytestmark = pytest.mark.anyio
+
+
+class FlakyStreamBackend:
+    """Fails the first stream before its first delta; records which streams were closed."""
+
+    def __init__(self):
+        self.opened = 0
+        self.closed = []
+
+    async def stream(self, messages, options):
+        self.opened += 1
+        attempt = self.opened
+        try:
+            if attempt == 1:
+                raise RetryableLLMError("connection reset")
+            for word in ("one", " two", " three"):
+                yield word
+        finally:
+            self.closed.append(attempt)
+
+
+@pytest.fixture
+def backend(monkeypatch) -> FlakyStreamBackend:
+    backend = FlakyStreamBackend()
+    monkeypatch.setattr(OpenAiService, "open_backend", staticmethod(lambda: backend))
+    monkeypatch.setattr(openai_service.settings, "OPENAI_BACKOFF_BASE_SECONDS", 0.0)
+    return backend
+
+
+async def test_stream_retries_close_the_failed_attempt(backend):
+    chunks = [chunk async for chunk in OpenAiService.chat_stream("s", "a", "u", None, bypass_cache=True)]
+    assert "".join(chunks) == "one two three"
+    assert backend.closed == [1, 2]
+
+
+async def test_stream_closed_when_client_stops_reading(backend):
+    stream = OpenAiService.chat_stream("s", "a", "u", None, bypass_cache=True)
+    assert await anext(stream) == "one"
+    await stream.aclose()
+    assert backend.closed == [1, 2]
@@ -0,0 +1,69 @@
+from uuid import uuid4
+
+import orjson
+import pytest
+
+from api.models import Audience, Brand, Trigger
+from api.schemas import SearchQuery
+from api.services import SearchService
+from core.exceptions import BadRequestException
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def catalogue(session, user) -> dict[str, Brand | Audience | Trigger]:
+    """One brand with an audience and a trigger, all mentioning coffee."""
+    brand = Brand(name="Coffee Roasters", about="We roast coffee beans in small batches.", user_id=user.id)
+    session.add(brand)
+    await session.flush()
+    audience = Audience(name="Commuters", description="Busy people who grab coffee on the way to work.", brand_id=brand.id)
+    session.add(audience)
+    await session.flush()
+    trigger = Trigger(name="Morning coffee", description="The first cup of the day.", image_prompt="", audience_id=audience.id)
+    session.add(trigger)
+    await session.commit()
+    return {"brand": brand, "audience": audience, "trigger": trigger}
+
+
+async def __search__(session, user, **params) -> dict:
+    response = await SearchService.search(SearchQuery(**params), session, user)
+    return orjson.loads(response.body)
+
+
+async def test_ranks_title_matches_first(session, user, catalogue):
+    result = await __search__(session, user, q="coffee roasters")
+    assert [item["kind"] for item in result["items"]] == ["brand"]
+
+    result = await __search__(session, user, q="coffee")
+    ranks = [item["rank"] for item in result["items"]]
+    assert ranks == sorted(ranks, reverse=True)
+    assert {item["title"] for item in result["items"] if item["rank"] == 1.0} == {"Coffee Roasters", "Morning coffee"}
+    assert result["items"][-1]["title"] == "Commuters"
+    assert "coffee" in result["items"][-1]["snippet"]
+
+
+async def test_pages_do_not_overlap(session, user, catalogue):
+    first = await __search__(session, user, q="coffee", limit=2)
+    assert len(first["items"]) == 2 and first["next_cursor"]
+    second = await __search__(session, user, q="coffee", limit=2, cursor=first["next_cursor"])
+    assert second["next_cursor"] is None
+    assert {item["id"] for item in first["items"] + second["items"]} == {str(row.id) for row in catalogue.values()}
+
+
+async def test_kinds_filter(session, user, catalogue):
+    result = await __search__(session, user, q="coffee", kinds="audience, trigger")
+    assert {item["kind"] for item in result["items"]} == {"audience", "trigger"}
+
+
+@pytest.mark.parametrize("kinds", [",", " , ", "brand,planet"])
+async def test_rejects_invalid_kinds(session, user, kinds):
+    with pytest.raises(BadRequestException):
+        await __search__(session, user, q="coffee", kinds=kinds)
+
+
+async def test_only_searches_own_rows(session, user, catalogue):
+    session.add(Brand(name="Coffee Elsewhere", user_id=uuid4()))
+    await session.commit()
+    result = await __search__(session, user, q="elsewhere")
+    assert result["items"] == []
@@ -0,0 +1,59 @@
+import numpy as np
+
+from core.vectors import PartitionedIndex, VectorIndex, from_bytes, normalize, to_bytes
+
+
+def __random_unit__(rows: int, dimensions: int = 8, seed: int = 0) -> np.ndarray:
+    return normalize(np.random.default_rng(seed).standard_normal((rows, dimensions)))
+
+
+def test_top_k_matches_brute_force():
+    vectors = __random_unit__(50)
+    index = VectorIndex(8)
+    for row, vector in enumerate(vectors):
+        index.upsert(row, vector)
+
+    query = vectors[7]
+    hits = index.top_k(query, 5, exclude=(7,))
+    expected = [row for row in np.argsort(vectors @ query)[::-1] if row != 7][:5]
+    assert [id for id, _ in hits] == expected
+    assert np.allclose([score for _, score in hits], (vectors @ query)[expected])
+
+
+def test_upsert_and_remove_update_in_place():
+    vectors = __random_unit__(20)
+    index = VectorIndex(8, capacity=2)
+    for row, vector in enumerate(vectors):
+        index.upsert(row, vector)
+    assert len(index) == 20
+
+    index.upsert(3, vectors[11])
+    assert np.allclose(index.get(3), vectors[11])
+    assert {id for id, _ in index.top_k(vectors[11], 2)} == {3, 11}
+
+    index.remove(0)
+    index.remove(0)
+    assert len(index) == 19 and 0 not in index and index.get(0) is None
+    # The last row moved into the hole still answers with its own vector.
+    assert np.allclose(index.get(19), vectors[19])
+    assert all(id != 0 for id, _ in index.top_k(vectors[0], 19))
+
+
+def test_partitions_only_return_their_group():
+    vectors = __random_unit__(6)
+    index = PartitionedIndex(8)
+    for row, vector in enumerate(vectors):
+        index.upsert(row, vector, group=row % 2)
+
+    assert {id for id, _ in index.top_k(vectors[0], 10, group=1)} == {1, 3, 5}
+    index.upsert(1, vectors[1], group=0)
+    assert index.group_of(1) == 0
+    assert {id for id, _ in index.top_k(vectors[0], 10, group=1)} == {3, 5}
+    assert index.top_k(vectors[0], 10, group="nobody") == []
+
+
+def test_bytes_round_trip():
+    vector = __random_unit__(1)[0]
+    data = to_bytes(vector)
+    assert len(data) == 4 * len(vector)
+    assert np.array_equal(from_bytes(data), vector)